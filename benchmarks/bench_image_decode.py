@@ -0,0 +1,95 @@
+"""Decode-plus-resize cost per card image, old pipeline against the new one.
+
+    python benchmarks/bench_image_decode.py [--repeat N]
+
+Card images are synthetic JPEGs at the sizes YGOPRODeck serves (421x614
+full, 168x246 small) with enough texture to decode like real artwork.
+"First view" is what a card costs the first time it is shown (the download
+itself is not timed); "cached view" is the later sessions, which only read
+the pre-scaled copy from disk.
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageFilter
+
+from image_cache import RESIZED_QUALITY, VARIANT_SIZES, decode_scaled, pick_variant
+
+# Display sizes used by the enhanced builder, the legacy builder and a thumbnail grid
+SIZES = ((250, 350), (200, 300), (100, 146))
+
+
+def make_card_jpeg(size):
+    image = Image.effect_noise(size, 60).convert('RGB').filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def encode(image, fmt, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def median_ms(func, repeat):
+    func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def old_first_view(data, size):
+    image = Image.open(io.BytesIO(data))
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def decode(data):
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image
+
+
+def run(repeat):
+    sources = {variant: make_card_jpeg(size) for variant, size in VARIANT_SIZES.items()}
+    rows = []
+    for size in SIZES:
+        variant = pick_variant(size, small_url="available")
+        resized = old_first_view(sources['full'], size)
+        png = encode(resized, "PNG")
+        jpeg = encode(resized, "JPEG", quality=RESIZED_QUALITY)
+        rows.append({
+            'size': f"{size[0]}x{size[1]}",
+            'variant': variant,
+            'old_first': median_ms(lambda: old_first_view(sources['full'], size), repeat),
+            'new_first': median_ms(lambda: decode_scaled(sources[variant], size), repeat),
+            'old_cached': median_ms(lambda: decode(png), repeat),
+            'new_cached': median_ms(lambda: decode(jpeg), repeat),
+        })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    print(f"{'size':>9} {'source':>6} | {'first view (ms)':^24} | {'cached view (ms)':^24}")
+    print(f"{'':>9} {'':>6} | {'old':>6} {'new':>6} {'speedup':>9} | {'old':>6} {'new':>6} {'speedup':>9}")
+    for row in run(args.repeat):
+        print(f"{row['size']:>9} {row['variant']:>6} | {row['old_first']:6.2f} {row['new_first']:6.2f} "
+              f"{row['old_first'] / row['new_first']:8.1f}x | {row['old_cached']:6.2f} {row['new_cached']:6.2f} "
+              f"{row['old_cached'] / row['new_cached']:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
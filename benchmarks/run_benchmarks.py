@@ -0,0 +1,423 @@
+"""Timing and memory benchmarks for the deck builder, against a synthetic catalog.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --compare results.json
+
+Nothing touches the real API: a SyntheticAPI on localhost serves a
+deterministic catalog (13,500 cards by default) and its card images after
+--latency milliseconds per request. With --replay, the catalog and images
+come from an archive recorded from the real API instead (see transport.py),
+again after --latency milliseconds per request. Each benchmark times one operation the
+GUI performs, once per input: loading the catalog (first start and later
+starts), building the search indexes, the filter bar queries behind
+filter_cards while a name is typed, name lookups and suggestions, saving and
+opening decks, and showing card images for the first time and from the
+cache.
+
+The first input of every benchmark is a warm-up run, traced with
+tracemalloc for the peak memory it allocates and left out of the timings.
+Results are written as JSON with latency percentiles per benchmark, so runs
+on different commits can be compared with --compare.
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import CARD_COUNT, SyntheticAPI
+
+from card_catalog import CardCatalog
+from card_query import CardQuery
+from card_store import CardStore
+from deck import EXTRA, MAIN, SIDE, is_extra_deck_card
+from deck_io import DeckFile, hydrate, load_deck_file, save_deck_file
+from facets import FacetIndex
+from fuzzy_index import FuzzyNameIndex
+from http_client import HTTPClient
+from image_cache import CardImageCache, pick_variant
+from search_index import NameIndex
+from transport import HTTPArchive, ReplayClient
+
+RESULTS_VERSION = 1
+# The filter bar of the enhanced builder
+COUNT_FIELDS = ('type', 'attribute', 'race')
+FACET_FILTERS = (
+    {},
+    {'type': {"Effect Monster"}},
+    {'attribute': {"DARK"}, 'level': (None, 4)},
+    {'race': {"Dragon"}, 'atk': (2000, None)},
+)
+# Card image sizes of the enhanced builder and a thumbnail grid
+IMAGE_SIZES = ((250, 350), (100, 146))
+
+
+class Environment:
+    """The API stand-in, a scratch directory and a catalog loaded from it, shared by the benchmarks"""
+
+    def __init__(self, cards=CARD_COUNT, seed=1, latency=0.02, repeat=5, samples=200, replay=None):
+        self.repeat = repeat
+        self.samples = samples
+        self.rng = random.Random(seed)
+        if replay:
+            self.server = None
+            self.archive = HTTPArchive(replay, readonly=True)
+            self.client = ReplayClient(self.archive, latency)
+            self.url = recorded_url(self.archive, "/cardinfo.php")
+            self.version_url = self.url[:-len("cardinfo.php")] + "checkDBVer.php"
+        else:
+            self.server = SyntheticAPI(cards, seed, latency).start()
+            self.archive = None
+            self.client = HTTPClient(backoff_factor=0)
+            self.url = f"{self.server.api_base}/cardinfo.php"
+            self.version_url = f"{self.server.api_base}/checkDBVer.php"
+        self.scratch = tempfile.TemporaryDirectory(prefix="ygo-bench-")
+        self.directory = self.scratch.name
+        self.counter = itertools.count()
+        self.store = CardStore(self.path("catalog.sqlite3"))
+        self.catalog = self.new_catalog(self.store)
+        self.catalog.load()
+        self.table = self.catalog.table
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def unique_path(self, name):
+        return self.path(f"{next(self.counter)}-{name}")
+
+    def new_catalog(self, store):
+        return CardCatalog(url=self.url, version_url=self.version_url, store=store, client=self.client)
+
+    def available(self, url):
+        """Whether url can be fetched; replay archives hold only what was recorded"""
+        return self.archive is None or url in self.archive
+
+    def close(self):
+        if self.server:
+            self.server.stop()
+        self.client.close()
+        self.store.close()
+        self.scratch.cleanup()
+
+
+def recorded_url(archive, path):
+    for url in archive.urls():
+        if url.split('?')[0].endswith(path):
+            return url
+    raise ValueError(f"{archive.path} holds no {path} response")
+
+
+def catalog_load_cold(env):
+    """First start: download, parse and store the catalog, and index its text"""
+    def load(_):
+        store = CardStore(env.unique_path("cards.sqlite3"))
+        try:
+            env.new_catalog(store).load()
+        finally:
+            store.close()
+    return load, range(env.repeat + 1)
+
+
+def catalog_load_warm(env):
+    """Later starts: check the version online, then read the catalog from disk"""
+    return (lambda _: env.new_catalog(env.store).load()), range(env.repeat + 1)
+
+
+def index_build(env):
+    """The name, typo-tolerant and facet indexes, built on the first search"""
+    table = env.table
+
+    def build(_):
+        NameIndex(table.names_lower)
+        FuzzyNameIndex(table.names)
+        FacetIndex(table)
+    return build, range(env.repeat + 1)
+
+
+def filter_query(env):
+    """The query behind filter_cards, once per keystroke of names typed into the search box"""
+    catalog = env.catalog
+    # Index building is timed by index_build; build them up front
+    catalog.name_index, catalog.facet_index
+    query = CardQuery(catalog)
+    inputs = []
+    while len(inputs) <= env.samples:
+        name = env.table.names[env.rng.randrange(len(env.table))].lower()
+        facets = env.rng.choice(FACET_FILTERS)
+        inputs += [(name[:length], facets) for length in range(1, min(len(name), 10) + 1)]
+    return (lambda item: query.run(item[0], item[1], COUNT_FIELDS)), inputs[:env.samples + 1]
+
+
+def name_lookup(env):
+    """Exact name lookups, as when resolving the cards of a deck by name"""
+    names = env.table.names
+    inputs = [names[env.rng.randrange(len(names))].upper() for _ in range(env.samples * 10 + 1)]
+    return env.catalog.get_by_name, inputs
+
+
+def name_suggest(env):
+    """Suggestions for misspelled names"""
+    env.catalog.fuzzy_index  # built up front, as in filter_query
+    names = env.table.names
+    inputs = []
+    for _ in range(env.samples // 4 + 1):
+        name = names[env.rng.randrange(len(names))]
+        position = env.rng.randrange(len(name))
+        inputs.append(name[:position] + name[position + 1:])
+    return env.catalog.suggest, inputs
+
+
+def make_deck_files(env, count):
+    """Random decks of catalog cards: 40-60 main deck cards, up to 15 extra and 15 side deck cards"""
+    table = env.table
+    extra = [is_extra_deck_card(card_type, frame_type)
+             for card_type, frame_type in zip(table.text['type'], table.text['frameType'])]
+    main_rows = [row for row in range(len(table)) if not extra[row]]
+    extra_rows = [row for row in range(len(table)) if extra[row]]
+    deck_files = []
+    for _ in range(count):
+        sections = {
+            MAIN: [table.ids[row] for row in env.rng.sample(main_rows, env.rng.randint(14, 20)) for _ in range(3)],
+            EXTRA: [table.ids[row] for row in env.rng.sample(extra_rows, 15)],
+            SIDE: [table.ids[row] for row in env.rng.sample(main_rows, 15)],
+        }
+        # hydrate drops whatever breaks the deck limits
+        deck, _, _ = hydrate(DeckFile(sections), table)
+        deck_files.append(DeckFile.from_deck(deck))
+    return deck_files
+
+
+def deck_save(env):
+    """Saving decks as JSON and as .ydk"""
+    deck_files = make_deck_files(env, env.samples // 4 + 1)
+    inputs = [(env.unique_path(f"deck.{'ydk' if index % 2 else 'json'}"), deck_file)
+              for index, deck_file in enumerate(deck_files)]
+    return (lambda item: save_deck_file(*item)), inputs
+
+
+def deck_open(env):
+    """Opening saved decks: parsing the file and resolving every card in the catalog"""
+    paths = []
+    for index, deck_file in enumerate(make_deck_files(env, env.samples // 4 + 1)):
+        path = env.unique_path(f"deck.{'ydk' if index % 2 else 'json'}")
+        save_deck_file(path, deck_file)
+        paths.append(path)
+    table = env.table
+    return (lambda path: hydrate(load_deck_file(path), table)), paths
+
+
+def image_jobs(env, count):
+    """Arguments of CardImageCache.load for up to count cards whose images can be fetched"""
+    rows = list(range(len(env.table)))
+    env.rng.shuffle(rows)
+    jobs = []
+    for row in rows:
+        if len(jobs) == count:
+            break
+        image = env.catalog.get_by_id(env.table.ids[row])['card_images'][0]
+        size = IMAGE_SIZES[len(jobs) % len(IMAGE_SIZES)]
+        small_url = image.get('image_url_small')
+        url = small_url if pick_variant(size, small_url) == 'small' else image['image_url']
+        if env.available(url):
+            jobs.append((image['id'], image['image_url'], size, small_url))
+    return jobs
+
+
+def image_first_view(env):
+    """Showing a card image for the first time: download, decode, resize and cache it"""
+    cache = CardImageCache(env.unique_path("images"), client=env.client)
+    return (lambda job: cache.load(*job)), image_jobs(env, env.samples // 5 + 1)
+
+
+def image_cached_view(env):
+    """Showing a card image seen in an earlier session, from the resized copy on disk"""
+    cache = CardImageCache(env.unique_path("images"), client=env.client)
+    jobs = image_jobs(env, env.samples // 5 + 1)
+    for job in jobs:
+        cache.load(*job)
+    return (lambda job: cache.load(*job)), jobs
+
+
+BENCHMARKS = (
+    ('catalog_load_cold', catalog_load_cold),
+    ('catalog_load_warm', catalog_load_warm),
+    ('index_build', index_build),
+    ('filter_query', filter_query),
+    ('name_lookup', name_lookup),
+    ('name_suggest', name_suggest),
+    ('deck_save', deck_save),
+    ('deck_open', deck_open),
+    ('image_first_view', image_first_view),
+    ('image_cached_view', image_cached_view),
+)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(samples, peak):
+    ordered = sorted(sample * 1000 for sample in samples)
+    return {
+        'samples': len(ordered),
+        'min_ms': round(ordered[0], 4),
+        'p50_ms': round(percentile(ordered, 0.5), 4),
+        'p90_ms': round(percentile(ordered, 0.9), 4),
+        'p99_ms': round(percentile(ordered, 0.99), 4),
+        'max_ms': round(ordered[-1], 4),
+        'mean_ms': round(sum(ordered) / len(ordered), 4),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def measure(op, inputs):
+    """Run op on every input; returns (seconds per timed input, peak bytes of the traced warm-up)"""
+    tracemalloc.start()
+    try:
+        op(inputs[0])
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    samples = []
+    clock = time.perf_counter
+    for item in inputs[1:]:
+        start = clock()
+        op(item)
+        samples.append(clock() - start)
+    return samples, peak
+
+
+def max_rss_kb():
+    """Peak resident memory of this process, where the platform reports it"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run(names=None, cards=CARD_COUNT, seed=1, latency=0.02, repeat=5, samples=200, replay=None,
+        progress=None):
+    """Run the named benchmarks (all by default); returns the results document.
+
+    Benchmarks left without anything to time, such as image benchmarks on
+    an archive without images, are left out.
+    """
+    env = Environment(cards, seed, latency, repeat, samples, replay)
+    cards = len(env.table)
+    results = {}
+    try:
+        for name, benchmark in BENCHMARKS:
+            if names and name not in names:
+                continue
+            if progress:
+                progress(name)
+            op, inputs = benchmark(env)
+            inputs = list(inputs)
+            if len(inputs) > 1:
+                results[name] = summarize(*measure(op, inputs))
+    finally:
+        env.close()
+    return {
+        'version': RESULTS_VERSION,
+        'commit': git_commit(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {'source': os.path.basename(replay) if replay else 'synthetic', 'cards': cards, 'seed': seed,
+                   'latency_ms': round(latency * 1000, 3), 'repeat': repeat, 'samples': samples},
+        'results': results,
+        'max_rss_kb': max_rss_kb(),
+    }
+
+
+def format_comparison(baseline, current):
+    lines = [f"{'benchmark':<20} {'p50 before':>11} {'p50 after':>11} {'change':>8}   "
+             f"{'p90 before':>11} {'p90 after':>11} {'change':>8}"]
+    for name, result in current['results'].items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        row = f"{name:<20}"
+        for key in ('p50_ms', 'p90_ms'):
+            change = (result[key] / before[key] - 1) * 100 if before[key] else 0.0
+            row += f" {before[key]:11.3f} {result[key]:11.3f} {change:+7.1f}%  "
+        lines.append(row.rstrip())
+    if baseline.get('config') != current['config']:
+        lines.append("Note: the runs used different settings")
+    return "\n".join(lines)
+
+
+def format_results(current):
+    lines = [f"{'benchmark':<20} {'n':>5} {'p50 ms':>10} {'p90 ms':>10} {'p99 ms':>10} {'peak KB':>10}"]
+    for name, result in current['results'].items():
+        lines.append(f"{name:<20} {result['samples']:>5} {result['p50_ms']:10.3f} {result['p90_ms']:10.3f} "
+                     f"{result['p99_ms']:10.3f} {result['peak_kb']:10.1f}")
+    return "\n".join(lines)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=[name for name, _ in BENCHMARKS], metavar='NAME',
+                        help="run just these benchmarks")
+    parser.add_argument('--cards', type=int, default=CARD_COUNT, help="size of the synthetic catalog")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=20, help="milliseconds before every API response")
+    parser.add_argument('--repeat', type=int, default=5, help="timed runs of the catalog load and index benchmarks")
+    parser.add_argument('--samples', type=int, default=200, help="timed queries (fewer decks and images)")
+    parser.add_argument('--replay', metavar='ARCHIVE',
+                        help="use the catalog and images of a recorded archive instead of synthetic ones")
+    parser.add_argument('--output', '-o', default='-', metavar='FILE', help="results JSON (default: stdout)")
+    parser.add_argument('--compare', metavar='FILE', help="results JSON of an earlier run to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    def progress(name):
+        print(f"Running {name}...", file=sys.stderr)
+
+    try:
+        current = run(args.only, args.cards, args.seed, args.latency / 1000, args.repeat, args.samples, args.replay,
+                      progress)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    text = json.dumps(current, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    print(format_comparison(baseline, current) if baseline else format_results(current), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
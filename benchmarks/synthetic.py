@@ -0,0 +1,275 @@
+"""A deterministic stand-in for the YGOPRODeck catalog and API.
+
+make_cards() builds a catalog shaped like the real one (card types and
+frames in realistic proportions, effect text, alternate artworks, set and
+price data the builder drops while parsing). SyntheticAPI serves it on
+localhost as cardinfo.php and checkDBVer.php, along with JPEG card images,
+after a configurable delay per request. Tests build their own stand-in
+servers on LocalServer and QuietHandler.
+"""
+import gzip
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image, ImageFilter
+
+CARD_COUNT = 13500
+
+# (type, frameType, share of the catalog)
+CARD_KINDS = (
+    ("Effect Monster", "effect", 0.42),
+    ("Normal Monster", "normal", 0.05),
+    ("Flip Effect Monster", "effect", 0.02),
+    ("Pendulum Effect Monster", "effect_pendulum", 0.02),
+    ("Ritual Effect Monster", "ritual", 0.01),
+    ("Fusion Monster", "fusion", 0.04),
+    ("Synchro Monster", "synchro", 0.03),
+    ("XYZ Monster", "xyz", 0.04),
+    ("Link Monster", "link", 0.04),
+    ("Spell Card", "spell", 0.19),
+    ("Trap Card", "trap", 0.14),
+)
+RACES = ("Spellcaster", "Dragon", "Warrior", "Fiend", "Zombie", "Machine", "Beast", "Aqua",
+         "Fairy", "Insect", "Pyro", "Rock", "Thunder", "Winged Beast", "Cyberse", "Psychic")
+SPELL_RACES = ("Normal", "Quick-Play", "Continuous", "Equip", "Field", "Ritual")
+TRAP_RACES = ("Normal", "Continuous", "Counter")
+ATTRIBUTES = ("DARK", "LIGHT", "EARTH", "WATER", "FIRE", "WIND")
+BANLIST_STATUSES = ("Forbidden", "Limited", "Semi-Limited")
+
+ADJECTIVES = ("Dark", "Blue-Eyes", "Ancient", "Cyber", "Elemental", "Mystic", "Crimson", "Silent", "Eternal",
+              "Shadow", "Radiant", "Infernal", "Celestial", "Iron", "Frozen", "Thunder", "Phantom", "Sacred",
+              "Chaos", "Gilded", "Abyssal", "Verdant", "Storm", "Obsidian")
+NOUNS = ("Magician", "Dragon", "Knight", "Serpent", "Golem", "Sorceress", "Warrior", "Beast", "Angel",
+         "Fiend", "Titan", "Phoenix", "Wyrm", "Sentinel", "Oracle", "Reaper", "Guardian", "Hydra",
+         "Paladin", "Chimera", "Specter", "Colossus")
+TITLES = ("of the Abyss", "of Destruction", "of Light", "the Fallen", "Overlord", "Lord", "King",
+          "Queen", "Avenger", "Reborn", "Incarnate", "Ascendant", "of Chaos", "Prime")
+SPELL_WORDS = ("Call", "Ritual", "Storm", "Seal", "Fusion", "Burial", "Pot", "Mirror", "Sword", "Shield",
+               "Gate", "Rebirth", "Judgment", "Raigeki", "Barrier", "Veil", "Wave", "Charm")
+EFFECT_PHRASES = (
+    "When this card is Normal Summoned: You can add 1 {race} monster from your Deck to your hand.",
+    "If this card is sent to the GY: You can Special Summon 1 {attribute} monster from your GY.",
+    "Once per turn: You can target 1 face-up monster your opponent controls; destroy it.",
+    "You can only use this effect of \"{name}\" once per turn.",
+    "Gains 300 ATK for each {race} monster in your GY.",
+    "Cannot be destroyed by battle.",
+    "During your Main Phase: You can banish 1 card from your hand; draw 1 card.",
+    "If a monster you control would be destroyed, you can discard this card instead.",
+    "Negate the activation of a Spell Card, and if you do, destroy it.",
+    "All {attribute} monsters you control gain 500 ATK and DEF.",
+    "Target 1 card on the field; return it to the hand.",
+    "Your opponent cannot target this card with card effects.",
+    "Send 1 monster from your Deck to the GY.",
+    "Shuffle up to 3 banished cards into the Deck.",
+)
+IMAGE_BASE = "https://images.ygoprodeck.com/images"
+
+
+def card_name(rng, kind, taken):
+    """A unique card name that reads like a real one"""
+    while True:
+        if kind in ("Spell Card", "Trap Card"):
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(SPELL_WORDS)}"
+        else:
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}"
+        if rng.random() < 0.6:
+            name += f" {rng.choice(TITLES)}"
+        if name.lower() in taken:
+            name += f" {rng.choice(('II', 'III', 'IV', 'V', 'Mk-2', 'Zero', 'Neo'))}"
+        if name.lower() not in taken:
+            taken.add(name.lower())
+            return name
+
+
+def card_images(card_id, base):
+    return {
+        'id': card_id,
+        'image_url': f"{base}/cards/{card_id}.jpg",
+        'image_url_small': f"{base}/cards_small/{card_id}.jpg",
+        'image_url_cropped': f"{base}/cards_cropped/{card_id}.jpg",
+    }
+
+
+def make_cards(count=CARD_COUNT, seed=1, image_base=IMAGE_BASE):
+    """A list of count card dicts in the cardinfo.php format; equal seeds give equal catalogs"""
+    rng = random.Random(seed)
+    weights = [share for _, _, share in CARD_KINDS]
+    archetypes = [f"{adjective} {noun}" for adjective in ADJECTIVES[:8] for noun in NOUNS[:5]]
+    ids = rng.sample(range(10000000, 99999999), count * 2)
+    taken = set()
+    cards = []
+    for index in range(count):
+        card_type, frame_type, _ = rng.choices(CARD_KINDS, weights)[0]
+        card_id = ids[index]
+        name = card_name(rng, card_type, taken)
+        card = {'id': card_id, 'name': name, 'type': card_type, 'frameType': frame_type}
+        if card_type in ("Spell Card", "Trap Card"):
+            card['race'] = rng.choice(SPELL_RACES if card_type == "Spell Card" else TRAP_RACES)
+            race, attribute = "monster", "LIGHT"
+        else:
+            race, attribute = rng.choice(RACES), rng.choice(ATTRIBUTES)
+            card.update({'race': race, 'attribute': attribute, 'atk': rng.randrange(0, 5001, 100)})
+            if card_type == "Link Monster":
+                card['linkval'] = rng.randint(1, 6)
+                card['linkmarkers'] = rng.sample(["Top", "Bottom", "Left", "Right", "Top-Left", "Top-Right"],
+                                                 card['linkval'])
+            else:
+                card['def'] = rng.randrange(0, 5001, 100)
+                card['level'] = rng.randint(1, 12)
+            if frame_type == "effect_pendulum":
+                card['scale'] = rng.randint(0, 13)
+        phrases = rng.sample(EFFECT_PHRASES, rng.randint(1, 4))
+        card['desc'] = " ".join(phrases).format(name=name, race=race, attribute=attribute)
+        if rng.random() < 0.35:
+            card['archetype'] = rng.choice(archetypes)
+        images = [card_images(card_id, image_base)]
+        if rng.random() < 0.05:
+            # Alternate artworks have ids of their own
+            images.append(card_images(ids[count + index], image_base))
+        card['card_images'] = images
+        if rng.random() < 0.04:
+            card['banlist_info'] = {'ban_tcg': rng.choice(BANLIST_STATUSES)}
+        # Parts of the real response the builder does not keep
+        card['ygoprodeck_url'] = f"https://ygoprodeck.com/card/{card_id}"
+        card['card_sets'] = [{'set_name': f"Set {rng.randint(1, 400)}",
+                              'set_code': f"SET-EN{rng.randint(0, 120):03d}",
+                              'set_rarity': rng.choice(("Common", "Rare", "Super Rare", "Ultra Rare")),
+                              'set_price': f"{rng.random() * 20:.2f}"} for _ in range(rng.randint(0, 4))]
+        card['card_prices'] = [{'cardmarket_price': f"{rng.random() * 10:.2f}",
+                                'tcgplayer_price': f"{rng.random() * 10:.2f}"}]
+        cards.append(card)
+    return cards
+
+
+def make_card_jpeg(size, seed=0):
+    """A JPEG of the given size with enough texture to decode like real card art"""
+    rng = random.Random(seed)
+    image = Image.effect_noise(size, 40 + rng.randint(0, 40)).convert('RGB').filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class LocalServer(ThreadingHTTPServer):
+    """A threaded HTTP server on a free localhost port, served from a daemon thread by start()"""
+
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(("127.0.0.1", 0), handler)
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class QuietHandler(BaseHTTPRequestHandler):
+    """Keep-alive request handler that counts requests on its server and logs nothing"""
+
+    protocol_version = "HTTP/1.1"
+
+    def parse_request(self):
+        if not super().parse_request():
+            return False
+        self.server.requests += 1
+        return True
+
+    def send_body(self, status, body, content_type="application/octet-stream", headers=()):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class SyntheticAPI(LocalServer):
+    """Serves make_cards(count, seed) on localhost, like db.ygoprodeck.com and its image host.
+
+    Every request waits latency seconds before the response starts. The
+    card image URLs point back at this server, which answers with a handful
+    of distinct JPEGs chosen by card id.
+    """
+
+    def __init__(self, count=CARD_COUNT, seed=1, latency=0.0, version="1.0", image_variants=8):
+        super().__init__(SyntheticAPIHandler)
+        self.latency = latency
+        self.version = version
+        self.cards = make_cards(count, seed, self.image_base)
+        self.payload = json.dumps({'data': self.cards}).encode()
+        self.payload_gzip = gzip.compress(self.payload, compresslevel=6)
+        self.images = {
+            'cards': [make_card_jpeg((421, 614), seed) for seed in range(image_variants)],
+            'cards_small': [make_card_jpeg((168, 246), seed) for seed in range(image_variants)],
+        }
+        self.hits = {'cardinfo': 0, 'version': 0, 'images': 0}
+
+    @property
+    def api_base(self):
+        return f"{self.base}/api/v7"
+
+    @property
+    def image_base(self):
+        return f"{self.base}/images"
+
+    def image(self, card_id, variant='cards'):
+        """The JPEG served for a card id"""
+        images = self.images[variant]
+        return images[card_id % len(images)]
+
+
+class SyntheticAPIHandler(QuietHandler):
+    def do_GET(self):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+        path = self.path.split('?')[0]
+        encoding = None
+        if path.endswith("/cardinfo.php"):
+            server.hits['cardinfo'] += 1
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                body, encoding = server.payload_gzip, 'gzip'
+            else:
+                body = server.payload
+            content_type = "application/json"
+        elif path.endswith("/checkDBVer.php"):
+            server.hits['version'] += 1
+            body = json.dumps([{'database_version': server.version,
+                                'last_update': "2024-01-01 00:00:00"}]).encode()
+            content_type = "application/json"
+        elif path.startswith("/images/"):
+            parts = path.strip('/').split('/')
+            variants = server.images.get(parts[1]) if len(parts) == 3 else None
+            try:
+                card_id = int(parts[-1].split('.')[0])
+            except ValueError:
+                variants = None
+            if not variants:
+                self.send_error(404)
+                return
+            server.hits['images'] += 1
+            body = variants[card_id % len(variants)]
+            content_type = "image/jpeg"
+        else:
+            self.send_error(404)
+            return
+        self.send_body(200, body, content_type, [("Content-Encoding", encoding)] if encoding else ())
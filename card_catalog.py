@@ -0,0 +1,337 @@
+import os
+import pickle
+import sqlite3
+import threading
+
+from card_store import CardStore
+from card_stream import DEFAULT_FIELDS, iter_cards
+from card_table import CardTable
+from facets import FacetIndex
+from fuzzy_index import FuzzyNameIndex
+from http_client import LazyClient
+from perf import annotate
+from search_index import NameIndex
+from text_index import TextIndex
+
+# Cards handed to a load's progress callback at a time
+LOAD_BATCH_SIZE = 500
+
+API_BASE = os.environ.get("YGO_API_BASE", "https://db.ygoprodeck.com/api/v7")
+API_URL = f"{API_BASE}/cardinfo.php"
+VERSION_URL = f"{API_BASE}/checkDBVer.php"
+# (connect, read) seconds for the version check, which has the disk copy to fall back on
+VERSION_TIMEOUT = (2, 3)
+
+
+def counted_bytes(chunks):
+    """Pass chunks on, adding their size to the current timing span"""
+    for chunk in chunks:
+        annotate(bytes=len(chunk))
+        yield chunk
+
+
+class CatalogError(Exception):
+    """Raised when the card catalog cannot be loaded"""
+
+
+class CatalogCancelled(CatalogError):
+    """Raised when a load is stopped through its is_cancelled callback"""
+
+
+class CardCatalog:
+    """The full YGOPRODeck card list, fetched once and indexed in memory.
+
+    Cards are held in a compact CardTable; lookups by name
+    (case-insensitive) and by card id are dictionary hits on its row
+    indexes, so the GUI can resolve cards without touching the network after
+    the first load. With a store attached, the catalog is read from disk and only
+    downloaded again when the API reports a new database version.
+
+    Only the given fields are kept for each card (None keeps everything);
+    the response is parsed as it streams in. Requests go through the shared
+    HTTPClient; timeout=None uses its connect/read timeouts. The version
+    check is a single attempt within version_timeout, so a bad network
+    delays serving the disk copy by seconds, not minutes. Nothing
+    network-related is imported until the catalog first goes online.
+    """
+
+    client = LazyClient()
+
+    def __init__(self, url=API_URL, version_url=VERSION_URL, store=None, timeout=None,
+                 fields=DEFAULT_FIELDS, client=None, version_timeout=VERSION_TIMEOUT):
+        self.url = url
+        self.version_url = version_url
+        self.store = store
+        self.timeout = timeout
+        self.version_timeout = version_timeout
+        self.client = client
+        self.fields = fields
+        self.table = CardTable()
+        self._name_index = None
+        self._fuzzy_index = None
+        self._text_index = None
+        self._facet_index = None
+        self.version = None
+        self.loaded = False
+        self.from_store = False
+        self._lock = threading.Lock()
+        # The text index takes seconds to build; name and facet lookups must not wait for it
+        self._text_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.table)
+
+    def load(self, progress=None, is_cancelled=None):
+        """Load and index the catalog; later calls return immediately.
+
+        progress, if given, is called as progress(cards, expected) after each
+        batch, on the loading thread, with a CardView of every card read so
+        far and the expected total (None when unknown). The view's table is
+        built as the cards arrive and becomes the catalog table, so showing
+        it costs the caller nothing. is_cancelled is polled between batches;
+        once it returns true the load stops with CatalogCancelled and may be
+        retried later.
+        """
+        if self.loaded:
+            return
+        with self._lock:
+            if self.loaded:
+                return
+            stored_version = self.store.get_version() if self.store else None
+            stored_count = self.store.card_count() if self.store else 0
+            same_fields = bool(self.store and self.store.get_meta('fields') == self._fields_key())
+            remote_version = self.fetch_version()
+            if is_cancelled and is_cancelled():
+                raise CatalogCancelled("Loading the card catalog was cancelled")
+
+            if stored_count and (remote_version is None or (remote_version == stored_version and same_fields)):
+                # Up to date, or offline: serve the copy on disk
+                self._load_from_store(stored_version, progress)
+                return
+
+            try:
+                cards, table = self.fetch_cards(progress, is_cancelled, stored_count or None)
+            except CatalogCancelled:
+                raise
+            except CatalogError:
+                if stored_count:
+                    self._load_from_store(stored_version, progress)
+                    return
+                raise
+            if self.store:
+                self.store.save_cards(cards, remote_version)
+                self.store.set_meta('fields', self._fields_key())
+            self.version = remote_version
+            self.from_store = False
+            self.set_table(table)
+
+    def _fields_key(self):
+        return '*' if self.fields is None else ','.join(self.fields)
+
+    def _load_from_store(self, version, progress=None):
+        self.version = version
+        self.from_store = True
+        self.set_cards(self.store.load_cards())
+        if progress:
+            progress(self.view(range(len(self.table))), len(self.table))
+
+    def fetch_version(self):
+        """Current database version reported by the API, or None when offline"""
+        try:
+            response = self.client.get(self.version_url, timeout=self.version_timeout, retry=False)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if isinstance(data, list):
+                data = data[0]
+            return str(data['database_version'])
+        except (OSError, ValueError, KeyError, IndexError, TypeError):
+            return None
+
+    def fetch_cards(self, progress=None, is_cancelled=None, expected=None):
+        """Download the card list as (card dicts, CardTable); progress and is_cancelled work as in load()"""
+        try:
+            with self.client.get(self.url, timeout=self.timeout, stream=True) as response:
+                if response.status_code != 200:
+                    raise CatalogError(f"API Error: {response.status_code}")
+                cards = []
+                table = CardTable()
+                reported = 0
+                for card in iter_cards(counted_bytes(response.iter_content(chunk_size=64 * 1024)), self.fields):
+                    cards.append(card)
+                    table.append(card)
+                    if len(cards) - reported == LOAD_BATCH_SIZE:
+                        if is_cancelled and is_cancelled():
+                            raise CatalogCancelled("Loading the card catalog was cancelled")
+                        if progress:
+                            progress(table.view(range(len(table))), expected)
+                        reported = len(cards)
+                if progress and reported < len(cards):
+                    progress(table.view(range(len(table))), expected)
+                return cards, table
+        except OSError as e:
+            raise CatalogError(f"Failed to fetch card data: {e}") from e
+        except ValueError as e:
+            raise CatalogError(f"Invalid card data: {e}") from e
+
+    def set_cards(self, cards):
+        """Replace the catalog contents and rebuild the lookup indexes"""
+        self.set_table(CardTable(cards))
+
+    def set_table(self, table):
+        """Like set_cards, with the cards already in a CardTable"""
+        self.table = table
+        self._name_index = None
+        self._fuzzy_index = None
+        self._text_index = None
+        self._facet_index = None
+        self.loaded = True
+
+    @property
+    def name_index(self):
+        """Trigram index over card names, built on first use"""
+        self.load()
+        with self._lock:
+            if self._name_index is None:
+                self._name_index = NameIndex(self.table.names_lower)
+            return self._name_index
+
+    @property
+    def fuzzy_index(self):
+        """Typo-tolerant name index, built on first use"""
+        self.load()
+        with self._lock:
+            if self._fuzzy_index is None:
+                self._fuzzy_index = FuzzyNameIndex(self.table.names)
+            return self._fuzzy_index
+
+    @property
+    def facet_index(self):
+        """Bitmap indexes for filtering by type, race, attribute and stats, built on first use"""
+        self.load()
+        with self._lock:
+            if self._facet_index is None:
+                self._facet_index = FacetIndex(self.table)
+            return self._facet_index
+
+    @property
+    def text_index(self):
+        """Full-text index over card effect text.
+
+        Built once per catalog version and saved in the store, so later
+        sessions only have to read it back. See prepare_text_index.
+        """
+        self.load()
+        with self._text_lock:
+            if self._text_index is None:
+                self._text_index = self._load_text_index()
+            return self._text_index
+
+    def prepare_text_index(self):
+        """Build or read back the text index now, on the calling thread, ahead of the first text search"""
+        return self.text_index
+
+    def _load_text_index(self):
+        if self.store:
+            data = self.store.load_blob('text_index')
+            if data:
+                try:
+                    index = TextIndex.from_bytes(data)
+                    if len(index) == len(self.table):
+                        return index
+                except (ValueError, TypeError, EOFError, pickle.UnpicklingError):
+                    pass
+        index = TextIndex.build(self.table.descs)
+        if self.store:
+            self.store.save_blob('text_index', index.to_bytes())
+        return index
+
+    def search_text(self, query, limit=200):
+        """Rows whose effect text best matches query, best first"""
+        return [row for row, _ in self.text_index.search(query, limit)]
+
+    def filter_rows(self, filters):
+        """Rows matching every facet filter (see FacetIndex), ascending"""
+        index = self.facet_index
+        return index.rows(index.select(filters))
+
+    def suggest(self, name, limit=5):
+        """Rows of the cards whose names are closest to a misspelled name, best first"""
+        return [row for row, _ in self.fuzzy_index.lookup(name, limit)]
+
+    def row_by_name(self, name):
+        self.load()
+        return self.table.row_by_name.get(name.strip().lower())
+
+    def row_by_id(self, card_id):
+        self.load()
+        try:
+            return self.table.row_by_id.get(int(card_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_name(self, name):
+        row = self.row_by_name(name)
+        return None if row is None else self.table.card(row)
+
+    def get_by_id(self, card_id):
+        row = self.row_by_id(card_id)
+        return None if row is None else self.table.card(row)
+
+    def view(self, rows=()):
+        """A CardView over the catalog table"""
+        return self.table.view(rows)
+
+    def resolve_rows(self, keys, progress=None, progress_every=100):
+        """Resolve a whole list of card names (or integer ids) to table rows in one pass.
+
+        Returns (rows, unresolved): the matching rows in input order,
+        duplicates included, and the keys that matched nothing. progress is
+        called as progress(done, total) every progress_every keys and once
+        at the end.
+        """
+        self.load()
+        row_by_name = self.table.row_by_name
+        row_by_id = self.table.row_by_id
+        total = len(keys)
+        rows = []
+        unresolved = []
+        for done, key in enumerate(keys, 1):
+            if isinstance(key, int):
+                row = row_by_id.get(key)
+            else:
+                row = row_by_name.get(key.strip().lower())
+            if row is None:
+                unresolved.append(key)
+            else:
+                rows.append(row)
+            if progress and (done % progress_every == 0 or done == total):
+                progress(done, total)
+        return rows, unresolved
+
+    def resolve_many(self, keys, progress=None, progress_every=100):
+        """Like resolve_rows, but returns (cards, unresolved) with card dicts"""
+        rows, unresolved = self.resolve_rows(keys, progress, progress_every)
+        card = self.table.card
+        return [card(row) for row in rows], unresolved
+
+
+_shared_catalog = None
+_shared_lock = threading.Lock()
+
+
+def open_default_store():
+    """Open the on-disk store in the user cache directory, if it is writable"""
+    try:
+        return CardStore()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def get_catalog():
+    """Return the catalog shared by every window in this session"""
+    global _shared_catalog
+    with _shared_lock:
+        if _shared_catalog is None:
+            _shared_catalog = CardCatalog(store=open_default_store())
+        return _shared_catalog
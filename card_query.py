@@ -0,0 +1,43 @@
+from search_index import NameSearch
+
+
+class CardQuery:
+    """A name search combined with facet filters over the whole catalog.
+
+    This is what a search box with a filter bar runs on every change: name
+    matches first (a growing query only rescans the previous matches), then
+    the facet filters on top, plus per-facet counts for the filter choices.
+    Meant to be driven from one thread at a time, such as a search worker.
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.name_search = None
+
+    def run(self, search_term, facets=None, count_fields=(), is_cancelled=None):
+        """Returns (rows, counts), or None once is_cancelled() is true.
+
+        rows are the matching table rows, or None when nothing is filtered;
+        counts maps each of count_fields to {value: matching cards}.
+        """
+        facets = facets or {}
+        rows = None
+        if search_term:
+            index = self.catalog.name_index
+            if is_cancelled and is_cancelled():
+                return None
+            if self.name_search is None or self.name_search.index is not index:
+                self.name_search = NameSearch(index)
+            rows = self.name_search.search(search_term)
+
+        facet_index = self.catalog.facet_index
+        if is_cancelled and is_cancelled():
+            return None
+        within = facet_index.bits_of(rows) if rows is not None else None
+        if facets:
+            bits = facet_index.select(facets)
+            if within is not None:
+                bits &= within
+            rows = facet_index.rows(bits)
+        counts = {field: facet_index.counts(facets, field, within) for field in count_fields}
+        return rows, counts
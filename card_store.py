@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import threading
+
+APP_DIR_NAME = "yugioh_deck_builder"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS cards (
+    seq INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS card_images (
+    card_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    image_id INTEGER,
+    image_url TEXT,
+    image_url_small TEXT,
+    image_url_cropped TEXT,
+    PRIMARY KEY (card_id, position)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    name TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+"""
+
+IMAGE_FIELDS = ('id', 'image_url', 'image_url_small', 'image_url_cropped')
+
+
+def default_cache_dir():
+    """Per-user cache directory, overridable with YGO_CACHE_DIR"""
+    override = os.environ.get("YGO_CACHE_DIR")
+    if override:
+        return override
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, APP_DIR_NAME)
+
+
+class CardStore:
+    """SQLite file holding the parsed card catalog and its image metadata.
+
+    The catalog is stored together with the YGOPRODeck database version it
+    was downloaded at, so a later session can decide whether a refetch is
+    needed without downloading anything else. Data derived from the catalog,
+    such as search indexes, is kept as named blobs and dropped whenever the
+    catalog is replaced.
+    """
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(default_cache_dir(), "cards.sqlite3")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def get_version(self):
+        return self.get_meta('database_version')
+
+    def card_count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+
+    def save_cards(self, cards, version=None):
+        """Replace the stored catalog with cards, recording its database version"""
+        card_rows = []
+        image_rows = []
+        for card in cards:
+            images = card.get('card_images') or []
+            data = {key: value for key, value in card.items() if key != 'card_images'}
+            card_rows.append((card['id'], card['name'], json.dumps(data, separators=(',', ':'))))
+            for position, image in enumerate(images):
+                image_rows.append((card['id'], position) + tuple(image.get(field) for field in IMAGE_FIELDS))
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cards")
+            self._conn.execute("DELETE FROM card_images")
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.executemany("INSERT INTO cards (id, name, data) VALUES (?, ?, ?)", card_rows)
+            self._conn.executemany("INSERT INTO card_images VALUES (?, ?, ?, ?, ?, ?)", image_rows)
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('database_version', ?)",
+                               (version,))
+
+    def load_cards(self):
+        """Return the stored catalog in its original order"""
+        with self._lock:
+            images = {}
+            for row in self._conn.execute("SELECT * FROM card_images ORDER BY card_id, position"):
+                images.setdefault(row[0], []).append(dict(zip(IMAGE_FIELDS, row[2:])))
+            cards = []
+            for card_id, data in self._conn.execute("SELECT id, data FROM cards ORDER BY seq"):
+                card = json.loads(data)
+                if card_id in images:
+                    card['card_images'] = images[card_id]
+                cards.append(card)
+        return cards
+
+    def image_info(self, card_id):
+        """Image metadata for one card, as stored in its card_images list"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM card_images WHERE card_id = ? ORDER BY position", (card_id,)).fetchall()
+        return [dict(zip(IMAGE_FIELDS, row[2:])) for row in rows]
+
+    def save_blob(self, name, data):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO blobs (name, data) VALUES (?, ?)", (name, data))
+
+    def load_blob(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM blobs WHERE name = ?", (name,)).fetchone()
+        return bytes(row[0]) if row else None
@@ -0,0 +1,77 @@
+import codecs
+import json
+import re
+
+# Fields the builder actually reads; everything else (card_sets, card_prices,
+# ygoprodeck_url, ...) is dropped while parsing.
+DEFAULT_FIELDS = (
+    'id', 'name', 'type', 'frameType', 'desc', 'atk', 'def', 'level',
+    'race', 'attribute', 'archetype', 'scale', 'linkval', 'card_images', 'banlist_info',
+)
+IMAGE_KEYS = ('id', 'image_url', 'image_url_small', 'image_url_cropped')
+
+DATA_ARRAY = re.compile(r'"data"\s*:\s*\[')
+WHITESPACE = ' \t\r\n'
+
+
+def project_card(card, fields=DEFAULT_FIELDS):
+    """Copy only the requested fields of a card dict (all of them if fields is None)"""
+    if fields is None:
+        return card
+    projected = {key: card[key] for key in fields if key in card}
+    images = projected.get('card_images')
+    if images:
+        projected['card_images'] = [{key: image[key] for key in IMAGE_KEYS if key in image}
+                                    for image in images]
+    return projected
+
+
+def iter_cards(chunks, fields=DEFAULT_FIELDS):
+    """Yield projected cards from the byte chunks of a cardinfo.php response.
+
+    Only the not-yet-parsed tail of the body is held in memory, so peak usage
+    is one network chunk plus the projected cards, instead of the whole
+    payload decoded into nested dicts at once.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter(chunks)
+    buffer = ''
+    pos = 0
+    in_array = False
+    exhausted = False
+
+    while True:
+        if not in_array:
+            match = DATA_ARRAY.search(buffer)
+            if match:
+                in_array = True
+                pos = match.end()
+                continue
+        else:
+            while pos < len(buffer) and (buffer[pos] in WHITESPACE or buffer[pos] == ','):
+                pos += 1
+            if pos < len(buffer):
+                if buffer[pos] == ']':
+                    return
+                try:
+                    card, end = decoder.raw_decode(buffer, pos)
+                except ValueError:
+                    if exhausted:
+                        raise
+                else:
+                    yield project_card(card, fields)
+                    pos = end
+                    continue
+
+        if exhausted:
+            raise ValueError("Card data ended unexpectedly")
+        # Drop what has been consumed and read the next chunk
+        buffer = buffer[pos:] if in_array else buffer[-16:]
+        pos = 0
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer += text_decoder.decode(b'', final=True)
+        elif chunk:
+            buffer += text_decoder.decode(chunk)
@@ -0,0 +1,157 @@
+import sys
+from array import array
+
+from card_stream import IMAGE_KEYS
+
+# Stored in the numeric columns when a card has no value for the field
+MISSING = -2 ** 31
+
+INTERNED_FIELDS = ('type', 'frameType', 'race', 'attribute', 'archetype')
+NUMERIC_FIELDS = ('atk', 'def', 'level', 'scale', 'linkval')
+# Keys of a card's banlist_info: its status on each format's Forbidden & Limited list
+BANLIST_FORMATS = ('ban_tcg', 'ban_ocg', 'ban_goat')
+
+# Image URLs that follow the standard layout are rebuilt from the image id
+IMAGE_URL_TEMPLATES = (
+    ('image_url', "https://images.ygoprodeck.com/images/cards/{}.jpg"),
+    ('image_url_small', "https://images.ygoprodeck.com/images/cards_small/{}.jpg"),
+    ('image_url_cropped', "https://images.ygoprodeck.com/images/cards_cropped/{}.jpg"),
+)
+
+
+def pack_image(image):
+    """Store a card_images entry as its bare id when its URLs are the standard ones"""
+    image_id = image.get('id')
+    if isinstance(image_id, int) and all(image.get(key) == template.format(image_id)
+                                         for key, template in IMAGE_URL_TEMPLATES):
+        return image_id
+    return tuple(image.get(key) for key in IMAGE_KEYS)
+
+
+def unpack_image(packed):
+    if isinstance(packed, int):
+        image = {'id': packed}
+        for key, template in IMAGE_URL_TEMPLATES:
+            image[key] = template.format(packed)
+        return image
+    return {key: value for key, value in zip(IMAGE_KEYS, packed) if value is not None}
+
+
+class CardTable:
+    """Struct-of-arrays card catalog.
+
+    Each field lives in its own column: ids and stats in typed arrays, text
+    in plain lists, with the small set of type/race/attribute strings
+    interned so all cards share one copy. A card is addressed by its row
+    number; card(row) rebuilds the familiar API-style dict on demand.
+    """
+
+    def __init__(self, cards=()):
+        self.ids = array('q')
+        self.names = []
+        self.names_lower = []
+        self.descs = []
+        self.text = {field: [] for field in INTERNED_FIELDS}
+        self.numbers = {field: array('i') for field in NUMERIC_FIELDS}
+        self.images = []
+        self.bans = {fmt: [] for fmt in BANLIST_FORMATS}
+        self.row_by_id = {}
+        self.row_by_name = {}
+        for card in cards:
+            self.append(card)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, card):
+        """Add one API-style card dict and return its row"""
+        row = len(self.ids)
+        name = card['name']
+        self.ids.append(card['id'])
+        self.names.append(name)
+        self.names_lower.append(name.lower())
+        self.descs.append(card.get('desc', ''))
+        for field, column in self.text.items():
+            value = card.get(field)
+            column.append(sys.intern(value) if value is not None else None)
+        for field, column in self.numbers.items():
+            value = card.get(field)
+            column.append(value if isinstance(value, int) else MISSING)
+        self.images.append(tuple(pack_image(image) for image in card.get('card_images') or ()))
+        banlist_info = card.get('banlist_info') or {}
+        for fmt, column in self.bans.items():
+            status = banlist_info.get(fmt)
+            column.append(sys.intern(status) if status is not None else None)
+        self.row_by_id[card['id']] = row
+        # Keep the first card for a given name, like the old linear scan did
+        self.row_by_name.setdefault(name.lower(), row)
+        return row
+
+    def card(self, row):
+        """Materialize a row as an API-style card dict"""
+        card = {'id': self.ids[row], 'name': self.names[row], 'desc': self.descs[row]}
+        for field, column in self.text.items():
+            if column[row] is not None:
+                card[field] = column[row]
+        for field, column in self.numbers.items():
+            if column[row] != MISSING:
+                card[field] = column[row]
+        if self.images[row]:
+            card['card_images'] = [unpack_image(image) for image in self.images[row]]
+        banlist_info = {fmt: column[row] for fmt, column in self.bans.items() if column[row] is not None}
+        if banlist_info:
+            card['banlist_info'] = banlist_info
+        return card
+
+    def image_url(self, row, key='image_url'):
+        """URL of a row's first card image, or None when it has none"""
+        images = self.images[row]
+        return unpack_image(images[0]).get(key) if images else None
+
+    def view(self, rows=()):
+        return CardView(self, rows)
+
+
+class CardView:
+    """An ordered selection of table rows, held as an index array.
+
+    Views never copy card data; filtering produces a new index array over
+    the same table.
+    """
+
+    __slots__ = ('table', 'rows')
+
+    def __init__(self, table, rows=()):
+        self.table = table
+        self.rows = rows if isinstance(rows, array) else array('I', rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __contains__(self, row):
+        return row in self.rows
+
+    def card(self, index):
+        return self.table.card(self.rows[index])
+
+    def name(self, index):
+        return self.table.names[self.rows[index]]
+
+    def card_id(self, index):
+        return self.table.ids[self.rows[index]]
+
+    def names(self):
+        names = self.table.names
+        return [names[row] for row in self.rows]
+
+    def append(self, row):
+        self.rows.append(row)
+
+    def pop(self, index=-1):
+        return self.rows.pop(index)
+
+    def clear(self):
+        del self.rows[:]
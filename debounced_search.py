@@ -0,0 +1,93 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+
+class DebouncedSearch:
+    """Runs a search for the latest query of a burst of keystrokes, off the Tk thread.
+
+    submit() restarts a short timer on every call, so fast typing produces a
+    single search once the user pauses. The search runs on a worker thread;
+    each submission bumps a generation number, and a result whose generation
+    is no longer current is dropped instead of being applied. search_fn is
+    called as search_fn(query, is_cancelled) on the worker and may return
+    early when is_cancelled() becomes true; on_result(query, result) is
+    called on the Tk thread for the latest query only.
+
+    root is anything with Tk's after/after_cancel methods.
+    """
+
+    def __init__(self, root, search_fn, on_result, delay_ms=120, poll_ms=15):
+        self.root = root
+        self.search_fn = search_fn
+        self.on_result = on_result
+        self.delay_ms = delay_ms
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="card-search")
+        self._results = queue.Queue()
+        self._generation = 0
+        self._pending = 0
+        self._after_id = None
+        self._poll_id = None
+        self._last_query = None
+
+    def submit(self, query, force=False):
+        """Schedule a search for query, superseding anything still queued or running"""
+        if query == self._last_query and not force:
+            return
+        self._last_query = query
+        self._generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self._start, query, self._generation)
+
+    def cancel(self):
+        """Drop any queued or running search"""
+        self._last_query = None
+        self._generation += 1
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _start(self, query, generation):
+        self._after_id = None
+        if generation != self._generation:
+            return
+        self._pending += 1
+        self._executor.submit(self._run, query, generation)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _run(self, query, generation):
+        def is_cancelled():
+            return generation != self._generation
+
+        result = None
+        try:
+            if not is_cancelled():
+                result = self.search_fn(query, is_cancelled)
+        except Exception as e:
+            result = e
+        self._results.put((generation, query, result))
+
+    def _poll(self):
+        self._poll_id = None
+        latest = None
+        while True:
+            try:
+                item = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if item[0] == self._generation:
+                latest = item
+        if latest is not None:
+            _, query, result = latest
+            if isinstance(result, Exception):
+                raise result
+            self.on_result(query, result)
+        if self._pending:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=False)
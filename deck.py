@@ -0,0 +1,164 @@
+MAIN, EXTRA, SIDE = 'main', 'extra', 'side'
+SECTIONS = (MAIN, EXTRA, SIDE)
+SECTION_NAMES = {MAIN: "Main Deck", EXTRA: "Extra Deck", SIDE: "Side Deck"}
+
+# (minimum, maximum) cards per section
+SECTION_LIMITS = {MAIN: (40, 60), EXTRA: (0, 15), SIDE: (0, 15)}
+MAX_COPIES = 3
+# Copies allowed by each status on a Forbidden & Limited list
+BANLIST_LIMITS = {'Forbidden': 0, 'Limited': 1, 'Semi-Limited': 2}
+
+EXTRA_FRAME_TYPES = frozenset({
+    'fusion', 'synchro', 'xyz', 'link', 'fusion_pendulum', 'synchro_pendulum', 'xyz_pendulum',
+})
+EXTRA_TYPE_WORDS = ('Fusion', 'Synchro', 'XYZ', 'Link')
+
+
+class DeckError(Exception):
+    """Raised when an edit would break a copy or section size limit"""
+
+
+def is_extra_deck_card(card_type, frame_type=None):
+    """Fusion, Synchro, Xyz and Link monsters live in the Extra Deck"""
+    if frame_type:
+        return frame_type in EXTRA_FRAME_TYPES
+    return bool(card_type) and 'Monster' in card_type and any(word in card_type for word in EXTRA_TYPE_WORDS)
+
+
+class Deck:
+    """A deck as card id -> copies, split into main, extra and side sections.
+
+    Each section keeps its distinct cards in list order (row -> card id)
+    plus the reverse mapping and the copy counts, so adding, removing and
+    looking up the card behind a list row are all dictionary or list index
+    operations. Removing the last copy of a card moves the section's last
+    card into the freed row instead of shifting everything after it.
+
+    Copy and maximum size limits are checked on every add; minimum sizes
+    only matter for a finished deck, see problems().
+    """
+
+    def __init__(self, table=None):
+        self.table = table
+        self.ids = {section: [] for section in SECTIONS}
+        self.rows = {section: {} for section in SECTIONS}
+        self.counts = {section: {} for section in SECTIONS}
+        self.sizes = dict.fromkeys(SECTIONS, 0)
+        self.copies = {}
+
+    def __len__(self):
+        return sum(self.sizes.values())
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __contains__(self, card_id):
+        return card_id in self.copies
+
+    def default_section(self, card_id):
+        """MAIN or EXTRA, from the card type in the table"""
+        row = self.table.row_by_id.get(card_id) if self.table is not None else None
+        if row is None:
+            return MAIN
+        text = self.table.text
+        return EXTRA if is_extra_deck_card(text['type'][row], text['frameType'][row]) else MAIN
+
+    def check_add(self, card_id, section):
+        if self.copies.get(card_id, 0) >= MAX_COPIES:
+            raise DeckError(f"A deck may hold at most {MAX_COPIES} copies of a card")
+        if self.sizes[section] >= SECTION_LIMITS[section][1]:
+            raise DeckError(f"The {SECTION_NAMES[section]} is full ({SECTION_LIMITS[section][1]} cards)")
+        if section in (MAIN, EXTRA) and self.default_section(card_id) != section:
+            raise DeckError(f"This card belongs in the {SECTION_NAMES[self.default_section(card_id)]}")
+
+    def add(self, card_id, section=None):
+        """Add one copy; returns (section, row, copies in that section).
+
+        With no section, the card goes to the Main or Extra Deck by its type.
+        """
+        if section is None:
+            section = self.default_section(card_id)
+        self.check_add(card_id, section)
+        counts = self.counts[section]
+        row = self.rows[section].get(card_id)
+        if row is None:
+            row = len(self.ids[section])
+            self.ids[section].append(card_id)
+            self.rows[section][card_id] = row
+        counts[card_id] = counts.get(card_id, 0) + 1
+        self.sizes[section] += 1
+        self.copies[card_id] = self.copies.get(card_id, 0) + 1
+        return section, row, counts[card_id]
+
+    def remove(self, card_id, section):
+        """Remove one copy; returns (row, copies left in the section).
+
+        When none are left, the section's last card now sits at row.
+        """
+        counts = self.counts[section]
+        if card_id not in counts:
+            raise DeckError("That card is not in the deck")
+        row = self.rows[section][card_id]
+        counts[card_id] -= 1
+        self.sizes[section] -= 1
+        self.copies[card_id] -= 1
+        if not self.copies[card_id]:
+            del self.copies[card_id]
+        left = counts[card_id]
+        if not left:
+            del counts[card_id]
+            del self.rows[section][card_id]
+            ids = self.ids[section]
+            last = ids.pop()
+            if last != card_id:
+                ids[row] = last
+                self.rows[section][last] = row
+        return row, left
+
+    def card_id_at(self, section, row):
+        return self.ids[section][row]
+
+    def count(self, card_id, section=None):
+        """Copies of a card in one section, or in the whole deck"""
+        if section is None:
+            return self.copies.get(card_id, 0)
+        return self.counts[section].get(card_id, 0)
+
+    def entries(self, section):
+        """(card id, copies) in list order"""
+        counts = self.counts[section]
+        return [(card_id, counts[card_id]) for card_id in self.ids[section]]
+
+    def card_ids(self, section=None):
+        """Every copy's card id, section by section"""
+        sections = SECTIONS if section is None else (section,)
+        return [card_id for name in sections for card_id, copies in self.entries(name) for _ in range(copies)]
+
+    def problems(self, banlist=None):
+        """Why the deck cannot be played yet; empty when it is legal.
+
+        banlist names a Forbidden & Limited list to check against, as a
+        banlist_info key such as 'ban_tcg'.
+        """
+        problems = []
+        for section in SECTIONS:
+            low, high = SECTION_LIMITS[section]
+            if not low <= self.sizes[section] <= high:
+                problems.append(f"{SECTION_NAMES[section]} has {self.sizes[section]} cards ({low}-{high} allowed)")
+        if banlist is not None and self.table is not None:
+            statuses = self.table.bans[banlist]
+            for card_id, copies in self.copies.items():
+                row = self.table.row_by_id.get(card_id)
+                status = statuses[row] if row is not None else None
+                if copies > BANLIST_LIMITS.get(status, MAX_COPIES):
+                    problems.append(f"{self.table.names[row]} is {status}: {copies} in deck, "
+                                    f"{BANLIST_LIMITS[status]} allowed")
+        return problems
+
+    def clear(self):
+        for section in SECTIONS:
+            self.ids[section].clear()
+            self.rows[section].clear()
+            self.counts[section].clear()
+            self.sizes[section] = 0
+        self.copies.clear()
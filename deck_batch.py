@@ -0,0 +1,174 @@
+"""Validate, normalize and convert deck files in bulk, without the GUI.
+
+Every deck under the given folders is checked against the card catalog:
+cards are resolved to ids, section sizes, copy limits and optionally a
+Forbidden & Limited list are checked, and the results are written as a
+JSON report. With --out, each deck is also rewritten in canonical form
+(ids only, cards in their proper sections) as JSON or .ydk.
+
+    python deck_batch.py submissions/ --banlist tcg --out checked/ --format ydk --report report.json
+
+Decks are processed on a pool of worker processes, each holding a
+read-only copy of the catalog table. The exit status is 1 when any deck is
+illegal or unreadable.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from ygocore import (DECK_EXTENSIONS, CatalogError, DeckFile, DeckFormatError, alternate_art_ids, get_catalog,
+                     hydrate, load_deck_file, save_deck_file)
+
+BANLISTS = {'tcg': 'ban_tcg', 'ocg': 'ban_ocg', 'goat': 'ban_goat'}
+REPORT_VERSION = 1
+
+# Catalog snapshot of a worker process, set once by init_worker
+_table = None
+_alternates = None
+
+
+def init_worker(table):
+    global _table, _alternates
+    _table = table
+    _alternates = alternate_art_ids(table)
+
+
+def deck_paths(paths):
+    """Deck files among paths, searching folders recursively, in a stable order"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                found += [os.path.join(directory, name) for name in names
+                          if os.path.splitext(name)[1].lower() in DECK_EXTENSIONS]
+        else:
+            found.append(path)
+    return sorted(found)
+
+
+def output_path(path, out_dir, out_format=None, root=None):
+    """Where the canonical copy of path goes: its place under root, mirrored under out_dir"""
+    relative = os.path.relpath(path, root) if root else os.path.basename(path)
+    base, extension = os.path.splitext(relative)
+    return os.path.join(out_dir, base + (f".{out_format}" if out_format else extension.lower()))
+
+
+def check_deck(path, table, banlist=None, out_dir=None, out_format=None, root=None, alternates=None):
+    """Check one deck file; returns its report entry"""
+    result = {'file': path, 'legal': False}
+    try:
+        deck_file = load_deck_file(path)
+        deck, missing, skipped = hydrate(deck_file, table, alternates)
+        problems = deck.problems(banlist)
+    except (OSError, ValueError, DeckFormatError, CatalogError) as e:
+        result['error'] = str(e)
+        return result
+
+    result.update({
+        'legal': not (missing or skipped or problems),
+        'cards': len(deck),
+        'sections': dict(deck.sizes),
+        'missing': missing,
+        'skipped': skipped,
+        'problems': problems,
+    })
+    if out_dir:
+        target = output_path(path, out_dir, out_format, root)
+        try:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            save_deck_file(target, DeckFile.from_deck(deck))
+            result['output'] = target
+        except OSError as e:
+            result['error'] = str(e)
+    return result
+
+
+def check_in_worker(path, **options):
+    return check_deck(path, _table, alternates=_alternates, **options)
+
+
+def run_batch(paths, table, workers=None, chunksize=8, **options):
+    """Check every deck in paths; options are passed on to check_deck.
+
+    workers=1 runs in this process. Otherwise the table is pickled once
+    into each worker by the pool initializer, not once per deck.
+    """
+    if options.get('out_dir') and paths and 'root' not in options:
+        # Keep the folder layout of the inputs in the output folder
+        options['root'] = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in paths])
+    if workers == 1:
+        alternates = alternate_art_ids(table)
+        return [check_deck(path, table, alternates=alternates, **options) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(table,)) as executor:
+        return list(executor.map(partial(check_in_worker, **options), paths, chunksize=chunksize))
+
+
+def build_report(results, elapsed, banlist=None, catalog_version=None):
+    errors = sum('error' in result for result in results)
+    legal = sum(result['legal'] and 'error' not in result for result in results)
+    return {
+        'version': REPORT_VERSION,
+        'catalog_version': catalog_version,
+        'banlist': banlist,
+        'summary': {'decks': len(results), 'legal': legal, 'illegal': len(results) - legal - errors,
+                    'errors': errors, 'elapsed': round(elapsed, 3)},
+        'decks': results,
+    }
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Validate and convert Yu-Gi-Oh! deck files in bulk.")
+    parser.add_argument('paths', nargs='+', metavar='PATH', help="deck files or folders of them")
+    parser.add_argument('--banlist', choices=sorted(BANLISTS), help="also check this Forbidden & Limited list")
+    parser.add_argument('--out', metavar='DIR', help="write a canonical copy of every readable deck here")
+    parser.add_argument('--format', choices=('json', 'ydk'),
+                        help="file format of the copies (default: same as the source)")
+    parser.add_argument('--report', default='-', metavar='FILE', help="JSON report path (default: stdout)")
+    parser.add_argument('--workers', type=int, help="worker processes (default: one per CPU)")
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', metavar='ARCHIVE', help="record every download into this archive")
+    archive.add_argument('--replay', metavar='ARCHIVE', help="serve every download from this archive, offline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    paths = deck_paths(args.paths)
+    if args.record or args.replay:
+        from ygocore import archive_client, set_client
+        try:
+            set_client(archive_client(args.record, args.replay))
+        except OSError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    catalog = get_catalog()
+    try:
+        catalog.load()
+    except CatalogError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    banlist = BANLISTS.get(args.banlist)
+    start = time.monotonic()
+    results = run_batch(paths, catalog.table, workers=args.workers, banlist=banlist,
+                        out_dir=args.out, out_format=args.format)
+    report = build_report(results, time.monotonic() - start, args.banlist, catalog.version)
+
+    text = json.dumps(report, indent=2)
+    if args.report == '-':
+        print(text)
+    else:
+        with open(args.report, 'w') as f:
+            f.write(text)
+    summary = report['summary']
+    print(f"{summary['decks']} decks: {summary['legal']} legal, {summary['illegal']} illegal, "
+          f"{summary['errors']} failed in {summary['elapsed']:.1f}s", file=sys.stderr)
+    return 0 if summary['legal'] == summary['decks'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
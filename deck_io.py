@@ -0,0 +1,230 @@
+"""Reading and writing deck files: compact JSON, YGOPro .ydk and YDKE URLs.
+
+Every format is read into a DeckFile, which lists the cards of each section
+by id (or by name, for old JSON entries without one), one key per copy.
+hydrate() then turns it into a Deck with dictionary lookups on the local
+catalog table, so opening a deck never touches the network.
+"""
+import base64
+import json
+import os
+import struct
+
+from card_table import unpack_image
+from deck import EXTRA, MAIN, MAX_COPIES, SECTIONS, SIDE, Deck, DeckError
+
+JSON_VERSION = 2
+YDKE_PREFIX = "ydke://"
+# .ydk section headers; the side deck header really does start with '!'
+YDK_HEADERS = {'#main': MAIN, '#extra': EXTRA, '!side': SIDE}
+DECK_EXTENSIONS = ('.json', '.ydk')
+# For the open and save dialogs
+DECK_FILE_TYPES = [("Deck files", "*.json *.ydk"), ("JSON decks", "*.json"), ("YGOPro decks", "*.ydk"),
+                   ("All files", "*.*")]
+
+
+class DeckFormatError(Exception):
+    """Raised when a deck file or URL cannot be parsed"""
+
+
+class DeckFile:
+    """Card keys per section, one per copy: ints are card ids, strings names"""
+
+    def __init__(self, sections=None, names=None):
+        self.sections = {section: list((sections or {}).get(section, ())) for section in SECTIONS}
+        # Saved names of ids, tried when the catalog no longer knows an id
+        self.names = names or {}
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.sections.values())
+
+    def keys(self):
+        return [key for section in SECTIONS for key in self.sections[section]]
+
+    @classmethod
+    def from_deck(cls, deck):
+        return cls({section: deck.card_ids(section) for section in SECTIONS})
+
+
+def counted(keys):
+    """[[key, copies], ...] in first-seen order"""
+    counts = {}
+    for key in keys:
+        counts[key] = counts.get(key, 0) + 1
+    return [[key, copies] for key, copies in counts.items()]
+
+
+def card_key(value):
+    """A deck file entry as a card id (int) or name (str); numeric strings are ids"""
+    if isinstance(value, str):
+        return int(value) if value.strip().isdigit() else value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    raise DeckFormatError(f"Not a card id or name: {value!r}")
+
+
+def format_json(deck_file):
+    data = {'version': JSON_VERSION}
+    for section in SECTIONS:
+        data[section] = counted(deck_file.sections[section])
+    return json.dumps(data, separators=(',', ':'))
+
+
+def parse_json(data):
+    """Version 2 files, or the original list of card entries (one per copy)"""
+    if isinstance(data, list):
+        sections = {section: [] for section in SECTIONS}
+        names = {}
+        for entry in data:
+            if not isinstance(entry, dict) or ('id' not in entry and 'name' not in entry):
+                raise DeckFormatError("Deck entries need an id or a name")
+            if 'name' in entry and not isinstance(entry['name'], str):
+                raise DeckFormatError(f"Not a card name: {entry['name']!r}")
+            # Early files saved ids as strings
+            key = card_key(entry['id'] if 'id' in entry else entry['name'])
+            if 'id' in entry and 'name' in entry:
+                names[key] = entry['name']
+            # Old files have no sections: everything goes in main and is routed by type
+            section = entry.get('section') if entry.get('section') in SECTIONS else MAIN
+            sections[section].append(key)
+        return DeckFile(sections, names)
+    if not isinstance(data, dict) or data.get('version') != JSON_VERSION:
+        raise DeckFormatError("Unsupported deck file version")
+    sections = {}
+    try:
+        for section in SECTIONS:
+            keys = sections[section] = []
+            for key, copies in data.get(section, ()):
+                copies = int(copies)
+                # A deck never holds more, and a huge count would expand into millions of keys
+                if not 1 <= copies <= MAX_COPIES:
+                    raise DeckFormatError(f"{copies} copies of {key!r} in the {section} section")
+                keys += [card_key(key)] * copies
+    except (TypeError, ValueError) as e:
+        raise DeckFormatError(f"Malformed {section} section") from e
+    return DeckFile(sections)
+
+
+def format_ydk(deck_file):
+    lines = ["#created by yugioh-deck-builder"]
+    for header, section in YDK_HEADERS.items():
+        lines.append(header)
+        lines += [str(key) for key in deck_file.sections[section] if isinstance(key, int)]
+    return "\n".join(lines) + "\n"
+
+
+def parse_ydk(text):
+    sections = {section: [] for section in SECTIONS}
+    section = MAIN
+    for line in text.splitlines():
+        line = line.strip()
+        if line in YDK_HEADERS:
+            section = YDK_HEADERS[line]
+        elif line and line[0] not in '#!':
+            try:
+                sections[section].append(int(line))
+            except ValueError:
+                raise DeckFormatError(f"Not a card id: {line!r}") from None
+    return DeckFile(sections)
+
+
+def format_ydke(deck_file):
+    """ydke://<main>!<extra>!<side>! with each part base64 little-endian uint32 ids"""
+    parts = []
+    for section in SECTIONS:
+        ids = [key for key in deck_file.sections[section] if isinstance(key, int)]
+        parts.append(base64.b64encode(struct.pack(f"<{len(ids)}I", *ids)).decode('ascii'))
+    return YDKE_PREFIX + "!".join(parts) + "!"
+
+
+def parse_ydke(url):
+    url = url.strip()
+    if not url.startswith(YDKE_PREFIX):
+        raise DeckFormatError("YDKE URLs start with ydke://")
+    parts = url[len(YDKE_PREFIX):].split("!")
+    if len(parts) < 3:
+        raise DeckFormatError("A YDKE URL has main, extra and side parts")
+    sections = {}
+    for section, part in zip(SECTIONS, parts):
+        try:
+            raw = base64.b64decode(part, validate=True)
+        except ValueError as e:
+            raise DeckFormatError(f"Malformed {section} part") from e
+        if len(raw) % 4:
+            raise DeckFormatError(f"Malformed {section} part")
+        sections[section] = list(struct.unpack(f"<{len(raw) // 4}I", raw))
+    return DeckFile(sections)
+
+
+def is_ydk(path):
+    return os.path.splitext(path)[1].lower() == '.ydk'
+
+
+def load_deck_file(path):
+    """Read a .ydk or JSON deck file"""
+    try:
+        # Windows editors often save UTF-8 with a byte order mark
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            text = f.read()
+    except UnicodeDecodeError as e:
+        raise DeckFormatError(f"Not a deck file: {e}") from e
+    if is_ydk(path):
+        return parse_ydk(text)
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        raise DeckFormatError(f"Not a deck file: {e}") from e
+    return parse_json(data)
+
+
+def save_deck_file(path, deck_file):
+    """Write a .ydk or compact JSON deck file, chosen by extension"""
+    text = format_ydk(deck_file) if is_ydk(path) else format_json(deck_file)
+    temp = f"{path}.tmp"
+    with open(temp, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temp, path)
+
+
+def alternate_art_ids(table):
+    """Image id -> row for alternate artworks, which .ydk files may use as card ids"""
+    rows = {}
+    for row, images in enumerate(table.images):
+        for image in images:
+            image_id = image if isinstance(image, int) else unpack_image(image).get('id')
+            if image_id is not None and image_id != table.ids[row]:
+                rows.setdefault(image_id, row)
+    return rows
+
+
+def hydrate(deck_file, table, alternates=None):
+    """Build a Deck from a DeckFile using only the loaded catalog table.
+
+    Returns (deck, missing, skipped): keys found nowhere in the table, and
+    "name: reason" for cards the deck limits turned away. Saved side deck
+    cards stay in the side deck; the rest are routed by card type.
+    alternates is alternate_art_ids(table), built on first need if omitted.
+    """
+    deck = Deck(table)
+    missing = []
+    skipped = []
+    for section in SECTIONS:
+        for key in deck_file.sections[section]:
+            if isinstance(key, int):
+                row = table.row_by_id.get(key)
+            else:
+                row = table.row_by_name.get(key.strip().lower())
+            if row is None and key in deck_file.names:
+                row = table.row_by_name.get(deck_file.names[key].strip().lower())
+            if row is None and isinstance(key, int):
+                if alternates is None:
+                    alternates = alternate_art_ids(table)
+                row = alternates.get(key)
+            if row is None:
+                missing.append(deck_file.names.get(key, key))
+                continue
+            try:
+                deck.add(table.ids[row], SIDE if section == SIDE else None)
+            except DeckError as e:
+                skipped.append(f"{table.names[row]}: {e}")
+    return deck, missing, skipped
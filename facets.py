@@ -0,0 +1,159 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from card_table import MISSING
+
+CATEGORICAL_FIELDS = ('type', 'race', 'attribute', 'archetype')
+RANGE_FIELDS = ('level', 'atk', 'def', 'scale', 'linkval')
+
+# Set bit positions of every byte value, for turning bitmaps back into rows
+BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+try:
+    popcount = int.bit_count
+except AttributeError:
+    # int.bit_count() is new in Python 3.10
+    def popcount(bits):
+        return bin(bits).count('1')
+
+
+class FacetIndex:
+    """Bitmap indexes over a CardTable's type, race, attribute and stat columns.
+
+    A bitmap is a Python int with bit n set when table row n matches.
+    Every categorical value (e.g. race "Spellcaster") has its own bitmap.
+    Numeric fields keep their distinct values sorted together with
+    cumulative bitmaps: at_most[i] holds every row whose value is
+    <= values[i]. A range is then two bisects and one AND-NOT. Combined
+    filters are ANDs over the whole catalog, and counts are popcounts.
+
+    Filters are a dict of field -> either a collection of accepted values
+    (categorical fields, any of them matches) or a (low, high) pair
+    (numeric fields, inclusive, None for an open end).
+    """
+
+    def __init__(self, table):
+        self.size = len(table)
+        self.all = (1 << self.size) - 1
+        self.categories = {}
+        for field in CATEGORICAL_FIELDS:
+            builders = {}
+            for row, value in enumerate(table.text[field]):
+                if value is not None:
+                    bitmap = builders.get(value)
+                    if bitmap is None:
+                        bitmap = builders[value] = bytearray(self._byte_count())
+                    bitmap[row >> 3] |= 1 << (row & 7)
+            self.categories[field] = {value: int.from_bytes(bitmap, 'little')
+                                      for value, bitmap in builders.items()}
+
+        self.ranges = {}
+        for field in RANGE_FIELDS:
+            column = table.numbers[field]
+            values = sorted({value for value in column if value != MISSING})
+            slot = {value: i for i, value in enumerate(values)}
+            builders = [bytearray(self._byte_count()) for _ in values]
+            for row, value in enumerate(column):
+                if value != MISSING:
+                    builders[slot[value]][row >> 3] |= 1 << (row & 7)
+            at_most = []
+            running = 0
+            for bitmap in builders:
+                running |= int.from_bytes(bitmap, 'little')
+                at_most.append(running)
+            self.ranges[field] = (values, at_most)
+
+    def __len__(self):
+        return self.size
+
+    def _byte_count(self):
+        return (self.size + 7) // 8
+
+    def values(self, field):
+        """Distinct values of a field, sorted"""
+        if field in self.categories:
+            return sorted(self.categories[field])
+        return list(self.ranges[field][0])
+
+    def value_bits(self, field, value):
+        """Rows whose field equals value"""
+        if field in self.categories:
+            return self.categories[field].get(value, 0)
+        return self.range_bits(field, value, value)
+
+    def range_bits(self, field, low=None, high=None):
+        """Rows whose numeric field lies in [low, high]; cards without the stat never match"""
+        values, at_most = self.ranges[field]
+        if not values:
+            return 0
+        top = len(values) - 1 if high is None else bisect_right(values, high) - 1
+        if top < 0:
+            return 0
+        bits = at_most[top]
+        if low is not None:
+            below = bisect_left(values, low) - 1
+            if below >= 0:
+                bits &= ~at_most[below]
+        return bits
+
+    def facet_bits(self, field, condition):
+        if field in self.categories:
+            bits = 0
+            bitmaps = self.categories[field]
+            for value in condition:
+                bits |= bitmaps.get(value, 0)
+            return bits
+        low, high = condition
+        return self.range_bits(field, low, high)
+
+    def select(self, filters, exclude=None):
+        """Bitmap of rows matching every filter, skipping the field named by exclude"""
+        bits = self.all
+        for field, condition in filters.items():
+            if field == exclude or condition is None:
+                continue
+            bits &= self.facet_bits(field, condition)
+            if not bits:
+                break
+        return bits
+
+    def counts(self, filters, field, within=None):
+        """Matching rows per value of field, as {value: count}.
+
+        The field's own filter is left out, so the counts say how many cards
+        each choice would give with everything else kept. within is an
+        optional bitmap (e.g. a name search) to count inside.
+        """
+        bits = self.select(filters, exclude=field)
+        if within is not None:
+            bits &= within
+        if field in self.categories:
+            return {value: popcount(bits & bitmap)
+                    for value, bitmap in self.categories[field].items()}
+        values, at_most = self.ranges[field]
+        counts = {}
+        previous = 0
+        for value, cumulative in zip(values, at_most):
+            counts[value] = popcount(bits & cumulative & ~previous)
+            previous = cumulative
+        return counts
+
+    def bits_of(self, rows):
+        """Bitmap with the given rows set"""
+        bitmap = bytearray(self._byte_count())
+        for row in rows:
+            bitmap[row >> 3] |= 1 << (row & 7)
+        return int.from_bytes(bitmap, 'little')
+
+    def rows(self, bits):
+        """Set rows of a bitmap, ascending"""
+        rows = array('I')
+        data = bits.to_bytes(self._byte_count(), 'little')
+        for offset, byte in enumerate(data):
+            if byte:
+                base = offset << 3
+                rows.extend(base + bit for bit in BYTE_BITS[byte])
+        return rows
+
+    def count(self, bits):
+        return popcount(bits)
@@ -0,0 +1,99 @@
+import re
+
+NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(name):
+    """Lower-case a name and fold punctuation to single spaces ("Blue-Eyes" == "blue eyes")"""
+    return NON_ALNUM.sub(' ', name.lower()).strip()
+
+
+def deletes(word, max_distance):
+    """Every string reachable from word by removing up to max_distance characters"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        variants |= frontier
+    return variants
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance, or max_distance + 1 once it is exceeded.
+
+    Only the diagonal band of width 2 * max_distance + 1 is computed, since
+    any cell outside it already exceeds the limit.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    too_far = max_distance + 1
+    width = len(b) + 1
+    previous2 = None
+    previous = [j if j <= max_distance else too_far for j in range(width)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * width
+        if i <= max_distance:
+            current[0] = i
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        row_min = current[0]
+        char = a[i - 1]
+        for j in range(low, high + 1):
+            value = previous[j - 1] if char == b[j - 1] else previous[j - 1] + 1
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (previous2 is not None and j > 1 and char == b[j - 2] and a[i - 2] == b[j - 1]
+                    and previous2[j - 2] + 1 < value):
+                value = previous2[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else too_far
+
+
+class FuzzyNameIndex:
+    """SymSpell-style typo-tolerant lookup over card names.
+
+    Every name contributes the deletion variants of its first
+    prefix_length characters; a query generates its own variants, and only
+    names sharing one of them are compared with a full edit distance. That
+    keeps the index small while a lookup touches a few dozen names instead
+    of the whole catalog.
+    """
+
+    def __init__(self, names, max_distance=2, prefix_length=7):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.keys = [normalize(name) for name in names]
+        index = {}
+        for row, key in enumerate(self.keys):
+            for variant in deletes(key[:prefix_length], max_distance):
+                index.setdefault(variant, []).append(row)
+        self.index = index
+
+    def lookup(self, query, limit=5, max_distance=None):
+        """Closest names as (row, distance) pairs, best first"""
+        if max_distance is None:
+            max_distance = self.max_distance
+        max_distance = min(max_distance, self.max_distance)
+        key = normalize(query)
+        if not key:
+            return []
+
+        candidates = set()
+        for variant in deletes(key[:self.prefix_length], max_distance):
+            candidates.update(self.index.get(variant, ()))
+
+        matches = []
+        keys = self.keys
+        for row in candidates:
+            distance = edit_distance(key, keys[row], max_distance)
+            if distance <= max_distance:
+                matches.append((distance, abs(len(keys[row]) - len(key)), keys[row], row))
+        matches.sort()
+        return [(row, distance) for distance, _, _, row in matches[:limit]]
@@ -0,0 +1,122 @@
+import os
+import threading
+
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+# Worth retrying: rate limiting and transient server or gateway errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Archive paths that switch the shared client to recording or replaying (see transport.py)
+RECORD_ENV = "YGO_RECORD"
+REPLAY_ENV = "YGO_REPLAY"
+
+
+class HTTPClient:
+    """One requests.Session shared by every network path of the deck builder.
+
+    The session keeps a pool of keep-alive connections per host, so the
+    catalog download and parallel image fetches reuse open TLS connections
+    instead of handshaking each time. Idempotent requests that fail to
+    connect, time out or get a retryable status are retried with
+    exponential backoff, honouring Retry-After. Every request gets separate
+    connect and read timeouts unless the caller passes its own. Responses are
+    requested gzip-compressed and decoded transparently.
+
+    get(..., retry=False) makes a single attempt, for quick checks that
+    have a fallback; those go through a second, retry-free session.
+    """
+
+    def __init__(self, retries=3, backoff_factor=0.3, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, pool_size=16):
+        # requests and urllib3 are only imported once a client is made; see LazyClient
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.timeout = (connect_timeout, read_timeout)
+        retry = Retry(total=retries, connect=retries, read=retries, status=retries,
+                      backoff_factor=backoff_factor, status_forcelist=RETRY_STATUSES,
+                      allowed_methods=frozenset({'GET', 'HEAD'}), raise_on_status=False)
+        self.session = make_session(HTTPAdapter(pool_maxsize=pool_size, max_retries=retry))
+        self.single_attempt_session = make_session(HTTPAdapter(max_retries=0))
+
+    def get(self, url, timeout=None, retry=True, **kwargs):
+        """requests.get through the shared session; timeout defaults to (connect, read)"""
+        session = self.session if retry else self.single_attempt_session
+        return session.get(url, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+    def close(self):
+        self.session.close()
+        self.single_attempt_session.close()
+
+
+def make_session(adapter):
+    import requests
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "User-Agent": "yugioh-deck-builder",
+        "Accept-Encoding": "gzip, deflate",
+    })
+    return session
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+class LazyClient:
+    """A class attribute for an HTTP client: the one assigned, or the shared one from first use.
+
+    Objects created at startup, such as the catalog and the image cache,
+    import nothing network-related until they first go online. requests'
+    exceptions all derive from OSError, so their callers catch OSError
+    without importing requests either.
+
+        class CardImageCache:
+            client = LazyClient()
+    """
+
+    def __set_name__(self, owner, name):
+        self.attribute = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        client = instance.__dict__.get(self.attribute)
+        if client is None:
+            client = instance.__dict__[self.attribute] = get_client()
+        return client
+
+    def __set__(self, instance, client):
+        instance.__dict__[self.attribute] = client
+
+
+def archive_client(record=None, replay=None):
+    """A client recording to the archive at record, or serving only the one at replay.
+
+    With neither it is a plain HTTPClient. A missing replay archive raises
+    FileNotFoundError.
+    """
+    if replay or record:
+        from transport import HTTPArchive, RecordingClient, ReplayClient
+        if replay:
+            return ReplayClient(HTTPArchive(replay, readonly=True))
+        return RecordingClient(HTTPClient(), HTTPArchive(record))
+    return HTTPClient()
+
+
+def get_client():
+    """Return the HTTP client shared by every window in this session"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = archive_client(os.environ.get(RECORD_ENV), os.environ.get(REPLAY_ENV))
+        return _shared_client
+
+
+def set_client(client):
+    """Make client the shared one, such as a ReplayClient chosen on a command line"""
+    global _shared_client
+    with _shared_lock:
+        _shared_client = client
@@ -0,0 +1,206 @@
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from card_store import default_cache_dir
+from http_client import LazyClient
+from perf import annotate
+
+
+# Downloaded files are kept per variant, named after the card_images URL field they come from
+VARIANT_URL_KEYS = {'full': 'image_url', 'small': 'image_url_small'}
+# Pixel size of each variant as served by YGOPRODeck
+VARIANT_SIZES = {'full': (421, 614), 'small': (168, 246)}
+# Resized copies are stored as JPEG: it decodes about 3x faster than PNG at a third of the size
+RESIZED_QUALITY = 92
+
+
+class ImageCacheError(Exception):
+    """Raised when a card image can neither be read from disk nor downloaded"""
+
+
+class ImageLRU:
+    """Least-recently-used cache bounded by a byte budget instead of an entry count.
+
+    Values are stored with the size the caller gives for them (for a decoded
+    image, roughly width * height * 4); once the total goes over max_bytes
+    the least recently used entries are dropped.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+def image_size_bytes(width, height):
+    """Approximate memory held by a decoded RGBA image"""
+    return width * height * 4
+
+
+def pick_variant(size, small_url=None):
+    """The smallest downloadable variant that still covers size"""
+    small = VARIANT_SIZES['small']
+    if small_url and size[0] <= small[0] and size[1] <= small[1]:
+        return 'small'
+    return 'full'
+
+
+def decode_scaled(data, size):
+    """Decode image bytes straight to size.
+
+    For JPEGs, draft mode lets the decoder scale by 1/2, 1/4 or 1/8 in the
+    DCT domain while staying at least as large as size, so the pixels the
+    resize would throw away are never decoded. Only the remaining factor is
+    left to the LANCZOS resize.
+    """
+    image = Image.open(io.BytesIO(data))
+    image.draft(None, size)
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+
+class CardImageCache:
+    """On-disk cache of card images, keyed by card id.
+
+    Downloaded files are kept as-is under full/ (image_url) or small/
+    (image_url_small). Every display size the GUI asks for gets its own
+    pre-scaled copy under <width>x<height>/, so showing a card seen in an
+    earlier session decodes one small file and neither downloads nor
+    resizes anything. Writes go through a temporary file, and a cache
+    directory that cannot be written only costs the disk tier. Downloads
+    share the pooled HTTPClient, fetched on the first download.
+    """
+
+    client = LazyClient()
+
+    def __init__(self, directory=None, timeout=None, client=None):
+        if directory is None:
+            directory = os.path.join(default_cache_dir(), "images")
+        self.directory = directory
+        self.timeout = timeout
+        self.client = client
+
+    def original_path(self, card_id, variant='full'):
+        return os.path.join(self.directory, variant, f"{card_id}.jpg")
+
+    def resized_path(self, card_id, size):
+        return os.path.join(self.directory, f"{size[0]}x{size[1]}", f"{card_id}.jpg")
+
+    def has(self, card_id, size=None, variant='full'):
+        path = self.original_path(card_id, variant) if size is None else self.resized_path(card_id, size)
+        return os.path.exists(path)
+
+    def load_original(self, card_id, url, variant='full'):
+        """Bytes of the downloaded image, fetched only if it is not on disk"""
+        path = self.original_path(card_id, variant)
+        data = self._read(path)
+        if data is not None:
+            return data
+        try:
+            response = self.client.get(url, timeout=self.timeout)
+        except OSError as e:
+            raise ImageCacheError(f"Failed to download image: {e}") from e
+        if response.status_code != 200:
+            raise ImageCacheError(f"Image download failed: {response.status_code}")
+        data = response.content
+        annotate(bytes=len(data))
+        self._write(path, data)
+        return data
+
+    def load(self, card_id, url, size, small_url=None):
+        """The card image as a PIL image resized to size, from the fastest tier that has it.
+
+        With small_url given, sizes that fit within the small variant are
+        made from it instead of the full-size image.
+        """
+        path = self.resized_path(card_id, size)
+        data = self._read(path)
+        if data is not None:
+            try:
+                image = self._decode(data)
+                annotate(cache='hit')
+                return image
+            except (OSError, ValueError):
+                # Damaged cache file: rebuild it below
+                self._remove(path)
+
+        annotate(cache='miss')
+        variant = pick_variant(size, small_url)
+        original = self.load_original(card_id, small_url if variant == 'small' else url, variant)
+        try:
+            image = decode_scaled(original, size)
+        except (OSError, ValueError) as e:
+            self._remove(self.original_path(card_id, variant))
+            raise ImageCacheError(f"Invalid image data for card {card_id}: {e}") from e
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=RESIZED_QUALITY)
+        self._write(path, buffer.getvalue())
+        return image
+
+    @staticmethod
+    def _decode(data):
+        image = Image.open(io.BytesIO(data))
+        image.load()
+        return image
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write(path, data):
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except OSError:
+            CardImageCache._remove(temp)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,328 @@
+"""Mirror card images into the local image cache for offline use.
+
+Downloads the images of the whole catalog, or of the cards of some
+archetypes or deck files, into the same directory the deck builders read
+from. Runs can be interrupted and restarted: finished files are recorded in
+a manifest with their size and SHA-256 and skipped next time, and partial
+downloads are resumed with HTTP range requests.
+
+    python mirror_images.py --archetype "Dark Magician" --decks my_decks/
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+
+from card_catalog import CatalogError, get_catalog
+from deck_io import DECK_EXTENSIONS, DeckFormatError, load_deck_file
+from http_client import archive_client, get_client, set_client
+from image_cache import VARIANT_URL_KEYS, CardImageCache
+
+MANIFEST_NAME = "manifest.json"
+
+
+class MirrorError(Exception):
+    """Raised when one image cannot be downloaded or fails verification"""
+
+
+class TokenBucket:
+    """Allows rate requests per second on average, in bursts of up to capacity"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class Manifest:
+    """Size and SHA-256 of every mirrored file, keyed by its path inside the cache"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r') as f:
+                self.entries = json.load(f).get('files', {})
+        except (OSError, ValueError, AttributeError):
+            self.entries = {}
+
+    def get(self, key):
+        with self._lock:
+            return self.entries.get(key)
+
+    def set(self, key, size, sha256):
+        with self._lock:
+            self.entries[key] = {'size': size, 'sha256': sha256}
+
+    def save(self):
+        with self._lock:
+            data = json.dumps({'version': 1, 'files': self.entries}, indent=0, sort_keys=True)
+        temp = f"{self.path}.tmp"
+        with open(temp, 'w') as f:
+            f.write(data)
+        os.replace(temp, self.path)
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_jobs(table, rows, variants=('full', 'small')):
+    """(card id, variant, url) for the first image of every row"""
+    jobs = []
+    for row in rows:
+        for variant in variants:
+            url = table.image_url(row, VARIANT_URL_KEYS[variant])
+            if url:
+                jobs.append((table.ids[row], variant, url))
+    return jobs
+
+
+def deck_card_keys(directory):
+    """Card ids (or names, for entries without an id) of every deck file in directory.
+
+    Returns (keys, errors); files that cannot be read are skipped and listed
+    in errors as "path: reason".
+    """
+    keys = []
+    errors = []
+    for name in sorted(os.listdir(directory)):
+        if os.path.splitext(name)[1].lower() in DECK_EXTENSIONS:
+            path = os.path.join(directory, name)
+            try:
+                keys += load_deck_file(path).keys()
+            except (OSError, DeckFormatError) as e:
+                errors.append(f"{path}: {e}")
+    return keys, errors
+
+
+class ImageMirror:
+    """Downloads image jobs into a CardImageCache with a worker pool under a global rate limit.
+
+    An existing file is skipped when it matches its manifest entry: its size
+    always, and its hash too with verify=True. Files that are not in the
+    manifest yet are hashed once and recorded. Downloads go to <file>.part
+    and are renamed into place only when complete, so an interrupted run
+    resumes from the partial file.
+    """
+
+    def __init__(self, cache, client=None, workers=8, rate=10.0, verify=False, progress=None):
+        self.cache = cache
+        self.client = client if client is not None else get_client()
+        self.workers = workers
+        self.bucket = TokenBucket(rate)
+        self.verify = verify
+        self.progress = progress
+        self.manifest = Manifest(os.path.join(cache.directory, MANIFEST_NAME))
+        self.stats = {'downloaded': 0, 'resumed': 0, 'skipped': 0, 'failed': 0, 'bytes': 0}
+        self.errors = []
+        self._lock = threading.Lock()
+
+    def _key(self, path):
+        return os.path.relpath(path, self.cache.directory).replace(os.sep, '/')
+
+    def _count(self, stat, amount=1):
+        with self._lock:
+            self.stats[stat] += amount
+
+    def is_mirrored(self, path):
+        """True when path holds a complete, verified copy"""
+        if not os.path.exists(path):
+            return False
+        key = self._key(path)
+        entry = self.manifest.get(key)
+        if entry is None:
+            # Cached by the GUI before the mirror ever ran: record it
+            self.manifest.set(key, os.path.getsize(path), file_sha256(path))
+            return True
+        if os.path.getsize(path) != entry['size']:
+            return False
+        return not self.verify or file_sha256(path) == entry['sha256']
+
+    def fetch(self, card_id, variant, url):
+        path = self.cache.original_path(card_id, variant)
+        if self.is_mirrored(path):
+            self._count('skipped')
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part = f"{path}.part"
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        # Byte ranges only make sense on the raw, unencoded body
+        headers = {'Accept-Encoding': 'identity'}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+
+        self.bucket.acquire()
+        try:
+            with self.client.get(url, headers=headers, stream=True) as response:
+                if response.status_code == 206 and offset:
+                    mode = 'ab'
+                    self._count('resumed')
+                elif response.status_code == 200:
+                    mode, offset = 'wb', 0
+                else:
+                    if response.status_code == 416:
+                        # The partial file is unusable for this server: start over next run
+                        os.remove(part)
+                    raise MirrorError(f"{url}: HTTP {response.status_code}")
+                expected = response.headers.get('Content-Length')
+                written = 0
+                with open(part, mode) as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
+                        written += len(chunk)
+        except requests.RequestException as e:
+            # Whatever arrived stays in the .part file for the next run
+            raise MirrorError(f"{url}: {e}") from e
+
+        self._count('bytes', written)
+        if expected is not None and written != int(expected):
+            raise MirrorError(f"{url}: got {written} of {expected} bytes, will resume")
+        size = offset + written
+        self.manifest.set(self._key(path), size, file_sha256(part))
+        os.replace(part, path)
+        self._count('downloaded')
+
+    def run(self, jobs):
+        """Mirror every (card id, variant, url) job; returns the stats dict"""
+        total = len(jobs)
+        start = time.monotonic()
+        done = 0
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-mirror")
+        futures = []
+        try:
+            futures = [executor.submit(self.fetch, *job) for job in jobs]
+            for future in as_completed(futures):
+                done += 1
+                try:
+                    future.result()
+                except (MirrorError, OSError) as e:
+                    self._count('failed')
+                    self.errors.append(str(e))
+                if done % 100 == 0:
+                    self.manifest.save()
+                if self.progress:
+                    self.progress(done, total, self.stats, time.monotonic() - start)
+        finally:
+            # On Ctrl+C, drop queued jobs instead of waiting for them (cancel_futures needs Python 3.9)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            self.manifest.save()
+        self.stats['elapsed'] = time.monotonic() - start
+        return self.stats
+
+
+def format_report(stats):
+    elapsed = max(stats['elapsed'], 1e-9)
+    megabytes = stats['bytes'] / (1024 * 1024)
+    return (f"{stats['downloaded']} downloaded ({stats['resumed']} resumed), {stats['skipped']} already "
+            f"mirrored, {stats['failed']} failed; {megabytes:.1f} MB in {elapsed:.1f}s "
+            f"({megabytes / elapsed:.2f} MB/s, {stats['downloaded'] / elapsed:.1f} files/s)")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Mirror Yu-Gi-Oh! card images for offline use.")
+    parser.add_argument('--archetype', action='append', default=[],
+                        help="only cards of this archetype (repeatable)")
+    parser.add_argument('--decks', metavar='DIR', action='append', default=[],
+                        help="only cards in the deck files of this folder (repeatable)")
+    parser.add_argument('--variant', choices=('full', 'small', 'both'), default='both',
+                        help="which image size to mirror (default: both)")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent downloads (default: 8)")
+    parser.add_argument('--rate', type=float, default=10.0,
+                        help="maximum requests per second across all workers (default: 10)")
+    parser.add_argument('--verify', action='store_true',
+                        help="re-hash existing files instead of trusting their size")
+    parser.add_argument('--cache-dir', help="image directory (default: the deck builder's cache)")
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument('--record', metavar='ARCHIVE', help="record every download into this archive")
+    archive.add_argument('--replay', metavar='ARCHIVE', help="serve every download from this archive, offline")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.record or args.replay:
+        try:
+            set_client(archive_client(args.record, args.replay))
+        except OSError as e:
+            print(f"Error: {e}")
+            return 1
+    catalog = get_catalog()
+    try:
+        catalog.load()
+    except CatalogError as e:
+        print(f"Error: {e}")
+        return 1
+    table = catalog.table
+
+    if args.archetype or args.decks:
+        rows = set()
+        wanted = {name.lower() for name in args.archetype}
+        rows.update(row for row, archetype in enumerate(table.text['archetype'])
+                    if archetype and archetype.lower() in wanted)
+        for directory in args.decks:
+            keys, errors = deck_card_keys(directory)
+            for error in errors:
+                print(f"Skipping unreadable deck {error}")
+            found, missing = catalog.resolve_rows(keys)
+            rows.update(found)
+            if missing:
+                print(f"{len(missing)} card(s) in {directory} are not in the catalog")
+        rows = sorted(rows)
+    else:
+        rows = range(len(table))
+
+    variants = ('full', 'small') if args.variant == 'both' else (args.variant,)
+    jobs = image_jobs(table, rows, variants)
+    cache = CardImageCache(args.cache_dir)
+    print(f"Mirroring {len(jobs)} images of {len(rows)} cards into {cache.directory}")
+
+    last_report = [0.0]
+
+    def progress(done, total, stats, elapsed):
+        if elapsed - last_report[0] >= 5 or done == total:
+            last_report[0] = elapsed
+            rate = stats['bytes'] / (1024 * 1024) / max(elapsed, 1e-9)
+            print(f"  {done}/{total} images, {rate:.2f} MB/s")
+
+    mirror = ImageMirror(cache, workers=args.workers, rate=args.rate, verify=args.verify, progress=progress)
+    try:
+        stats = mirror.run(jobs)
+    except KeyboardInterrupt:
+        print("Interrupted; run again to resume")
+        return 130
+    print(format_report(stats))
+    for error in mirror.errors[:10]:
+        print(f"  {error}")
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
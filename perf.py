@@ -0,0 +1,219 @@
+"""Timing spans for the hot paths of the deck builder.
+
+Wrap work in span() (or decorate it with timed()) and every run is recorded
+with its wall time, thread, bytes transferred and cache outcome. Code
+running inside a span can add to it with annotate() without knowing who
+opened it; the image cache reports hits, misses and downloaded bytes that
+way. Each span name keeps a rolling window of recent durations for
+percentiles and a histogram, and the recent spans themselves can be
+exported as Chrome trace-event JSON (chrome://tracing or ui.perfetto.dev).
+
+    with span("open_deck", path=path):
+        ...
+"""
+import collections
+import contextlib
+import functools
+import itertools
+import json
+import math
+import os
+import threading
+import time
+
+# Upper edges of the histogram buckets, in milliseconds; the last bucket is open-ended
+BUCKET_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+WINDOW = 1000
+MAX_EVENTS = 20000
+
+
+class RollingHistogram:
+    """Durations of the last `window` runs of one span, plus running totals"""
+
+    def __init__(self, window=WINDOW):
+        self.samples = collections.deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def add(self, duration, args):
+        self.samples.append(duration)
+        self.count += 1
+        self.total += duration
+        self.bytes += args.get('bytes', 0)
+        cache = args.get('cache')
+        if cache == 'hit':
+            self.hits += 1
+        elif cache == 'miss':
+            self.misses += 1
+
+    def percentile(self, fraction):
+        """Nearest-rank percentile of the window, in seconds"""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+    def buckets(self):
+        """[(upper edge in ms or None, runs in the window)] over BUCKET_EDGES_MS"""
+        counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        for duration in self.samples:
+            ms = duration * 1000
+            index = 0
+            while index < len(BUCKET_EDGES_MS) and ms > BUCKET_EDGES_MS[index]:
+                index += 1
+            counts[index] += 1
+        return list(zip(BUCKET_EDGES_MS + (None,), counts))
+
+    def summary(self):
+        looked_up = self.hits + self.misses
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count * 1000 if self.count else 0.0,
+            'p50_ms': self.percentile(0.5) * 1000,
+            'p90_ms': self.percentile(0.9) * 1000,
+            'p99_ms': self.percentile(0.99) * 1000,
+            'max_ms': max(self.samples) * 1000 if self.samples else 0.0,
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / looked_up if looked_up else None,
+        }
+
+
+class PerfRecorder:
+    """Collects spans from any thread into per-name histograms and a bounded event log"""
+
+    def __init__(self, window=WINDOW, max_events=MAX_EVENTS):
+        self.window = window
+        self.enabled = True
+        self.histograms = {}
+        self.events = collections.deque(maxlen=max_events)
+        # Trace thread ids are handed out per thread, as system ids get reused
+        self.thread_names = {}
+        self._thread_ids = itertools.count(1)
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """Time the enclosed block as one run of name; args end up in the trace"""
+        if not self.enabled:
+            yield args
+            return
+        stack = self._stack()
+        stack.append(args)
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            self.record(name, start, end, args)
+
+    def record(self, name, start, end, args=None):
+        """Add a finished span; start and end are time.perf_counter() values"""
+        args = args or {}
+        tid = getattr(self._local, 'tid', None)
+        with self._lock:
+            if tid is None:
+                tid = self._local.tid = next(self._thread_ids)
+                self.thread_names[tid] = threading.current_thread().name
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = RollingHistogram(self.window)
+            histogram.add(end - start, args)
+            self.events.append((name, start, end, tid, args))
+
+    def annotate(self, **args):
+        """Add to the innermost open span of this thread: bytes are summed, anything else replaced"""
+        stack = getattr(self._local, 'stack', None)
+        if not stack:
+            return
+        current = stack[-1]
+        for key, value in args.items():
+            current[key] = current.get(key, 0) + value if key == 'bytes' else value
+
+    def timed(self, name=None):
+        """Decorator recording every call of a function as a span"""
+        def decorate(func):
+            label = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(label):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def stats(self):
+        """{span name: summary} for every span recorded so far"""
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def buckets(self, name):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            return histogram.buckets() if histogram else []
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.events.clear()
+
+    def trace_events(self):
+        """The recorded spans as Chrome trace events, times in microseconds"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            thread_names = dict(self.thread_names)
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': thread_name}}
+                 for tid, thread_name in thread_names.items()]
+        for name, start, end, tid, args in events:
+            trace.append({
+                'name': name, 'cat': 'span', 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': round((start - self.origin) * 1e6, 1), 'dur': round((end - start) * 1e6, 1),
+                'args': {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                         for key, value in args.items()},
+            })
+        return trace
+
+    def export_chrome_trace(self, path):
+        """Write the recorded spans to path as Chrome trace-event JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.trace_events(), 'displayTimeUnit': 'ms'}, f)
+
+
+_shared_recorder = None
+_shared_lock = threading.Lock()
+
+
+def get_recorder():
+    """Return the recorder shared by the whole session"""
+    global _shared_recorder
+    with _shared_lock:
+        if _shared_recorder is None:
+            _shared_recorder = PerfRecorder()
+        return _shared_recorder
+
+
+def span(name, **args):
+    return get_recorder().span(name, **args)
+
+
+def annotate(**args):
+    get_recorder().annotate(**args)
+
+
+def timed(name=None):
+    """Like PerfRecorder.timed, on the shared recorder"""
+    return get_recorder().timed(name)
@@ -0,0 +1,112 @@
+import heapq
+import itertools
+import threading
+
+# Lower runs first: the card being shown, then its list neighbours, then
+# whatever else is on screen, then background work such as deck cards
+SELECTED, NEARBY, VISIBLE, DECK = range(4)
+
+
+class PrefetchPool:
+    """A few daemon workers that run keyed jobs in priority order.
+
+    load(*args) is called once per key. A key is queued at most once:
+    submitting it again at a better priority moves it up the queue, and a
+    key that is already running just gains the callback, which is called as
+    callback(key, result) on the worker thread.
+
+    Jobs submitted under a group are dropped when the group is replaced, so
+    the neighbours of an old selection never delay the new one. With only a
+    few workers, urgent jobs never wait behind more than a handful of
+    background ones.
+    """
+
+    def __init__(self, load, workers=4):
+        self.load = load
+        self._heap = []
+        self._queued = {}
+        self._running = set()
+        self._callbacks = {}
+        self._generations = {}
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [threading.Thread(target=self._work, name=f"image-prefetch-{i}", daemon=True)
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def pending(self):
+        """Number of keys still waiting for a worker"""
+        with self._cond:
+            return sum(1 for entry in self._queued.values() if self._is_live(entry))
+
+    def submit(self, key, args, priority, group=None, callback=None):
+        with self._cond:
+            if callback is not None:
+                self._callbacks.setdefault(key, []).append(callback)
+            if key in self._running:
+                return
+            current = self._queued.get(key)
+            if current is not None and self._is_live(current) and current[0] <= priority:
+                return
+            entry = (priority, next(self._counter), key, args, group, self._generations.get(group, 0))
+            self._queued[key] = entry
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def replace(self, group, items, priority, callback=None):
+        """Drop whatever is still queued for group and queue items, (key, args) pairs, instead"""
+        with self._cond:
+            self._generations[group] = self._generations.get(group, 0) + 1
+            for key, args in items:
+                self.submit(key, args, priority, group, callback)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._heap.clear()
+            self._queued.clear()
+            self._callbacks.clear()
+            self._cond.notify_all()
+
+    def _is_live(self, entry):
+        group = entry[4]
+        return group is None or self._generations.get(group, 0) == entry[5]
+
+    def _next(self):
+        with self._cond:
+            while True:
+                if self._closed:
+                    return None
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                entry = heapq.heappop(self._heap)
+                key = entry[2]
+                if self._queued.get(key) is not entry:
+                    # Superseded by a better-priority copy
+                    continue
+                del self._queued[key]
+                if not self._is_live(entry):
+                    self._callbacks.pop(key, None)
+                    continue
+                self._running.add(key)
+                return entry
+
+    def _work(self):
+        while True:
+            entry = self._next()
+            if entry is None:
+                return
+            key, args = entry[2], entry[3]
+            try:
+                result = self.load(*args)
+            except Exception as e:
+                print(f"Prefetch failed for {key}: {str(e)}")
+                result = None
+            with self._cond:
+                self._running.discard(key)
+                callbacks = self._callbacks.pop(key, ())
+            for callback in callbacks:
+                callback(key, result)
@@ -0,0 +1,78 @@
+from array import array
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """Trigram index over lower-cased card names for substring search.
+
+    A query of three or more characters only has to check the names in the
+    shortest posting list among its trigrams, instead of every name in the
+    catalog. Results are table rows in ascending order.
+    """
+
+    def __init__(self, names_lower):
+        self.names = names_lower
+        postings = {}
+        for row, name in enumerate(names_lower):
+            for gram in trigrams(name):
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: array('I', rows) for gram, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, candidates=None):
+        """Rows whose name contains query, optionally restricted to candidates"""
+        query = query.lower()
+        names = self.names
+        if not query:
+            return array('I', range(len(names))) if candidates is None else array('I', candidates)
+
+        if len(query) >= 3:
+            shortest = None
+            for gram in trigrams(query):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return array('I')
+                if shortest is None or len(posting) < len(shortest):
+                    shortest = posting
+            if candidates is None or len(shortest) < len(candidates):
+                # Every match contains each trigram, so the shortest list bounds the result
+                if candidates is not None:
+                    allowed = set(candidates)
+                    return array('I', (row for row in shortest if row in allowed and query in names[row]))
+                candidates = shortest
+        elif candidates is None:
+            candidates = range(len(names))
+
+        return array('I', (row for row in candidates if query in names[row]))
+
+
+class NameSearch:
+    """Incremental substring search for a search box.
+
+    When the new query extends the previous one (the old query is a
+    substring of the new one), only the previous result set is rescanned.
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.last_query = None
+        self.last_rows = None
+
+    def search(self, query):
+        query = query.lower()
+        if self.last_rows is not None and self.last_query and self.last_query in query:
+            rows = self.index.search(query, self.last_rows)
+        else:
+            rows = self.index.search(query)
+        self.last_query = query
+        self.last_rows = rows
+        return rows
+
+    def reset(self):
+        self.last_query = None
+        self.last_rows = None
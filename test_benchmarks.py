@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from run_benchmarks import BENCHMARKS, format_comparison, run
+from synthetic import make_cards
+
+
+def test_synthetic_catalog_is_deterministic():
+    cards = make_cards(500, seed=3)
+    assert cards == make_cards(500, seed=3)
+    assert cards != make_cards(500, seed=4)
+    assert len({card['name'].lower() for card in cards}) == 500
+    assert len({card['id'] for card in cards}) == 500
+    assert {"Effect Monster", "Spell Card", "Trap Card", "Link Monster"} <= {card['type'] for card in cards}
+    print("✓ Synthetic catalog is deterministic")
+
+
+def test_suite_reports_percentiles_and_memory():
+    results = run(cards=400, latency=0.001, repeat=1, samples=8)
+    assert list(results['results']) == [name for name, _ in BENCHMARKS]
+    assert results['config']['cards'] == 400
+    for name, result in results['results'].items():
+        assert result['samples'] >= 1, name
+        assert result['min_ms'] <= result['p50_ms'] <= result['p90_ms'] <= result['p99_ms'] <= result['max_ms']
+        assert result['peak_kb'] > 0, name
+    # Cold starts download from the stand-in, so they wait out its latency
+    assert results['results']['catalog_load_cold']['min_ms'] >= 1
+
+    text = format_comparison(results, results)
+    assert "+0.0%" in text and "different settings" not in text
+    print("✓ Benchmark suite reports percentiles and memory")
+
+
+if __name__ == "__main__":
+    test_synthetic_catalog_is_deterministic()
+    test_suite_reports_percentiles_and_memory()
@@ -0,0 +1,96 @@
+import json
+from unittest import mock
+
+from card_catalog import LOAD_BATCH_SIZE, CardCatalog, CatalogCancelled
+
+SAMPLE_CARDS = [
+    {"id": 46986414, "name": "Dark Magician", "type": "Normal Monster",
+     "desc": "The ultimate wizard in terms of attack and defense.", "atk": 2500, "def": 2100,
+     "level": 7, "race": "Spellcaster", "attribute": "DARK"},
+    {"id": 89631139, "name": "Blue-Eyes White Dragon", "type": "Normal Monster",
+     "desc": "This legendary dragon is a powerful engine of destruction.", "atk": 3000, "def": 2500,
+     "level": 8, "race": "Dragon", "attribute": "LIGHT"},
+    {"id": 83764718, "name": "Monster Reborn", "type": "Spell Card",
+     "desc": "Target 1 monster in either GY; Special Summon it.", "race": "Normal"},
+]
+
+
+def make_response(cards):
+    body = json.dumps({"data": cards}).encode()
+    response = mock.MagicMock()
+    response.__enter__.return_value = response
+    response.status_code = 200
+    response.json.return_value = {"data": cards}
+    response.iter_content.side_effect = lambda chunk_size: [body[i:i + 40] for i in range(0, len(body), 40)]
+    return response
+
+
+def test_lookup_by_name_and_id():
+    catalog = CardCatalog()
+    catalog.set_cards(SAMPLE_CARDS)
+    assert catalog.get_by_name("dark magician")["id"] == 46986414
+    assert catalog.get_by_name("  BLUE-EYES WHITE DRAGON ")["id"] == 89631139
+    assert catalog.get_by_id("83764718")["name"] == "Monster Reborn"
+    assert catalog.get_by_name("Dark Magician Girl") is None
+    assert catalog.get_by_id("not-an-id") is None
+    print("✓ Name and id lookups resolve against the index")
+
+
+def test_catalog_downloads_once():
+    client = mock.MagicMock()
+    client.get.return_value = make_response(SAMPLE_CARDS)
+    catalog = CardCatalog(url="http://localhost/cardinfo.php", client=client)
+    for _ in range(5):
+        assert catalog.get_by_name("Monster Reborn") is not None
+    catalog_calls = [call for call in client.get.call_args_list if call.args[0] == catalog.url]
+    assert len(catalog_calls) == 1
+    assert len(catalog) == 3
+    print("✓ Catalog is downloaded once per session")
+
+
+def test_resolve_many_reports_unresolved_and_progress():
+    catalog = CardCatalog()
+    catalog.set_cards(SAMPLE_CARDS)
+    calls = []
+    names = ["Dark Magician", "dark magician", "Dark Magican", 89631139, "Pot of Greed"]
+    found, unresolved = catalog.resolve_many(names, progress=lambda done, total: calls.append((done, total)),
+                                             progress_every=2)
+    assert [card["id"] for card in found] == [46986414, 46986414, 89631139]
+    assert unresolved == ["Dark Magican", "Pot of Greed"]
+    assert calls == [(2, 5), (4, 5), (5, 5)]
+    print("✓ Batched resolution returns found cards, misses and progress")
+
+
+def test_load_reports_batches_and_can_be_cancelled():
+    cards = [{"id": i, "name": f"Card {i}", "type": "Spell Card"} for i in range(LOAD_BATCH_SIZE * 2 + 7)]
+    client = mock.MagicMock()
+    client.get.side_effect = lambda *args, **kwargs: make_response(cards)
+
+    batches = []
+    views = []
+    catalog = CardCatalog(url="http://localhost/cardinfo.php", client=client)
+    catalog.load(progress=lambda view, expected: views.append(view) or batches.append((len(view), expected)))
+    assert batches == [(LOAD_BATCH_SIZE, None), (LOAD_BATCH_SIZE * 2, None), (len(cards), None)]
+    assert len(catalog) == len(cards)
+    # Every view covers the cards read so far, over the table the catalog ends up with
+    assert all(view.table is catalog.table for view in views)
+    assert views[0].name(0) == "Card 0" and views[-1].name(len(cards) - 1) == f"Card {len(cards) - 1}"
+
+    batches.clear()
+    catalog = CardCatalog(url="http://localhost/cardinfo.php", client=client)
+    try:
+        catalog.load(progress=lambda batch, expected: batches.append(len(batch)), is_cancelled=lambda: bool(batches))
+        assert False, "the load should have been cancelled"
+    except CatalogCancelled:
+        pass
+    assert batches == [LOAD_BATCH_SIZE] and not catalog.loaded
+    catalog.load()
+    assert len(catalog) == len(cards)
+    print("✓ Loading shows the cards read so far and stops when cancelled")
+
+
+if __name__ == "__main__":
+    test_lookup_by_name_and_id()
+    test_catalog_downloads_once()
+    test_resolve_many_reports_unresolved_and_progress()
+    test_load_reports_batches_and_can_be_cancelled()
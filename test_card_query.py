@@ -0,0 +1,34 @@
+from card_catalog import CardCatalog
+from card_query import CardQuery
+from test_card_catalog import SAMPLE_CARDS
+
+
+def make_query():
+    catalog = CardCatalog()
+    catalog.set_cards(SAMPLE_CARDS)
+    return CardQuery(catalog)
+
+
+def test_names_and_facets_combine():
+    query = make_query()
+    assert query.run("", {}) == (None, {})
+    rows, counts = query.run("dra", {}, ['type'])
+    assert list(rows) == [1]
+    assert counts['type'] == {"Normal Monster": 1, "Spell Card": 0}
+    rows, counts = query.run("", {'type': {"Normal Monster"}, 'atk': (2600, None)}, ['attribute'])
+    assert list(rows) == [1]
+    assert counts['attribute'] == {"DARK": 0, "LIGHT": 1}
+    rows, _ = query.run("dragon", {'attribute': {"DARK"}})
+    assert list(rows) == []
+    print("✓ Name search and facet filters combine")
+
+
+def test_cancelled_queries_stop_early():
+    query = make_query()
+    assert query.run("dark", {}, ['type'], is_cancelled=lambda: True) is None
+    print("✓ A cancelled query returns nothing")
+
+
+if __name__ == "__main__":
+    test_names_and_facets_combine()
+    test_cancelled_queries_stop_early()
@@ -0,0 +1,81 @@
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from card_catalog import CardCatalog
+from card_store import CardStore
+from synthetic import SyntheticAPI, make_cards
+
+
+def make_catalog(server, store):
+    return CardCatalog(url=f"{server.api_base}/cardinfo.php", version_url=f"{server.api_base}/checkDBVer.php",
+                       store=store, timeout=2)
+
+
+def test_catalog_persists_and_revalidates():
+    server = SyntheticAPI(count=20).start()
+    card = server.cards[0]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = CardStore(os.path.join(cache_dir, "cards.sqlite3"))
+        try:
+            first = make_catalog(server, store)
+            first.load()
+            assert server.hits["cardinfo"] == 1
+            assert store.get_version() == "1.0"
+
+            # Same version: a new session is served from disk
+            second = make_catalog(server, store)
+            assert second.get_by_name(card['name'].lower())["desc"] == card['desc']
+            assert second.from_store
+            assert server.hits["cardinfo"] == 1
+            assert second.get_by_id(card['id'])["card_images"][0]["image_url_small"].endswith(f"{card['id']}.jpg")
+
+            # New version: refetch once
+            server.version = "1.1"
+            third = make_catalog(server, store)
+            third.load()
+            assert not third.from_store
+            assert server.hits["cardinfo"] == 2
+            assert store.get_version() == "1.1"
+        finally:
+            server.stop()
+
+        # API unreachable: still works from disk
+        offline = make_catalog(server, store)
+        assert offline.get_by_name(server.cards[-1]['name'])["id"] == server.cards[-1]['id']
+        assert offline.from_store
+        store.close()
+    print("✓ Catalog is stored on disk and refetched only on a new database version")
+
+
+def test_unresponsive_api_does_not_hold_up_the_disk_copy():
+    # Accepts connections but never answers
+    silent = socket.socket()
+    silent.bind(("127.0.0.1", 0))
+    silent.listen(8)
+    base = f"http://127.0.0.1:{silent.getsockname()[1]}"
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = CardStore(os.path.join(cache_dir, "cards.sqlite3"))
+        try:
+            store.save_cards(make_cards(2), "1.0")
+            catalog = CardCatalog(url=f"{base}/cardinfo.php", version_url=f"{base}/checkDBVer.php", store=store,
+                                  version_timeout=0.5)
+            start = time.perf_counter()
+            catalog.load()
+            elapsed = time.perf_counter() - start
+            assert catalog.from_store and len(catalog) == 2
+            # One attempt, not the client's full retry budget
+            assert elapsed < 1.5, elapsed
+        finally:
+            store.close()
+            silent.close()
+    print(f"✓ An unresponsive API delays the disk copy by {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    test_catalog_persists_and_revalidates()
+    test_unresponsive_api_does_not_hold_up_the_disk_copy()
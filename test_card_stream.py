@@ -0,0 +1,52 @@
+import json
+
+from card_stream import iter_cards
+
+PAYLOAD = {
+    "data": [
+        {"id": 46986414, "name": "Dark Magician", "type": "Normal Monster", "desc": "The ultimate wizard ★",
+         "atk": 2500, "def": 2100, "level": 7, "race": "Spellcaster", "attribute": "DARK",
+         "card_sets": [{"set_name": "Legend of Blue Eyes", "set_price": "3.5"}],
+         "card_prices": [{"cardmarket_price": "0.10"}],
+         "card_images": [{"id": 46986414, "image_url": "https://example/46986414.jpg",
+                          "image_url_small": "https://example/small/46986414.jpg"}]},
+        {"id": 83764718, "name": "Monster Reborn", "type": "Spell Card", "desc": "Special Summon it.",
+         "race": "Normal", "ygoprodeck_url": "https://example/monster-reborn"},
+    ],
+    "meta": {"total_rows": 2},
+}
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def test_stream_parse_projects_fields():
+    body = json.dumps(PAYLOAD, ensure_ascii=False, indent=1).encode("utf-8")
+    # Tiny chunks split keys, numbers and the multi-byte star across reads
+    for size in (1, 7, 64, len(body)):
+        cards = list(iter_cards(chunked(body, size)))
+        assert [card["id"] for card in cards] == [46986414, 83764718]
+        assert cards[0]["desc"].endswith("★")
+        assert "card_sets" not in cards[0] and "card_prices" not in cards[0]
+        assert "ygoprodeck_url" not in cards[1]
+        assert cards[0]["card_images"][0]["image_url_small"].endswith("46986414.jpg")
+    print("✓ Streaming parser keeps only the projected fields")
+
+
+def test_stream_parse_custom_projection_and_truncation():
+    body = json.dumps(PAYLOAD).encode()
+    cards = list(iter_cards(chunked(body, 10), fields=("id", "name")))
+    assert cards == [{"id": 46986414, "name": "Dark Magician"}, {"id": 83764718, "name": "Monster Reborn"}]
+    try:
+        list(iter_cards(chunked(body[:len(body) // 2], 10)))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("truncated payload should raise ValueError")
+    print("✓ Custom projections work and truncated payloads are rejected")
+
+
+if __name__ == "__main__":
+    test_stream_parse_projects_fields()
+    test_stream_parse_custom_projection_and_truncation()
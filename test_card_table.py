@@ -0,0 +1,54 @@
+from card_table import CardTable
+from test_card_catalog import SAMPLE_CARDS
+
+
+def test_rows_round_trip_to_card_dicts():
+    table = CardTable(SAMPLE_CARDS)
+    assert len(table) == 3
+    for row, card in enumerate(SAMPLE_CARDS):
+        assert table.card(row) == card
+    # Repeated categorical values share one string object
+    assert table.text["type"][0] is table.text["type"][1]
+    print("✓ Columnar rows rebuild the original card dicts")
+
+
+def test_views_are_index_arrays():
+    table = CardTable(SAMPLE_CARDS)
+    view = table.view([2, 0])
+    assert view.names() == ["Monster Reborn", "Dark Magician"]
+    assert view.card_id(1) == 46986414
+    assert 0 in view and 1 not in view
+    view.append(1)
+    assert view.pop(0) == 2
+    assert list(view) == [0, 1]
+    view.clear()
+    assert len(view) == 0
+    print("✓ Views hold row indexes without copying cards")
+
+
+def test_image_url_of_a_row():
+    card = dict(SAMPLE_CARDS[0], card_images=[
+        {"id": 46986414, "image_url": "https://images.ygoprodeck.com/images/cards/46986414.jpg",
+         "image_url_small": "https://images.ygoprodeck.com/images/cards_small/46986414.jpg",
+         "image_url_cropped": "https://images.ygoprodeck.com/images/cards_cropped/46986414.jpg"}])
+    table = CardTable([card, SAMPLE_CARDS[2]])
+    assert table.image_url(0) == "https://images.ygoprodeck.com/images/cards/46986414.jpg"
+    assert table.image_url(0, 'image_url_small').endswith("cards_small/46986414.jpg")
+    assert table.image_url(1) is None
+    print("✓ Image URLs are rebuilt from the packed image id")
+
+
+def test_banlist_status_per_format():
+    card = dict(SAMPLE_CARDS[2], banlist_info={"ban_tcg": "Limited", "ban_goat": "Limited"})
+    table = CardTable([SAMPLE_CARDS[0], card])
+    assert table.bans["ban_tcg"] == [None, "Limited"]
+    assert table.bans["ban_ocg"] == [None, None]
+    assert table.card(1) == card and "banlist_info" not in table.card(0)
+    print("✓ Banlist statuses are kept per format")
+
+
+if __name__ == "__main__":
+    test_rows_round_trip_to_card_dicts()
+    test_views_are_index_arrays()
+    test_image_url_of_a_row()
+    test_banlist_status_per_format()
@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from card_catalog import CardCatalog
+from http_client import HTTPClient
+from synthetic import SyntheticAPI
+from test_debounced_search import FakeRoot, wait_for
+from ui_dispatch import UIDispatcher
+from yugioh_deck_builder_enhanced import YugiohDeckBuilder
+
+
+class FakeWidget:
+    """Accepts any widget call and ignores it"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class FakeVar:
+    def __init__(self):
+        self.value = None
+
+    def set(self, value):
+        self.value = value
+
+
+def make_builder(catalog):
+    """The deck builder's catalog loading, without a window"""
+    app = YugiohDeckBuilder.__new__(YugiohDeckBuilder)
+    app.root = FakeRoot()
+    app.ui = UIDispatcher(app.root)
+    app.catalog = catalog
+    app.all_cards = app.filtered_cards = catalog.view()
+    app.catalog_cancel = None
+    app.catalog_shown = False
+    app.status_var = FakeVar()
+    app.load_progress = app.load_button = app.card_listbox = FakeWidget()
+    app.filter_cards = lambda event: None
+    return app
+
+
+def test_failed_load_can_be_retried():
+    server = SyntheticAPI(count=50).start()
+    try:
+        catalog = CardCatalog(url=f"{server.api_base}/missing.php", version_url=f"{server.api_base}/checkDBVer.php",
+                              client=HTTPClient(backoff_factor=0))
+        app = make_builder(catalog)
+        app.start_catalog_load()
+        wait_for(app.root, lambda: app.catalog_cancel is None)
+        assert not catalog.loaded and not app.catalog_loading()
+        assert app.status_var.value.startswith("API Error")
+
+        # The next use starts a new load instead of waiting for the failed one
+        catalog.url = f"{server.api_base}/cardinfo.php"
+        assert app.load_catalog() is False
+        assert app.catalog_loading()
+        wait_for(app.root, lambda: app.catalog_cancel is None)
+        assert catalog.loaded and app.load_catalog()
+        assert len(app.all_cards) == 50 and app.listing_catalog()
+    finally:
+        server.stop()
+    print("✓ A failed catalog load is started again on the next use")
+
+
+if __name__ == "__main__":
+    test_failed_load_can_be_retried()
@@ -0,0 +1,83 @@
+import threading
+import time
+
+from debounced_search import DebouncedSearch
+
+
+class FakeRoot:
+    """Minimal stand-in for Tk's after/after_cancel, driven by hand"""
+
+    def __init__(self):
+        self.now = 0
+        self.jobs = {}
+        self.next_id = 0
+
+    def after(self, ms, func, *args):
+        self.next_id += 1
+        self.jobs[self.next_id] = (self.now + ms, func, args)
+        return self.next_id
+
+    def after_cancel(self, job_id):
+        self.jobs.pop(job_id, None)
+
+    def advance(self, ms):
+        self.now += ms
+        while True:
+            due = [(when, job_id) for job_id, (when, _, _) in self.jobs.items() if when <= self.now]
+            if not due:
+                return
+            _, job_id = min(due)
+            _, func, args = self.jobs.pop(job_id)
+            func(*args)
+
+
+def wait_for(root, condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        root.advance(15)
+        time.sleep(0.005)
+
+
+def test_keystroke_burst_runs_one_search():
+    root = FakeRoot()
+    searched, applied = [], []
+    pipeline = DebouncedSearch(root, lambda query, cancelled: searched.append(query) or query.upper(),
+                               lambda query, result: applied.append(result), delay_ms=100)
+    for query in ["d", "da", "dar", "dark"]:
+        pipeline.submit(query)
+        root.advance(30)
+    wait_for(root, lambda: applied)
+    assert searched == ["dark"]
+    assert applied == ["DARK"]
+    pipeline.shutdown()
+    print("✓ A burst of keystrokes coalesces into one search")
+
+
+def test_stale_results_are_dropped():
+    root = FakeRoot()
+    release = threading.Event()
+    applied, seen_cancel = [], []
+
+    def slow_search(query, cancelled):
+        if query == "slow":
+            release.wait(2)
+            seen_cancel.append(cancelled())
+        return query
+
+    pipeline = DebouncedSearch(root, slow_search, lambda query, result: applied.append(result), delay_ms=10)
+    pipeline.submit("slow")
+    root.advance(10)
+    pipeline.submit("fast")
+    release.set()
+    wait_for(root, lambda: applied)
+    time.sleep(0.05)
+    root.advance(50)
+    assert applied == ["fast"]
+    assert seen_cancel == [True]
+    pipeline.shutdown()
+    print("✓ Superseded in-flight searches never reach the list")
+
+
+if __name__ == "__main__":
+    test_keystroke_burst_runs_one_search()
+    test_stale_results_are_dropped()
@@ -0,0 +1,110 @@
+from card_table import CardTable
+from deck import EXTRA, MAIN, MAX_COPIES, SIDE, Deck, DeckError, is_extra_deck_card
+
+CARDS = [
+    {'id': 1, 'name': "Dark Magician", 'type': "Normal Monster", 'frameType': "normal"},
+    {'id': 2, 'name': "Pot of Greed", 'type': "Spell Card", 'frameType': "spell",
+     'banlist_info': {'ban_tcg': "Forbidden", 'ban_goat': "Limited"}},
+    {'id': 3, 'name': "Stardust Dragon", 'type': "Synchro Monster", 'frameType': "synchro"},
+    {'id': 4, 'name': "Decode Talker", 'type': "Link Monster", 'frameType': "link"},
+    {'id': 5, 'name': "Mirror Force", 'type': "Trap Card", 'frameType': "trap"},
+]
+
+
+def make_deck():
+    return Deck(CardTable(CARDS))
+
+
+def test_cards_are_routed_by_type():
+    deck = make_deck()
+    assert deck.add(1) == (MAIN, 0, 1)
+    assert deck.add(3) == (EXTRA, 0, 1)
+    assert deck.add(2) == (MAIN, 1, 1)
+    assert deck.add(1) == (MAIN, 0, 2)
+    assert deck.add(5, SIDE) == (SIDE, 0, 1)
+    assert deck.sizes == {MAIN: 3, EXTRA: 1, SIDE: 1}
+    assert len(deck) == 5
+    assert deck.card_ids() == [1, 1, 2, 3, 5]
+    assert is_extra_deck_card("Fusion Monster")
+    assert not is_extra_deck_card("Spell Card")
+    try:
+        deck.add(4, MAIN)
+        assert False, "a Link Monster cannot go in the Main Deck"
+    except DeckError:
+        pass
+    print("✓ Cards go to the Main or Extra Deck by type")
+
+
+def test_copy_and_size_limits():
+    deck = make_deck()
+    for _ in range(MAX_COPIES - 1):
+        deck.add(1)
+    deck.add(1, SIDE)
+    try:
+        deck.add(1)
+        assert False, "a fourth copy must be refused"
+    except DeckError:
+        pass
+    assert deck.count(1) == MAX_COPIES and deck.count(1, SIDE) == 1
+
+    deck = Deck(CardTable([{'id': i, 'name': f"Xyz {i}", 'type': "XYZ Monster", 'frameType': "xyz"}
+                           for i in range(20)]))
+    for i in range(15):
+        deck.add(i)
+    try:
+        deck.add(15)
+        assert False, "the Extra Deck holds 15 cards"
+    except DeckError:
+        pass
+    assert deck.sizes[EXTRA] == 15
+    print("✓ Copy and section limits are enforced on add")
+
+
+def test_remove_keeps_rows_and_ids_in_step():
+    deck = make_deck()
+    for card_id in (1, 2, 5, 1):
+        deck.add(card_id)
+    assert deck.remove(1, MAIN) == (0, 1)
+    assert deck.card_id_at(MAIN, 0) == 1
+    # Removing the last copy moves the last entry into the freed row
+    assert deck.remove(1, MAIN) == (0, 0)
+    assert deck.entries(MAIN) == [(5, 1), (2, 1)]
+    for row, (card_id, _) in enumerate(deck.entries(MAIN)):
+        assert deck.rows[MAIN][card_id] == row
+    assert 1 not in deck
+    assert deck.remove(2, MAIN) == (1, 0)
+    assert deck.entries(MAIN) == [(5, 1)]
+    try:
+        deck.remove(2, MAIN)
+        assert False, "removing a missing card must fail"
+    except DeckError:
+        pass
+    print("✓ Removals keep the row and id mappings in step")
+
+
+def test_problems_report_section_sizes():
+    deck = make_deck()
+    assert deck.problems() == ["Main Deck has 0 cards (40-60 allowed)"]
+    deck.clear()
+    assert not deck and deck.entries(MAIN) == []
+    print("✓ An undersized Main Deck is reported")
+
+
+def test_banlist_problems():
+    deck = make_deck()
+    deck.add(2)
+    deck.add(2, SIDE)
+    problems = deck.problems('ban_tcg')
+    assert "Pot of Greed is Forbidden: 2 in deck, 0 allowed" in problems
+    assert "Pot of Greed is Limited: 2 in deck, 1 allowed" in deck.problems('ban_goat')
+    assert not any("Pot of Greed" in problem for problem in deck.problems('ban_ocg'))
+    assert not any("Pot of Greed" in problem for problem in deck.problems())
+    print("✓ Forbidden and Limited cards are reported per banlist")
+
+
+if __name__ == "__main__":
+    test_cards_are_routed_by_type()
+    test_copy_and_size_limits()
+    test_remove_keeps_rows_and_ids_in_step()
+    test_problems_report_section_sizes()
+    test_banlist_problems()
@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from card_table import CardTable
+from deck import MAIN, SIDE
+from deck_batch import build_report, deck_paths, run_batch
+from deck_io import DeckFile, load_deck_file, save_deck_file
+
+CARDS = [{'id': 1000 + i, 'name': f"Monster {i}", 'type': "Effect Monster", 'frameType': "effect"}
+         for i in range(40)]
+CARDS.append({'id': 55144522, 'name': "Pot of Greed", 'type': "Spell Card", 'frameType': "spell",
+              'banlist_info': {'ban_tcg': "Forbidden"}})
+CARDS.append({'id': 44508094, 'name': "Stardust Dragon", 'type': "Synchro Monster", 'frameType': "synchro"})
+
+
+def write_decks(directory):
+    legal = DeckFile({MAIN: [1000 + i for i in range(40)] + [44508094], SIDE: [1000, 1001]})
+    save_deck_file(os.path.join(directory, "legal.ydk"), legal)
+    os.makedirs(os.path.join(directory, "round2"))
+    with open(os.path.join(directory, "round2", "named.json"), 'w') as f:
+        json.dump([{'name': "Pot of Greed"}] + [{'name': f"Monster {i}"} for i in range(39)] +
+                  [{'name': "Unknown Card"}], f)
+    with open(os.path.join(directory, "broken.json"), 'w') as f:
+        f.write("{not json")
+    with open(os.path.join(directory, "bad_key.json"), 'w') as f:
+        json.dump({'version': 2, 'main': [[1.5, 1]]}, f)
+
+
+def test_batch_checks_and_converts_in_worker_processes():
+    with tempfile.TemporaryDirectory() as directory:
+        decks = os.path.join(directory, "decks")
+        out = os.path.join(directory, "out")
+        os.makedirs(decks)
+        write_decks(decks)
+        paths = deck_paths([decks])
+        assert [os.path.relpath(path, decks) for path in paths] == \
+            ["bad_key.json", "broken.json", "legal.ydk", os.path.join("round2", "named.json")]
+
+        results = run_batch(paths, CardTable(CARDS), workers=2, banlist='ban_tcg', out_dir=out, out_format='json')
+        bad_key, broken, legal, named = results
+        assert 'error' in broken and not broken['legal']
+        assert 'error' in bad_key and not bad_key['legal']
+        assert legal['legal'] and legal['sections'] == {'main': 40, 'extra': 1, 'side': 2}
+        assert not named['legal']
+        assert named['missing'] == ["Unknown Card"]
+        assert named['problems'] == ["Pot of Greed is Forbidden: 1 in deck, 0 allowed"]
+
+        # Names are resolved to ids and the folder layout is kept
+        converted = load_deck_file(os.path.join(out, "round2", "named.json"))
+        assert converted.sections[MAIN][0] == 55144522
+        assert load_deck_file(os.path.join(out, "legal.json")).sections[SIDE] == [1000, 1001]
+
+        summary = build_report(results, 0.5)['summary']
+        assert summary == {'decks': 4, 'legal': 1, 'illegal': 1, 'errors': 2, 'elapsed': 0.5}
+    print("✓ Deck folders are checked, converted and reported by a process pool")
+
+
+def test_cli_does_not_import_tk():
+    code = "import sys, deck_batch; sys.exit('tkinter' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__))).returncode == 0
+    print("✓ The batch CLI runs without Tk")
+
+
+if __name__ == "__main__":
+    test_batch_checks_and_converts_in_worker_processes()
+    test_cli_does_not_import_tk()
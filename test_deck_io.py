@@ -0,0 +1,114 @@
+import base64
+import json
+import os
+import struct
+import tempfile
+import time
+
+from card_table import CardTable
+from deck import EXTRA, MAIN, SIDE
+from deck_io import (DeckFile, DeckFormatError, format_ydke, hydrate, load_deck_file, parse_json,
+                     parse_ydk, parse_ydke, save_deck_file)
+
+CARDS = [
+    {'id': 46986414, 'name': "Dark Magician", 'type': "Normal Monster", 'frameType': "normal",
+     'card_images': [{'id': 46986414}, {'id': 36996508}]},
+    {'id': 55144522, 'name': "Pot of Greed", 'type': "Spell Card", 'frameType': "spell"},
+    {'id': 44508094, 'name': "Stardust Dragon", 'type': "Synchro Monster", 'frameType': "synchro"},
+    {'id': 44095762, 'name': "Mirror Force", 'type': "Trap Card", 'frameType': "trap"},
+]
+SAMPLE = DeckFile({MAIN: [46986414, 46986414, 55144522], EXTRA: [44508094], SIDE: [44095762]})
+
+
+def test_files_round_trip():
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("deck.json", "deck.ydk"):
+            path = os.path.join(directory, name)
+            save_deck_file(path, SAMPLE)
+            assert load_deck_file(path).sections == SAMPLE.sections, name
+        with open(os.path.join(directory, "deck.json")) as f:
+            assert json.load(f)['main'] == [[46986414, 2], [55144522, 1]]
+        for name in ("bom.ydk", "bom.json"):
+            path = os.path.join(directory, name)
+            text = "#main\n46986414\n" if name.endswith(".ydk") else '{"version":2,"main":[[46986414,1]]}'
+            with open(path, 'w', encoding='utf-8-sig') as f:
+                f.write(text)
+            assert load_deck_file(path).sections[MAIN] == [46986414], name
+    print("✓ JSON and .ydk deck files round-trip, with or without a byte order mark")
+
+
+def test_ydk_and_ydke_parsing():
+    text = "#created by someone\n#main\n46986414\n46986414\n#extra\n44508094\n!side\n44095762\n"
+    assert parse_ydk(text).sections == {MAIN: [46986414, 46986414], EXTRA: [44508094], SIDE: [44095762]}
+    main = base64.b64encode(struct.pack("<2I", 46986414, 55144522)).decode()
+    url = f"ydke://{main}!!{base64.b64encode(struct.pack('<I', 44095762)).decode()}!"
+    assert parse_ydke(url).sections == {MAIN: [46986414, 55144522], EXTRA: [], SIDE: [44095762]}
+    assert parse_ydke(format_ydke(SAMPLE)).sections == SAMPLE.sections
+    for bad in ("https://example.com", "ydke://AAA!", "ydke://???!!!"):
+        try:
+            parse_ydke(bad)
+            assert False, bad
+        except DeckFormatError:
+            pass
+    print("✓ .ydk text and YDKE URLs parse")
+
+
+def test_old_json_decks_still_load():
+    deck_file = parse_json([{'id': 1, 'name': "Pot of Greed", 'type': "Spell Card"},
+                            {'name': "Dark Magician"}, {'id': 44095762, 'name': "Mirror Force", 'section': SIDE}])
+    deck, missing, skipped = hydrate(deck_file, CardTable(CARDS))
+    # The unknown id falls back to its saved name
+    assert deck.entries(MAIN) == [(55144522, 1), (46986414, 1)]
+    assert deck.entries(SIDE) == [(44095762, 1)]
+    assert missing == [] and skipped == []
+    print("✓ Original JSON deck files still load")
+
+
+def test_json_keys_are_checked():
+    # String ids, as in the earliest deck files, are ids, with the saved name as a fallback
+    deck_file = parse_json([{'id': "46986414", 'name': "Dark Magician"}, {'id': "1", 'name': "Pot of Greed"}])
+    assert deck_file.sections[MAIN] == [46986414, 1]
+    deck, missing, _ = hydrate(deck_file, CardTable(CARDS))
+    assert deck.entries(MAIN) == [(46986414, 1), (55144522, 1)] and missing == []
+    for bad in ({'version': 2, 'main': [[1.5, 1]]}, {'version': 2, 'main': [[True, 1]]},
+                {'version': 2, 'main': [[None, 1]]}, [{'id': None, 'name': "x"}], [{'id': [1]}],
+                [{'id': 1, 'name': 5}], [{'name': False}], {'version': 2, 'main': [[1, 10 ** 9]]},
+                {'version': 2, 'main': [[1, 0]]}, {'version': 2, 'side': [[1, -2]]}):
+        try:
+            parse_json(bad)
+            assert False, bad
+        except DeckFormatError:
+            pass
+    print("✓ JSON deck keys must be card ids or names, with 1 to 3 copies")
+
+
+def test_hydrate_routes_and_reports():
+    deck_file = DeckFile({MAIN: [36996508, 44508094, 99999999] + [55144522] * 4})
+    deck, missing, skipped = hydrate(deck_file, CardTable(CARDS))
+    # Alternate artwork ids resolve to their card; Extra Deck monsters move out of main
+    assert deck.entries(MAIN) == [(46986414, 1), (55144522, 3)]
+    assert deck.entries(EXTRA) == [(44508094, 1)]
+    assert missing == [99999999]
+    assert len(skipped) == 1 and skipped[0].startswith("Pot of Greed")
+    print("✓ Hydration resolves alternate art and reports missing and skipped cards")
+
+
+def test_hydrate_is_fast_on_a_full_catalog():
+    cards = [{'id': i, 'name': f"Card {i}", 'type': "Effect Monster", 'frameType': "effect"} for i in range(14000)]
+    table = CardTable(cards)
+    deck_file = DeckFile({MAIN: [i * 200 for i in range(20) for _ in range(3)]})
+    start = time.perf_counter()
+    deck, missing, _ = hydrate(deck_file, table)
+    elapsed = time.perf_counter() - start
+    assert len(deck) == 60 and not missing
+    assert elapsed < 0.01, elapsed
+    print(f"✓ Hydrated a 60-card deck in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    test_files_round_trip()
+    test_ydk_and_ydke_parsing()
+    test_old_json_decks_still_load()
+    test_json_keys_are_checked()
+    test_hydrate_routes_and_reports()
+    test_hydrate_is_fast_on_a_full_catalog()
@@ -0,0 +1,109 @@
+import random
+import time
+
+from card_table import CardTable
+from facets import FacetIndex
+
+RACES = ["Spellcaster", "Dragon", "Warrior", "Fiend", "Zombie", "Machine"]
+ATTRIBUTES = ["DARK", "LIGHT", "EARTH", "WATER", "FIRE", "WIND"]
+
+
+def make_cards(count, seed=11):
+    rng = random.Random(seed)
+    cards = []
+    for i in range(count):
+        if rng.random() < 0.3:
+            cards.append({'id': i, 'name': f"Spell {i}", 'type': "Spell Card", 'race': "Normal"})
+            continue
+        card = {'id': i, 'name': f"Monster {i}", 'type': "Effect Monster",
+                'race': rng.choice(RACES), 'attribute': rng.choice(ATTRIBUTES),
+                'atk': rng.randrange(0, 5001, 100), 'def': rng.randrange(0, 5001, 100)}
+        if rng.random() < 0.1:
+            card['type'] = "Link Monster"
+            card['linkval'] = rng.randint(1, 5)
+            del card['def']
+        else:
+            card['level'] = rng.randint(1, 12)
+        cards.append(card)
+    return cards
+
+
+def matches(card, filters):
+    for field, condition in filters.items():
+        if isinstance(condition, tuple):
+            low, high = condition
+            value = card.get(field)
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                return False
+        elif card.get(field) not in condition:
+            return False
+    return True
+
+
+def test_select_matches_linear_scan():
+    cards = make_cards(3000)
+    index = FacetIndex(CardTable(cards))
+    queries = [
+        {'attribute': {"DARK"}, 'race': {"Spellcaster"}, 'level': (None, 4), 'atk': (1500, None)},
+        {'race': {"Dragon", "Warrior"}, 'def': (1000, 2000)},
+        {'type': {"Spell Card"}},
+        {'linkval': (2, 3), 'attribute': {"LIGHT"}},
+        {'atk': (5001, None)},
+        {'level': (4, 4)},
+        {},
+    ]
+    for filters in queries:
+        expected = [row for row, card in enumerate(cards) if matches(card, filters)]
+        assert list(index.rows(index.select(filters))) == expected, filters
+    print("✓ Bitmap filters match a linear scan")
+
+
+def test_counts_leave_out_their_own_facet():
+    cards = make_cards(3000)
+    index = FacetIndex(CardTable(cards))
+    filters = {'attribute': {"DARK"}, 'level': (None, 4)}
+
+    counts = index.counts(filters, 'attribute')
+    others = {'level': (None, 4)}
+    for attribute in ATTRIBUTES:
+        expected = sum(1 for card in cards if card.get('attribute') == attribute and matches(card, others))
+        assert counts[attribute] == expected, attribute
+
+    levels = index.counts(filters, 'level')
+    for level in range(1, 13):
+        expected = sum(1 for card in cards if card.get('level') == level and card.get('attribute') == "DARK")
+        assert levels[level] == expected, level
+
+    within = index.bits_of(range(0, 3000, 2))
+    races = index.counts(filters, 'race', within=within)
+    expected = sum(1 for row, card in enumerate(cards)
+                   if row % 2 == 0 and card.get('race') == "Dragon" and matches(card, filters))
+    assert races["Dragon"] == expected
+    print("✓ Per-facet counts ignore the facet's own selection")
+
+
+def test_bitmap_round_trip():
+    index = FacetIndex(CardTable(make_cards(1000)))
+    rows = [0, 7, 8, 9, 500, 999]
+    assert list(index.rows(index.bits_of(rows))) == rows
+    assert index.count(index.bits_of(rows)) == len(rows)
+    assert list(index.rows(0)) == []
+    print("✓ Rows convert to bitmaps and back")
+
+
+def test_combined_query_over_full_catalog_is_fast():
+    index = FacetIndex(CardTable(make_cards(14000)))
+    filters = {'attribute': {"DARK"}, 'race': {"Spellcaster"}, 'level': (None, 4), 'atk': (1500, None)}
+    start = time.perf_counter()
+    for _ in range(100):
+        index.select(filters)
+    elapsed = (time.perf_counter() - start) / 100
+    assert elapsed < 0.001, elapsed
+    print(f"✓ Combined facet query over 14k cards took {elapsed * 1e6:.0f} µs")
+
+
+if __name__ == "__main__":
+    test_select_matches_linear_scan()
+    test_counts_leave_out_their_own_facet()
+    test_bitmap_round_trip()
+    test_combined_query_over_full_catalog_is_fast()
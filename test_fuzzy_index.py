@@ -0,0 +1,48 @@
+import time
+
+from fuzzy_index import FuzzyNameIndex, edit_distance
+from test_search_index import make_names
+
+NAMES = ["Dark Magician", "Dark Magician Girl", "Blue-Eyes White Dragon", "Blue-Eyes Ultimate Dragon",
+         "Red-Eyes Black Dragon", "Elemental HERO Neos", "Monster Reborn", "Pot of Greed"]
+
+
+def test_edit_distance():
+    assert edit_distance("magician", "magican", 2) == 1
+    assert edit_distance("greed", "gered", 2) == 1
+    assert edit_distance("reborn", "rebron", 2) == 1
+    assert edit_distance("dragon", "wagon", 1) == 2
+    print("✓ Edit distance counts insertions, deletions and transpositions")
+
+
+def test_typos_resolve_to_the_intended_card():
+    index = FuzzyNameIndex(NAMES)
+    best = {query: NAMES[index.lookup(query, limit=1)[0][0]] for query in
+            ["Blue Eyes White Dragon", "Dark Magican", "dark magician gril", "Pot fo Greed", "Elemental Hero Nos"]}
+    assert best == {
+        "Blue Eyes White Dragon": "Blue-Eyes White Dragon",
+        "Dark Magican": "Dark Magician",
+        "dark magician gril": "Dark Magician Girl",
+        "Pot fo Greed": "Pot of Greed",
+        "Elemental Hero Nos": "Elemental HERO Neos",
+    }
+    assert index.lookup("Completely Unknown Card") == []
+    print("✓ Misspelled names rank the intended card first")
+
+
+def test_lookup_is_fast_on_a_full_catalog():
+    names = make_names(14000)
+    index = FuzzyNameIndex(names)
+    start = time.perf_counter()
+    for name in names[:200]:
+        typo = name[:3] + name[4:]
+        assert index.lookup(typo, limit=3)
+    elapsed = (time.perf_counter() - start) / 200
+    assert elapsed < 0.05, elapsed
+    print(f"✓ Fuzzy lookup over 14k names takes {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    test_edit_distance()
+    test_typos_resolve_to_the_intended_card()
+    test_lookup_is_fast_on_a_full_catalog()
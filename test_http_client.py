@@ -0,0 +1,85 @@
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from http_client import HTTPClient
+from synthetic import LocalServer, QuietHandler
+
+
+class FlakyServer(LocalServer):
+    """Answers 503 to the first `failures` requests, then a gzip-compressed body"""
+
+    def __init__(self, failures=0):
+        super().__init__(FlakyHandler)
+        self.failures = failures
+        self.client_ports = set()
+
+
+class FlakyHandler(QuietHandler):
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        if self.server.requests <= self.server.failures:
+            self.send_body(503, b"")
+            return
+        self.send_body(200, gzip.compress(b"card data" * 100), headers=[("Content-Encoding", "gzip")])
+
+
+def test_retries_transient_errors():
+    server = FlakyServer(failures=2).start()
+    client = HTTPClient(retries=3, backoff_factor=0)
+    try:
+        response = client.get(f"{server.base}/cardinfo.php")
+        assert response.status_code == 200
+        assert response.content == b"card data" * 100
+        assert server.requests == 3
+    finally:
+        client.close()
+        server.stop()
+    print("✓ Transient 503s are retried and gzip bodies decoded")
+
+
+def test_gives_up_after_retry_budget():
+    server = FlakyServer(failures=10).start()
+    client = HTTPClient(retries=2, backoff_factor=0)
+    try:
+        assert client.get(f"{server.base}/cardinfo.php").status_code == 503
+        assert server.requests == 3
+    finally:
+        client.close()
+        server.stop()
+    print("✓ The last response is returned once retries run out")
+
+
+def test_single_attempt_skips_retries():
+    server = FlakyServer(failures=10).start()
+    client = HTTPClient(retries=3, backoff_factor=0)
+    try:
+        assert client.get(f"{server.base}/checkDBVer.php", retry=False).status_code == 503
+        assert server.requests == 1
+    finally:
+        client.close()
+        server.stop()
+    print("✓ retry=False makes a single attempt")
+
+
+def test_connections_are_kept_alive():
+    server = FlakyServer().start()
+    client = HTTPClient()
+    try:
+        for _ in range(5):
+            assert client.get(f"{server.base}/image.jpg").status_code == 200
+        assert len(server.client_ports) == 1
+        assert client.timeout == (5, 30)
+    finally:
+        client.close()
+        server.stop()
+    print("✓ Sequential requests reuse one pooled connection")
+
+
+if __name__ == "__main__":
+    test_retries_transient_errors()
+    test_gives_up_after_retry_budget()
+    test_single_attempt_skips_retries()
+    test_connections_are_kept_alive()
@@ -0,0 +1,111 @@
+import io
+import os
+import tempfile
+from unittest import mock
+
+from PIL import Image
+
+from image_cache import CardImageCache, ImageCacheError, ImageLRU, decode_scaled
+
+URL = "https://images.ygoprodeck.com/images/cards/46986414.jpg"
+
+
+def make_jpeg(width=421, height=614):
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (120, 30, 200)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def make_client(data=b"", status_code=200):
+    response = mock.MagicMock()
+    response.status_code = status_code
+    response.content = data
+    client = mock.MagicMock()
+    client.get.return_value = response
+    return client
+
+
+def test_lru_evicts_by_bytes():
+    lru = ImageLRU(max_bytes=100)
+    lru.put("a", "A", 40)
+    lru.put("b", "B", 40)
+    assert lru.get("a") == "A"  # "b" is now the least recently used
+    lru.put("c", "C", 40)
+    assert "b" not in lru and "a" in lru and "c" in lru
+    assert lru.total_bytes == 80
+    lru.put("a", "A2", 10)
+    assert lru.get("a") == "A2" and lru.total_bytes == 50
+    print("✓ Memory cache evicts least recently used entries past its byte budget")
+
+
+def test_disk_cache_survives_restart():
+    with tempfile.TemporaryDirectory() as directory:
+        client = make_client(make_jpeg())
+        image = CardImageCache(directory, client=client).load(46986414, URL, (250, 350))
+        assert image.size == (250, 350)
+        assert client.get.call_count == 1
+
+        client = make_client()
+        cache = CardImageCache(directory, client=client)
+        assert cache.has(46986414) and cache.has(46986414, (250, 350))
+        assert cache.load(46986414, URL, (250, 350)).size == (250, 350)
+        # A new size is resized from the original on disk
+        assert cache.load(46986414, URL, (200, 300)).size == (200, 300)
+        assert client.get.call_count == 0
+    print("✓ Images seen in an earlier session load without a download")
+
+
+def test_damaged_resized_file_is_rebuilt():
+    with tempfile.TemporaryDirectory() as directory:
+        client = make_client(make_jpeg())
+        cache = CardImageCache(directory, client=client)
+        cache.load(1, URL, (250, 350))
+        with open(cache.resized_path(1, (250, 350)), 'wb') as f:
+            f.write(b"not an image")
+        assert cache.load(1, URL, (250, 350)).size == (250, 350)
+        assert client.get.call_count == 1
+        assert os.path.getsize(cache.resized_path(1, (250, 350))) > 100
+    print("✓ A damaged cache file is rebuilt from the original")
+
+
+def test_failed_download_raises():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CardImageCache(directory, client=make_client(status_code=404))
+        try:
+            cache.load(2, URL, (250, 350))
+        except ImageCacheError:
+            pass
+        else:
+            raise AssertionError("expected ImageCacheError")
+        assert not cache.has(2)
+    print("✓ Failed downloads raise ImageCacheError and cache nothing")
+
+
+def test_small_sizes_come_from_the_small_variant():
+    with tempfile.TemporaryDirectory() as directory:
+        client = make_client(make_jpeg(168, 246))
+        cache = CardImageCache(directory, client=client)
+        small_url = URL.replace("/cards/", "/cards_small/")
+        image = cache.load(46986414, URL, (84, 123), small_url=small_url)
+        assert image.size == (84, 123)
+        assert client.get.call_args.args[0] == small_url
+        assert cache.has(46986414, variant='small') and not cache.has(46986414)
+    print("✓ Sizes that fit the small variant skip the full-size download")
+
+
+def test_draft_decode_matches_full_decode():
+    data = make_jpeg()
+    fast = decode_scaled(data, (100, 146))
+    slow = Image.open(io.BytesIO(data)).resize((100, 146), Image.Resampling.LANCZOS)
+    assert fast.size == slow.size == (100, 146)
+    assert all(abs(a - b) <= 3 for a, b in zip(fast.getpixel((50, 70)), slow.getpixel((50, 70))))
+    print("✓ Draft-mode decoding gives the same picture at the target size")
+
+
+if __name__ == "__main__":
+    test_lru_evicts_by_bytes()
+    test_disk_cache_survives_restart()
+    test_damaged_resized_file_is_rebuilt()
+    test_failed_download_raises()
+    test_small_sizes_come_from_the_small_variant()
+    test_draft_decode_matches_full_decode()
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+from card_table import CardTable
+from http_client import HTTPClient
+from image_cache import CardImageCache
+from mirror_images import ImageMirror, TokenBucket, deck_card_keys, image_jobs
+from synthetic import LocalServer, QuietHandler
+
+
+def image_bytes(card_id, variant):
+    return hashlib.sha256(f"{variant}{card_id}".encode()).digest() * (200 if variant == 'full' else 20)
+
+
+class ImageServer(LocalServer):
+    """Serves /<variant>/<id>.jpg with support for byte ranges"""
+
+    def __init__(self):
+        super().__init__(ImageHandler)
+        self.hits = []
+
+
+class ImageHandler(QuietHandler):
+    def do_GET(self):
+        variant, name = self.path.strip('/').split('/')
+        body = image_bytes(int(name.split('.')[0]), variant)
+        byte_range = self.headers.get('Range')
+        self.server.hits.append((self.path, byte_range))
+        if byte_range:
+            start = int(byte_range.split('=')[1].rstrip('-'))
+            self.send_body(206, body[start:], "image/jpeg",
+                           [("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")])
+        else:
+            self.send_body(200, body, "image/jpeg")
+
+
+def make_table(base, count):
+    cards = [{'id': card_id, 'name': f"Card {card_id}", 'type': "Spell Card",
+              'card_images': [{'id': card_id, 'image_url': f"{base}/full/{card_id}.jpg",
+                               'image_url_small': f"{base}/small/{card_id}.jpg"}]}
+             for card_id in range(100, 100 + count)]
+    return CardTable(cards)
+
+
+def test_mirror_skips_existing_and_resumes_partial_files():
+    server = ImageServer().start()
+    client = HTTPClient(backoff_factor=0)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CardImageCache(directory, client=client)
+            table = make_table(server.base, 20)
+            jobs = image_jobs(table, range(len(table)))
+            assert len(jobs) == 40
+
+            stats = ImageMirror(cache, client=client, workers=4, rate=1000).run(jobs)
+            assert stats['downloaded'] == 40 and stats['failed'] == 0
+            with open(cache.original_path(105, 'small'), 'rb') as f:
+                assert f.read() == image_bytes(105, 'small')
+            with open(os.path.join(directory, "manifest.json")) as f:
+                manifest = json.load(f)['files']
+            assert manifest['full/105.jpg']['size'] == len(image_bytes(105, 'full'))
+
+            # Second run: nothing to download
+            server.hits.clear()
+            stats = ImageMirror(cache, client=client, workers=4, rate=1000, verify=True).run(jobs)
+            assert stats['skipped'] == 40 and stats['downloaded'] == 0 and server.hits == []
+
+            # A half-downloaded file is resumed from where it stopped
+            path = cache.original_path(107, 'full')
+            os.remove(path)
+            with open(f"{path}.part", 'wb') as f:
+                f.write(image_bytes(107, 'full')[:1000])
+            stats = ImageMirror(cache, client=client, workers=4, rate=1000).run(jobs)
+            assert stats['resumed'] == 1 and stats['downloaded'] == 1
+            assert server.hits == [("/full/107.jpg", "bytes=1000-")]
+            with open(path, 'rb') as f:
+                assert f.read() == image_bytes(107, 'full')
+            assert not os.path.exists(f"{path}.part")
+
+            # A damaged file no longer matches the manifest and is fetched again
+            with open(cache.original_path(110, 'small'), 'wb') as f:
+                f.write(b"truncated")
+            stats = ImageMirror(cache, client=client, workers=4, rate=1000).run(jobs)
+            assert stats['downloaded'] == 1 and stats['skipped'] == 39
+    finally:
+        client.close()
+        server.stop()
+    print("✓ Mirroring skips verified files and resumes partial downloads")
+
+
+def test_token_bucket_limits_request_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+    start = time.monotonic()
+    for _ in range(25):
+        bucket.acquire()
+    elapsed = time.monotonic() - start
+    # 5 from the initial burst, 20 more at 50 per second
+    assert 0.35 <= elapsed < 1.0, elapsed
+    print(f"✓ Token bucket spaced 25 requests over {elapsed:.2f}s")
+
+
+def test_deck_folder_keys():
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "a.json"), 'w') as f:
+            json.dump([{'id': 46986414, 'name': "Dark Magician"}, {'name': "Pot of Greed"}], f)
+        with open(os.path.join(directory, "notes.txt"), 'w') as f:
+            f.write("not a deck")
+        with open(os.path.join(directory, "broken.ydk"), 'w') as f:
+            f.write("#main\nDark Magician\n")
+        keys, errors = deck_card_keys(directory)
+        assert keys == [46986414, "Pot of Greed"]
+        assert len(errors) == 1 and errors[0].startswith(os.path.join(directory, "broken.ydk"))
+    print("✓ Deck folders contribute their card ids and names, skipping unreadable decks")
+
+
+if __name__ == "__main__":
+    test_mirror_skips_existing_and_resumes_partial_files()
+    test_token_bucket_limits_request_rate()
+    test_deck_folder_keys()
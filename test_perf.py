@@ -0,0 +1,108 @@
+import io
+import json
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from PIL import Image
+
+from image_cache import CardImageCache
+from perf import BUCKET_EDGES_MS, PerfRecorder, RollingHistogram, get_recorder, span
+
+
+def test_spans_nest_and_collect_annotations():
+    recorder = PerfRecorder()
+    with recorder.span("open_deck", path="a.ydk"):
+        with recorder.span("fetch_card_image"):
+            recorder.annotate(cache='miss', bytes=1000)
+            recorder.annotate(bytes=500)
+        recorder.annotate(cache='hit')
+    recorder.annotate(cache='hit')  # outside any span: ignored
+
+    @recorder.timed()
+    def filter_cards(term):
+        return term.upper()
+
+    assert filter_cards("dark") == "DARK"
+    stats = recorder.stats()
+    assert list(stats) == ["fetch_card_image", "filter_cards", "open_deck"]
+    assert stats["fetch_card_image"]["bytes"] == 1500
+    assert stats["fetch_card_image"]["misses"] == 1 and stats["fetch_card_image"]["hit_rate"] == 0
+    assert stats["open_deck"]["hits"] == 1 and stats["open_deck"]["bytes"] == 0
+    assert stats["filter_cards"]["count"] == 1 and stats["filter_cards"]["hit_rate"] is None
+
+    recorder.enabled = False
+    with recorder.span("open_deck"):
+        pass
+    assert recorder.stats()["open_deck"]["count"] == 1
+    print("✓ Spans nest and collect annotations")
+
+
+def test_histogram_rolls_over_its_window():
+    histogram = RollingHistogram(window=100)
+    for ms in range(1, 201):
+        histogram.add(ms / 1000, {})
+    summary = histogram.summary()
+    assert summary['count'] == 200
+    # Only the last 100 runs (101-200 ms) count towards the percentiles
+    assert round(summary['p50_ms']) == 150 and round(summary['p99_ms']) == 199 and round(summary['max_ms']) == 200
+    buckets = dict(histogram.buckets())
+    assert len(buckets) == len(BUCKET_EDGES_MS) + 1
+    assert buckets[250] == 100 and sum(buckets.values()) == 100
+    print("✓ Histograms keep a rolling window")
+
+
+def test_chrome_trace_export_from_threads():
+    recorder = PerfRecorder()
+
+    def work():
+        for _ in range(50):
+            with recorder.span("fetch_card_image", card_id=1):
+                recorder.annotate(bytes=10)
+
+    threads = [threading.Thread(target=work, name=f"image-{i}") for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert recorder.stats()["fetch_card_image"]["count"] == 200
+    assert recorder.stats()["fetch_card_image"]["bytes"] == 2000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "trace.json")
+        recorder.export_chrome_trace(path)
+        with open(path) as f:
+            trace = json.load(f)
+    spans = [event for event in trace['traceEvents'] if event['ph'] == 'X']
+    names = {event['args']['name'] for event in trace['traceEvents'] if event['ph'] == 'M'}
+    assert len(spans) == 200 and {"image-0", "image-3"} <= names
+    assert all(event['dur'] >= 0 and event['ts'] >= 0 for event in spans)
+    assert spans[0]['args'] == {'card_id': 1, 'bytes': 10}
+    print("✓ Spans from several threads export as a Chrome trace")
+
+
+def test_image_cache_reports_hits_misses_and_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (421, 614), (120, 30, 200)).save(buffer, format="JPEG")
+    data = buffer.getvalue()
+    response = mock.MagicMock(status_code=200, content=data)
+    client = mock.MagicMock()
+    client.get.return_value = response
+    recorder = get_recorder()
+    with tempfile.TemporaryDirectory() as directory:
+        cache = CardImageCache(directory, client=client)
+        for _ in range(2):
+            with span("test_image_load") as args:
+                cache.load(1, "https://example.invalid/1.jpg", (100, 146))
+        assert args == {'cache': 'hit'}
+    stats = recorder.stats()["test_image_load"]
+    assert stats['hits'] == 1 and stats['misses'] == 1 and stats['bytes'] == len(data)
+    print("✓ The image cache reports hits, misses and downloaded bytes")
+
+
+if __name__ == "__main__":
+    test_spans_nest_and_collect_annotations()
+    test_histogram_rolls_over_its_window()
+    test_chrome_trace_export_from_threads()
+    test_image_cache_reports_hits_misses_and_bytes()
@@ -0,0 +1,91 @@
+import threading
+import time
+
+from prefetch import DECK, NEARBY, SELECTED, VISIBLE, PrefetchPool
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def blocked_pool():
+    """A one-worker pool whose worker is stuck on a 'gate' job until released"""
+    release = threading.Event()
+    order = []
+
+    def load(key):
+        if key == 'gate':
+            release.wait(2)
+        order.append(key)
+        return key.upper()
+
+    pool = PrefetchPool(load, workers=1)
+    pool.submit('gate', ('gate',), SELECTED)
+    wait_for(lambda: order == [] and pool.pending() == 0)
+    return pool, release, order
+
+
+def test_urgent_jobs_run_before_background_work():
+    pool, release, order = blocked_pool()
+    for key in ('d1', 'd2', 'd3'):
+        pool.submit(key, (key,), DECK)
+    pool.submit('v1', ('v1',), VISIBLE)
+    pool.submit('s1', ('s1',), SELECTED)
+    pool.submit('d3', ('d3',), NEARBY)  # moves up
+    release.set()
+    wait_for(lambda: len(order) == 6)
+    assert order == ['gate', 's1', 'd3', 'v1', 'd1', 'd2'], order
+    pool.shutdown()
+    print("✓ Selected and visible cards run ahead of background prefetches")
+
+
+def test_replacing_a_group_drops_stale_jobs():
+    pool, release, order = blocked_pool()
+    pool.replace('nearby', [(key, (key,)) for key in ('a', 'b', 'c')], NEARBY)
+    pool.replace('nearby', [(key, (key,)) for key in ('c', 'd')], NEARBY)
+    assert pool.pending() == 2
+    release.set()
+    wait_for(lambda: len(order) == 3)
+    time.sleep(0.05)
+    assert order == ['gate', 'c', 'd'], order
+    pool.shutdown()
+    print("✓ Neighbours of an old selection are dropped when it moves")
+
+
+def test_latest_selection_is_loaded_first():
+    pool, release, order = blocked_pool()
+    pool.replace('visible', [('v1', ('v1',))], VISIBLE)
+    # Arrowing through the list: only the card that ends up selected is still wanted
+    for i in range(20):
+        pool.replace('selected', [(f's{i}', (f's{i}',))], SELECTED)
+    assert pool.pending() == 2
+    release.set()
+    wait_for(lambda: len(order) == 3)
+    time.sleep(0.05)
+    assert order == ['gate', 's19', 'v1'], order
+    pool.shutdown()
+    print("✓ The newest selection loads first and earlier ones are dropped")
+
+
+def test_callbacks_fire_once_per_key():
+    pool, release, order = blocked_pool()
+    results = []
+    pool.submit('x', ('x',), DECK)
+    pool.submit('x', ('x',), SELECTED, callback=lambda key, result: results.append((key, result)))
+    pool.submit('gate', ('gate',), SELECTED, callback=lambda key, result: results.append((key, result)))
+    release.set()
+    wait_for(lambda: len(results) == 2)
+    assert sorted(results) == [('gate', 'GATE'), ('x', 'X')]
+    assert order.count('x') == 1
+    pool.shutdown()
+    print("✓ A running or queued key is loaded once and reports to every caller")
+
+
+if __name__ == "__main__":
+    test_urgent_jobs_run_before_background_work()
+    test_replacing_a_group_drops_stale_jobs()
+    test_latest_selection_is_loaded_first()
+    test_callbacks_fire_once_per_key()
@@ -0,0 +1,48 @@
+import random
+import time
+
+from search_index import NameIndex, NameSearch
+
+
+def make_names(count, seed=7):
+    rng = random.Random(seed)
+    words = ["dark", "magician", "blue-eyes", "white", "dragon", "red-eyes", "black", "elemental",
+             "hero", "cyber", "toon", "knight", "of", "the", "forbidden", "one", "girl", "soldier"]
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f" {i}" for i in range(count)]
+
+
+def test_index_matches_linear_scan():
+    names = make_names(2000)
+    index = NameIndex(names)
+    for query in ["d", "dr", "dra", "dragon", "n dr", "eyes w", "zzz", "1", "19", "girl 1"]:
+        expected = [row for row, name in enumerate(names) if query in name]
+        assert list(index.search(query)) == expected, query
+    print("✓ Trigram search matches a linear substring scan")
+
+
+def test_incremental_search_narrows_previous_results():
+    names = make_names(2000)
+    search = NameSearch(NameIndex(names))
+    for query in ["d", "da", "dar", "dark", "dark ", "dark m", "dark"]:
+        expected = [row for row, name in enumerate(names) if query in name]
+        assert list(search.search(query)) == expected, query
+    print("✓ Extending a query narrows the previous result set")
+
+
+def test_full_catalog_keystrokes_fit_in_a_frame():
+    names = make_names(14000)
+    search = NameSearch(NameIndex(names))
+    query = "blue-eyes white dragon"
+    worst = 0.0
+    for end in range(1, len(query) + 1):
+        start = time.perf_counter()
+        search.search(query[:end])
+        worst = max(worst, time.perf_counter() - start)
+    assert worst < 0.05, worst
+    print(f"✓ Slowest keystroke over 14k names took {worst * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    test_index_matches_linear_scan()
+    test_incremental_search_narrows_previous_results()
+    test_full_catalog_keystrokes_fit_in_a_frame()
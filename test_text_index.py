@@ -0,0 +1,69 @@
+import os
+import tempfile
+import threading
+
+from card_catalog import CardCatalog
+from card_store import CardStore
+from text_index import TextIndex
+
+DESCS = [
+    "Target 1 monster in either GY; Special Summon it.",
+    "Special Summon 1 monster from your Graveyard in Defense Position.",
+    "When this card is destroyed: Draw 1 card.",
+    "Cannot be Special Summoned. Banish 1 monster your opponent controls.",
+    "If this card is sent from the field to the GY: You can Special Summon 1 Dragon monster from your hand.",
+]
+
+
+def test_bm25_ranks_and_phrases():
+    index = TextIndex.build(DESCS)
+    ranked = [row for row, _ in index.search("special summon graveyard")]
+    # "Graveyard" and "GY" are the same term; all special summon texts rank above the draw card
+    assert set(ranked[:2]) == {0, 1}
+    assert 2 not in ranked
+    assert [row for row, _ in index.search('"special summon 1 monster from your gy"')] == [1]
+    assert [row for row, _ in index.search('"field to the gy"')] == [4]
+    assert index.search('"summon banish"') == []
+    assert index.search("the of") == []
+    print("✓ BM25 ranking, GY/Graveyard folding and phrase queries")
+
+
+def test_index_round_trips_through_the_store():
+    cards = [{"id": i + 1, "name": f"Card {i}", "type": "Spell Card", "desc": desc} for i, desc in enumerate(DESCS)]
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = CardStore(os.path.join(cache_dir, "cards.sqlite3"))
+        store.save_cards(cards, "1.0")
+        first = CardCatalog(url="http://127.0.0.1:9/cardinfo.php", version_url="http://127.0.0.1:9/v", store=store,
+                            timeout=0.5)
+        store.set_meta('fields', first._fields_key())
+        assert first.search_text("draw") == [2]
+        assert store.load_blob('text_index')
+
+        second = CardCatalog(url=first.url, version_url=first.version_url, store=store, timeout=0.5)
+        second.load()
+        index = second.text_index
+        assert index.postings.keys() == first.text_index.postings.keys()
+        store.close()
+    print("✓ Text index is persisted with the local store")
+
+
+def test_text_index_build_does_not_block_lookups():
+    catalog = CardCatalog()
+    catalog.set_cards([{"id": i + 1, "name": f"Card {i}", "type": "Spell Card", "desc": desc}
+                       for i, desc in enumerate(DESCS)])
+    found = []
+    # As if another thread were building the text index
+    with catalog._text_lock:
+        lookup = threading.Thread(target=lambda: found.extend(catalog.suggest("card 2") + list(catalog.filter_rows({}))))
+        lookup.start()
+        lookup.join(2)
+        assert not lookup.is_alive(), "name and facet lookups waited for the text index"
+    assert found and found[0] == 2
+    assert catalog.search_text("draw") == [2]
+    print("✓ Name and facet lookups do not wait for a text index build")
+
+
+if __name__ == "__main__":
+    test_bm25_ranks_and_phrases()
+    test_index_round_trips_through_the_store()
+    test_text_index_build_does_not_block_lookups()
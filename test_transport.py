@@ -0,0 +1,107 @@
+import os
+import sys
+import tempfile
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks"))
+
+import http_client
+from card_catalog import CardCatalog
+from http_client import HTTPClient, get_client, set_client
+from image_cache import CardImageCache, ImageCacheError
+from synthetic import SyntheticAPI
+from transport import HTTPArchive, RecordingClient, ReplayClient, ReplayMissError
+
+
+def make_catalog(server, client):
+    return CardCatalog(url=f"{server.api_base}/cardinfo.php", version_url=f"{server.api_base}/checkDBVer.php",
+                       client=client)
+
+
+def test_recorded_session_replays_offline():
+    server = SyntheticAPI(count=20, image_variants=1).start()
+    card = server.cards[0]
+    card_id, image_url = card['id'], card['card_images'][0]['image_url']
+    jpeg = server.image(card_id)
+    missing_url = f"{server.base}/missing.jpg"
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.sqlite3")
+        recorder = RecordingClient(HTTPClient(backoff_factor=0), HTTPArchive(path))
+        try:
+            make_catalog(server, recorder).load()
+            CardImageCache(os.path.join(directory, "live"), client=recorder).load(card_id, image_url, (250, 350))
+            assert recorder.get(missing_url).status_code == 404
+        finally:
+            recorder.close()
+            server.stop()
+        recorded = server.requests
+
+        replay = ReplayClient(HTTPArchive(path, readonly=True))
+        try:
+            assert len(replay.archive) == 4
+            catalog = make_catalog(server, replay)
+            assert catalog.get_by_name(card['name'].lower())['desc'] == card['desc']
+            assert catalog.version == "1.0"
+            image = CardImageCache(os.path.join(directory, "offline"), client=replay).load(
+                card_id, image_url, (250, 350))
+            assert image.size == (250, 350)
+            assert replay.get(missing_url).status_code == 404
+
+            response = replay.get(image_url, headers={"Range": "bytes=100-"})
+            assert response.status_code == 206 and response.content == jpeg[100:]
+            assert response.headers["content-range"] == f"bytes 100-{len(jpeg) - 1}/{len(jpeg)}"
+
+            # Anything not recorded fails like a dropped connection
+            other_url = f"{server.image_base}/cards/1.jpg"
+            try:
+                replay.get(other_url)
+                assert False, "unrecorded URLs must not be served"
+            except ReplayMissError as e:
+                assert isinstance(e, requests.RequestException) and isinstance(e, OSError)
+            try:
+                CardImageCache(os.path.join(directory, "offline"), client=replay).load(1, other_url, (250, 350))
+                assert False, "a missing image must raise ImageCacheError"
+            except ImageCacheError:
+                pass
+        finally:
+            replay.close()
+        assert server.requests == recorded
+    print("✓ A recorded session replays without the network")
+
+
+def test_environment_chooses_the_shared_client():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "session.sqlite3")
+        HTTPArchive(path).close()
+        saved = http_client._shared_client
+        environ = dict(os.environ)
+        try:
+            set_client(None)
+            os.environ[http_client.REPLAY_ENV] = path
+            client = get_client()
+            assert isinstance(client, ReplayClient) and get_client() is client
+            client.close()
+
+            set_client(None)
+            del os.environ[http_client.REPLAY_ENV]
+            os.environ[http_client.RECORD_ENV] = path
+            client = get_client()
+            assert isinstance(client, RecordingClient)
+            client.close()
+
+            try:
+                HTTPArchive(os.path.join(directory, "missing.sqlite3"), readonly=True)
+                assert False, "replaying needs an existing archive"
+            except FileNotFoundError:
+                pass
+        finally:
+            os.environ.clear()
+            os.environ.update(environ)
+            set_client(saved)
+    print("✓ YGO_RECORD and YGO_REPLAY switch the shared client")
+
+
+if __name__ == "__main__":
+    test_recorded_session_replays_offline()
+    test_environment_chooses_the_shared_client()
@@ -0,0 +1,68 @@
+import threading
+
+from test_debounced_search import FakeRoot
+from ui_dispatch import UIDispatcher
+
+
+def test_worker_posts_run_on_the_polling_thread():
+    root = FakeRoot()
+    ui = UIDispatcher(root, poll_ms=20)
+    ran = []
+    worker = threading.Thread(target=lambda: ui.post(lambda: ran.append(threading.current_thread())))
+    worker.start()
+    worker.join()
+    assert ran == []
+    root.advance(20)
+    assert ran == [threading.current_thread()]
+    print("✓ Posted callbacks run on the thread that drains the queue")
+
+
+def test_superseded_results_are_dropped():
+    root = FakeRoot()
+    ui = UIDispatcher(root)
+    shown = []
+    first = ui.begin("card_image")
+    second = ui.begin("card_image")
+    # The newer request finishes first, the older one after it
+    ui.post(shown.append, "new", channel="card_image", token=second)
+    ui.post(shown.append, "old", channel="card_image", token=first)
+    other = ui.begin("status")
+    ui.post(shown.append, "status", channel="status", token=other)
+    ui.drain()
+    assert shown == ["new", "status"]
+    assert ui.is_current("card_image", second) and not ui.is_current("card_image", first)
+    print("✓ Results of superseded requests never overwrite newer ones")
+
+
+def test_bursts_are_coalesced():
+    root = FakeRoot()
+    ui = UIDispatcher(root)
+    redraws = []
+    for count in range(50):
+        ui.post(redraws.append, count, key="redraw")
+    ui.post(redraws.append, "other")
+    assert ui.drain() == 51
+    assert redraws == [49, "other"]
+    print("✓ A burst of completions causes a single redraw")
+
+
+def test_failing_callback_does_not_stop_the_batch():
+    root = FakeRoot()
+    errors = []
+    root.report_callback_exception = lambda *exc_info: errors.append(exc_info[0])
+    ui = UIDispatcher(root)
+    ran = []
+    ui.post(lambda: 1 / 0)
+    ui.post(ran.append, "after")
+    ui.drain()
+    assert ran == ["after"] and errors == [ZeroDivisionError]
+    ui.shutdown()
+    assert not root.jobs
+    print("✓ A failing callback is reported and the rest still run")
+
+
+if __name__ == "__main__":
+    test_worker_posts_run_on_the_polling_thread()
+    test_superseded_results_are_dropped()
+    test_bursts_are_coalesced()
+    test_failing_callback_does_not_stop_the_batch()
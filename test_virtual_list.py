@@ -0,0 +1,51 @@
+import tkinter as tk
+
+import pytest
+
+from virtual_list import VirtualListbox
+
+
+class NamesModel:
+    def __init__(self, count):
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def name(self, index):
+        return f"Card {index}"
+
+    def card_id(self, index):
+        return 1000 + index
+
+
+def test_virtual_listbox_draws_only_visible_rows():
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        pytest.skip(f"no display available: {e}")
+    try:
+        selected = []
+        listbox = VirtualListbox(root, height=20)
+        listbox.pack()
+        listbox.bind('<<ListboxSelect>>', lambda e: selected.append(listbox.curselection()))
+        root.update()
+
+        listbox.set_model(NamesModel(13000))
+        small_pool = len(listbox._pool)
+        listbox.yview('moveto', 0.5)
+        first, last = listbox.visible_range()
+        assert first == 6500 and last - first <= 21
+        assert len(listbox._pool) == small_pool
+
+        listbox._select(6510)
+        assert listbox.curselection() == (6510,)
+        assert listbox.get(6510) == "Card 6510" and listbox.card_id(6510) == 7510
+        assert selected
+        print(f"✓ 13000 rows rendered with {small_pool} canvas rows")
+    finally:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    test_virtual_listbox_draws_only_visible_rows()
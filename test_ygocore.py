@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import ygocore
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_CHECK = """
+import sys, time
+start = time.perf_counter()
+import ygocore
+catalog = ygocore.CardCatalog()
+catalog.set_cards([{'id': 1, 'name': "Dark Magician", 'type': "Normal Monster", 'frameType': "normal"}])
+deck, missing, _ = ygocore.hydrate(ygocore.parse_ydk("#main\\n1\\n"), catalog.table)
+rows, _ = ygocore.CardQuery(catalog).run("dark", {})
+elapsed = time.perf_counter() - start
+assert len(deck) == 1 and not missing and list(rows) == [0]
+print(elapsed, *sorted(name for name in ('tkinter', 'PIL', 'requests') if name in sys.modules))
+"""
+
+IMAGE_CACHE_CHECK = """
+import sys, ygocore
+ygocore.CardImageCache(sys.argv[1])
+print(*sorted(name for name in ('requests', 'urllib3') if name in sys.modules))
+"""
+
+
+def test_every_export_resolves():
+    for name in ygocore.__all__:
+        assert getattr(ygocore, name) is not None, name
+    assert set(ygocore.__all__) <= set(dir(ygocore))
+    try:
+        ygocore.NoSuchThing
+        assert False, "unknown names must raise AttributeError"
+    except AttributeError:
+        pass
+    print(f"✓ All {len(ygocore.__all__)} core exports resolve")
+
+
+def test_core_imports_without_gui_or_network_stack():
+    env = dict(os.environ)
+    env.pop('DISPLAY', None)
+    output = subprocess.run([sys.executable, "-c", IMPORT_CHECK], cwd=HERE, env=env,
+                            capture_output=True, text=True, check=True).stdout.split()
+    elapsed, loaded = float(output[0]), output[1:]
+    assert loaded == [], loaded
+    assert elapsed < 0.2, elapsed
+    print(f"✓ Catalog, deck and search used in {elapsed * 1000:.0f} ms without Tk, Pillow or requests")
+
+
+def test_image_cache_defers_the_network_stack():
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run([sys.executable, "-c", IMAGE_CACHE_CHECK, directory], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout.split()
+    assert output == [], output
+    print("✓ An image cache is created without importing requests")
+
+
+if __name__ == "__main__":
+    test_every_export_resolves()
+    test_core_imports_without_gui_or_network_stack()
+    test_image_cache_defers_the_network_stack()
@@ -0,0 +1,161 @@
+import heapq
+import math
+import pickle
+import re
+from array import array
+
+TOKEN = re.compile(r"[a-z0-9]+")
+PHRASE = re.compile(r'"([^"]*)"')
+
+# Very common words are skipped, but still take up a position so phrases
+# such as "from the gy" keep their spacing.
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'be', 'by', 'for', 'from', 'if', 'in', 'is',
+    'it', 'its', 'of', 'on', 'or', 'that', 'the', 'then', 'this', 'to', 'with',
+    'you', 'your',
+})
+# Older card text says "Graveyard", newer text says "GY"
+ALIASES = {'graveyard': 'gy', 'graveyards': 'gy'}
+
+FORMAT_VERSION = 2
+
+
+def normalize_term(word):
+    word = ALIASES.get(word, word)
+    # Minimal plural folding: "summons" -> "summon", "monsters" -> "monster"
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """(position, term) pairs for the indexable words of text"""
+    return [(position, normalize_term(word))
+            for position, word in enumerate(TOKEN.findall(text.lower()))
+            if word not in STOPWORDS]
+
+
+class TextIndex:
+    """Inverted index over card effect text with BM25 ranking and phrase queries.
+
+    Each term maps to (rows, weights, offsets, positions): the rows that
+    contain it, each row's precomputed BM25 weight for the term, and word
+    positions stored flat (offsets[i]:offsets[i + 1] slices positions for
+    rows[i]). A query then only has to add up weights.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, postings, doc_lengths):
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts):
+        building = {}
+        doc_lengths = array('I')
+        for row, text in enumerate(texts):
+            tokens = tokenize(text or '')
+            doc_lengths.append(len(tokens))
+            for position, term in tokens:
+                entry = building.get(term)
+                if entry is None:
+                    entry = building[term] = (array('I'), array('I', [0]), array('H'))
+                rows, offsets, positions = entry
+                if not rows or rows[-1] != row:
+                    if rows:
+                        offsets.append(len(positions))
+                    rows.append(row)
+                positions.append(min(position, 65535))
+        count = len(doc_lengths)
+        avg_length = (sum(doc_lengths) / count) if count else 0.0
+        postings = {}
+        for term, (rows, offsets, positions) in building.items():
+            offsets.append(len(positions))
+            idf = math.log(1 + (count - len(rows) + 0.5) / (len(rows) + 0.5))
+            weights = array('f')
+            for i, row in enumerate(rows):
+                tf = offsets[i + 1] - offsets[i]
+                norm = cls.k1 * (1 - cls.b + cls.b * doc_lengths[row] / avg_length)
+                weights.append(idf * tf * (cls.k1 + 1) / (tf + norm))
+            postings[term] = (rows, weights, offsets, positions)
+        return cls(postings, doc_lengths)
+
+    def to_bytes(self):
+        return pickle.dumps((FORMAT_VERSION, self.postings, self.doc_lengths), protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data):
+        version, postings, doc_lengths = pickle.loads(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported text index format {version}")
+        return cls(postings, doc_lengths)
+
+    def _phrase_rows(self, tokens):
+        """Rows containing the tokens at their relative positions"""
+        lists = [(position, self.postings.get(term)) for position, term in tokens]
+        if any(posting is None for _, posting in lists):
+            return set()
+        lists.sort(key=lambda item: len(item[1][0]))
+        base_offset, (rows, _, offsets, positions) = lists[0]
+        matches = set()
+        others = [(offset - base_offset, dict(zip(posting[0], range(len(posting[0])))), posting)
+                  for offset, posting in lists[1:]]
+        for i, row in enumerate(rows):
+            starts = set(positions[offsets[i]:offsets[i + 1]])
+            for delta, index_of, (_, _, other_offsets, other_positions) in others:
+                j = index_of.get(row)
+                if j is None:
+                    starts = set()
+                    break
+                shifted = {p - delta for p in other_positions[other_offsets[j]:other_offsets[j + 1]]}
+                starts &= shifted
+                if not starts:
+                    break
+            if starts:
+                matches.add(row)
+        return matches
+
+    def search(self, query, limit=200):
+        """Rows ranked by BM25 as (row, score), best first.
+
+        Words are ranked as alternatives; every "quoted phrase" must appear.
+        """
+        phrases = [tokenize(phrase) for phrase in PHRASE.findall(query)]
+        phrases = [tokens for tokens in phrases if tokens]
+        terms = [term for _, term in tokenize(PHRASE.sub(' ', query))]
+        terms += [term for tokens in phrases for _, term in tokens]
+        if not terms:
+            return []
+
+        allowed = None
+        for tokens in phrases:
+            rows = self._phrase_rows(tokens)
+            allowed = rows if allowed is None else allowed & rows
+            if not allowed:
+                return []
+
+        scores = [0.0] * len(self.doc_lengths)
+        matched = False
+        for term in set(terms):
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            matched = True
+            rows, weights = posting[0], posting[1]
+            if allowed is None:
+                for row, weight in zip(rows, weights):
+                    scores[row] += weight
+            else:
+                for row, weight in zip(rows, weights):
+                    if row in allowed:
+                        scores[row] += weight
+        if not matched:
+            return []
+        candidates = allowed if allowed is not None else range(len(scores))
+        best = heapq.nlargest(limit, candidates, key=scores.__getitem__)
+        return [(row, scores[row]) for row in best if scores[row] > 0]
@@ -0,0 +1,195 @@
+"""Recording HTTP responses to an archive and serving them back without a network.
+
+RecordingClient and ReplayClient stand in for HTTPClient wherever one is
+accepted (the catalog, the image cache, the image mirror). Recording passes
+every request on and keeps the responses in an HTTPArchive, one SQLite file;
+replaying answers from the archive alone, so the app, deck_batch and the
+benchmarks run the same way on every machine, air-gapped ones included.
+Set YGO_RECORD or YGO_REPLAY to an archive path to switch the shared client
+(see http_client.get_client).
+"""
+import json
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    compressed INTEGER NOT NULL
+);
+"""
+
+# Response headers worth keeping; the length and encoding are those of the replayed body
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+# Partial content depends on the request, and server errors should not become permanent
+RECORDED_STATUSES = frozenset(range(200, 500)) - {206}
+
+
+class ReplayMissError(requests.ConnectionError):
+    """Raised when a replayed request is not in the archive; handled like a network failure"""
+
+
+class HTTPArchive:
+    """SQLite file of recorded responses, keyed by URL.
+
+    Bodies are stored decoded and zlib-compressed unless they are images,
+    which are compressed already. Recording a URL again replaces it.
+    """
+
+    def __init__(self, path, readonly=False):
+        if readonly:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"No replay archive at {path}")
+            uri = pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                self._conn.executescript(SCHEMA)
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM responses WHERE url = ?", (url,)).fetchone() is not None
+
+    def urls(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT url FROM responses ORDER BY url")]
+
+    def get(self, url):
+        """(status, headers, body) recorded for url, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT status, headers, body, compressed FROM responses WHERE url = ?",
+                                     (url,)).fetchone()
+        if row is None:
+            return None
+        status, headers, body, compressed = row
+        body = zlib.decompress(body) if compressed else bytes(body)
+        return status, json.loads(headers), body
+
+    def put(self, url, status, headers, body):
+        headers = {name: headers[name] for name in KEPT_HEADERS if name in headers}
+        compressed = not headers.get('Content-Type', '').startswith('image/')
+        data = zlib.compress(body, 6) if compressed else body
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                               (url, status, json.dumps(headers), data, int(compressed)))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ArchivedResponse:
+    """The parts of requests.Response the deck builder uses, over a body held in memory"""
+
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers)
+        self.headers['Content-Length'] = str(len(content))
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        size = chunk_size or len(self.content) or 1
+        for start in range(0, len(self.content), size):
+            yield self.content[start:start + size]
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingClient:
+    """Passes requests on to client and records the responses in archive.
+
+    Responses are read in full before they are returned, so streamed
+    downloads arrive in one go while recording.
+    """
+
+    def __init__(self, client, archive):
+        self.client = client
+        self.archive = archive
+
+    def get(self, url, timeout=None, **kwargs):
+        with self.client.get(url, timeout=timeout, **kwargs) as response:
+            content = response.content
+            status, headers = response.status_code, dict(response.headers)
+        if status in RECORDED_STATUSES:
+            self.archive.put(url, status, headers, content)
+        return ArchivedResponse(url, status, headers, content)
+
+    def close(self):
+        self.client.close()
+        self.archive.close()
+
+
+class ReplayClient:
+    """Answers requests from archive only, optionally after latency seconds each.
+
+    Unrecorded URLs raise ReplayMissError. Range requests for recorded
+    files are answered from the recorded body, as the image mirror resumes
+    downloads with them.
+    """
+
+    def __init__(self, archive, latency=0.0):
+        self.archive = archive
+        self.latency = latency
+
+    def get(self, url, timeout=None, headers=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        entry = self.archive.get(url)
+        if entry is None:
+            raise ReplayMissError(f"Not in the replay archive {self.archive.path}: {url}")
+        status, recorded_headers, content = entry
+        byte_range = (headers or {}).get('Range')
+        if byte_range and status == 200:
+            return self._partial(url, recorded_headers, content, byte_range)
+        return ArchivedResponse(url, status, recorded_headers, content)
+
+    @staticmethod
+    def _partial(url, headers, content, byte_range):
+        """Answer an open-ended 'bytes=N-' range request"""
+        try:
+            start = int(byte_range.split('=', 1)[1].rstrip('-'))
+        except (IndexError, ValueError):
+            return ArchivedResponse(url, 200, headers, content)
+        if start >= len(content):
+            return ArchivedResponse(url, 416, {'Content-Range': f"bytes */{len(content)}"}, b"")
+        headers = dict(headers, **{'Content-Range': f"bytes {start}-{len(content) - 1}/{len(content)}"})
+        return ArchivedResponse(url, 206, headers, content[start:])
+
+    def close(self):
+        self.archive.close()
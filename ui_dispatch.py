@@ -0,0 +1,80 @@
+import queue
+import sys
+import threading
+import traceback
+
+
+class UIDispatcher:
+    """Hands work from background threads to the Tk thread.
+
+    Tk widgets may only be touched from the thread running the main loop, so
+    workers never call them directly: they post() a callback, and the Tk
+    thread drains the queue every poll_ms via root.after.
+
+    Posts that share a coalesce key run once per drain, with the latest
+    arguments, so a burst of completions causes a single redraw. Posts
+    tagged with a channel and token are dropped when begin(channel) has been
+    called again since the token was issued, so the result of a superseded
+    request (say, the image of the previously selected card) can never
+    overwrite a newer one.
+
+    root is anything with Tk's after/after_cancel methods.
+    """
+
+    def __init__(self, root, poll_ms=20):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._queue = queue.SimpleQueue()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def begin(self, channel):
+        """Start a new request on channel and return its token; earlier tokens go stale"""
+        with self._lock:
+            token = self._generations.get(channel, 0) + 1
+            self._generations[channel] = token
+            return token
+
+    def is_current(self, channel, token):
+        """Whether token is still the latest for channel (safe from any thread)"""
+        with self._lock:
+            return self._generations.get(channel, 0) == token
+
+    def post(self, callback, *args, key=None, channel=None, token=None):
+        """Queue callback(*args) for the Tk thread (safe from any thread)"""
+        self._queue.put((callback, args, key, channel, token))
+
+    def drain(self):
+        """Run everything posted so far; must be called on the Tk thread"""
+        items = []
+        while True:
+            try:
+                items.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        last = {key: i for i, (_, _, key, _, _) in enumerate(items) if key is not None}
+        for i, (callback, args, key, channel, token) in enumerate(items):
+            if key is not None and last[key] != i:
+                continue
+            if channel is not None and not self.is_current(channel, token):
+                continue
+            try:
+                callback(*args)
+            except Exception:
+                # One failing callback must not stop the rest of the batch
+                report = getattr(self.root, 'report_callback_exception', None)
+                if report:
+                    report(*sys.exc_info())
+                else:
+                    traceback.print_exc()
+        return len(items)
+
+    def _poll(self):
+        self.drain()
+        self._after_id = self.root.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
@@ -0,0 +1,206 @@
+import tkinter as tk
+import tkinter.font as tkfont
+
+
+class VirtualListbox(tk.Frame):
+    """A Listbox look-alike that only draws the rows currently on screen.
+
+    Rows come from a model with len() and name(index), such as a CardView,
+    so showing 13k results costs the same as showing 20: the canvas keeps a
+    small pool of text items and relabels them as the list scrolls. The
+    model's card_id(index), when present, maps a row back to its card.
+
+    Supports the parts of the Listbox API the deck builder uses:
+    curselection, get, size, see, selection_set/clear, yview and the
+    <<ListboxSelect>> event.
+    """
+
+    def __init__(self, master, height=20, width=20, bg="#ffffff", fg="#000000",
+                 selectbackground="#0078d7", selectforeground="#ffffff",
+                 font=("Arial", 10), yscrollcommand=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self._font = tkfont.Font(font=font)
+        self.row_height = self._font.metrics('linespace') + 2
+        self._colors = {'fg': fg, 'selectbackground': selectbackground, 'selectforeground': selectforeground}
+        self._yscrollcommand = yscrollcommand
+        self._model = None
+        self._count = 0
+        self._top = 0
+        self._selected = None
+        self._pool = []
+
+        self.canvas = tk.Canvas(self, bg=bg, highlightthickness=0, takefocus=1,
+                                height=height * self.row_height,
+                                width=width * self._font.measure('0'))
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+
+        self.canvas.bind('<Configure>', lambda e: self.redraw())
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', self._on_wheel)
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+        self.canvas.bind('<Up>', lambda e: self._move_selection(-1))
+        self.canvas.bind('<Down>', lambda e: self._move_selection(1))
+        self.canvas.bind('<Prior>', lambda e: self._move_selection(-self._page_size()))
+        self.canvas.bind('<Next>', lambda e: self._move_selection(self._page_size()))
+        self.canvas.bind('<Home>', lambda e: self._move_selection(-self._count))
+        self.canvas.bind('<End>', lambda e: self._move_selection(self._count))
+
+    # Model
+
+    def set_model(self, model):
+        """Show a new model, scrolled to the top with nothing selected"""
+        self._model = model
+        self._count = len(model) if model is not None else 0
+        self._top = 0
+        self._selected = None
+        self.redraw()
+
+    def refresh(self):
+        """Redraw after the current model has grown or shrunk"""
+        self._count = len(self._model) if self._model is not None else 0
+        if self._selected is not None and self._selected >= self._count:
+            self._selected = None
+        self._top = self._clamp_top(self._top)
+        self.redraw()
+
+    def size(self):
+        return self._count
+
+    def get(self, index):
+        return self._model.name(index)
+
+    def card_id(self, index):
+        return self._model.card_id(index)
+
+    def visible_range(self):
+        """(first, last) model indexes currently on screen, last exclusive"""
+        return self._top, min(self._count, self._top + self._visible_rows())
+
+    # Selection
+
+    def curselection(self):
+        return () if self._selected is None else (self._selected,)
+
+    def selection_set(self, index):
+        if 0 <= index < self._count:
+            self._selected = index
+            self.redraw()
+
+    def selection_clear(self, *args):
+        self._selected = None
+        self.redraw()
+
+    def see(self, index):
+        page = self._page_size()
+        if index < self._top:
+            self._top = index
+        elif index >= self._top + page:
+            self._top = index - page + 1
+        self._top = self._clamp_top(self._top)
+        self.redraw()
+
+    def _select(self, index):
+        if not self._count:
+            return
+        index = max(0, min(self._count - 1, index))
+        self._selected = index
+        self.see(index)
+        self.event_generate('<<ListboxSelect>>')
+
+    def _move_selection(self, step):
+        if not self._count:
+            return 'break'
+        start = self._selected if self._selected is not None else self._top - (1 if step > 0 else 0)
+        self._select(start + step)
+        return 'break'
+
+    def _on_click(self, event):
+        self.canvas.focus_set()
+        index = self._top + event.y // self.row_height
+        if index < self._count:
+            self._select(index)
+
+    def _on_wheel(self, event):
+        self.yview('scroll', -1 if event.delta > 0 else 1, 'units')
+
+    # Scrolling
+
+    def _visible_rows(self):
+        height = self.canvas.winfo_height()
+        if height <= 1:
+            height = int(self.canvas.cget('height'))
+        return height // self.row_height + 1
+
+    def _page_size(self):
+        return max(1, self._visible_rows() - 1)
+
+    def _clamp_top(self, top):
+        return max(0, min(top, self._count - self._page_size()))
+
+    def yview(self, *args):
+        if not args:
+            if not self._count:
+                return 0.0, 1.0
+            return self._top / self._count, min(1.0, (self._top + self._page_size()) / self._count)
+        if args[0] == 'moveto':
+            self._top = self._clamp_top(int(float(args[1]) * self._count))
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            if args[2] == 'pages':
+                amount *= self._page_size()
+            self._top = self._clamp_top(self._top + amount)
+        self.redraw()
+
+    # Drawing
+
+    def redraw(self):
+        canvas = self.canvas
+        width = max(canvas.winfo_width(), int(canvas.cget('width')))
+        rows = self._visible_rows()
+        while len(self._pool) < rows:
+            rect = canvas.create_rectangle(0, 0, 0, 0, width=0, state=tk.HIDDEN)
+            text = canvas.create_text(0, 0, anchor=tk.W, font=self._font, state=tk.HIDDEN)
+            self._pool.append((rect, text))
+
+        for slot, (rect, text) in enumerate(self._pool):
+            index = self._top + slot
+            if slot >= rows or index >= self._count:
+                canvas.itemconfigure(rect, state=tk.HIDDEN)
+                canvas.itemconfigure(text, state=tk.HIDDEN)
+                continue
+            y = slot * self.row_height
+            selected = index == self._selected
+            canvas.coords(rect, 0, y, width, y + self.row_height)
+            canvas.itemconfigure(rect, fill=self._colors['selectbackground'],
+                                 state=tk.NORMAL if selected else tk.HIDDEN)
+            canvas.coords(text, 4, y + self.row_height // 2)
+            canvas.itemconfigure(text, text=self._model.name(index), state=tk.NORMAL,
+                                 fill=self._colors['selectforeground' if selected else 'fg'])
+
+        if self._yscrollcommand:
+            first, last = self.yview()
+            self._yscrollcommand(first, last)
+
+    # Configuration, so theme code can treat this like a Listbox
+
+    def configure(self, cnf=None, **kwargs):
+        if cnf:
+            kwargs.update(cnf)
+        if not kwargs:
+            return super().configure()
+        if 'bg' in kwargs:
+            self.canvas.configure(bg=kwargs['bg'])
+        for key in ('fg', 'selectbackground', 'selectforeground'):
+            if key in kwargs:
+                self._colors[key] = kwargs.pop(key)
+        if 'font' in kwargs:
+            self._font.configure(**tkfont.Font(font=kwargs.pop('font')).actual())
+            self.row_height = self._font.metrics('linespace') + 2
+        if 'yscrollcommand' in kwargs:
+            self._yscrollcommand = kwargs.pop('yscrollcommand')
+        if kwargs:
+            super().configure(**kwargs)
+        self.redraw()
+
+    config = configure
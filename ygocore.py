@@ -0,0 +1,49 @@
+"""The deck builder without its GUI: catalog, search, decks and deck files.
+
+Scripts, tests and headless tools can use this module instead of the Tk
+apps; nothing here imports tkinter. Names are imported on first access, so
+`import ygocore` is nearly free and the heavier dependencies load only for
+what is used: Pillow with the image cache, requests once the catalog or an
+image actually goes online.
+
+    from ygocore import get_catalog, load_deck_file, hydrate
+"""
+import importlib
+
+_EXPORTS = {
+    'card_catalog': ('CardCatalog', 'CatalogCancelled', 'CatalogError', 'get_catalog'),
+    'card_query': ('CardQuery',),
+    'card_store': ('CardStore', 'default_cache_dir'),
+    'card_table': ('CardTable', 'CardView'),
+    'deck': ('BANLIST_LIMITS', 'EXTRA', 'MAIN', 'MAX_COPIES', 'SECTION_LIMITS', 'SECTION_NAMES', 'SECTIONS', 'SIDE',
+             'Deck', 'DeckError', 'is_extra_deck_card'),
+    'deck_io': ('DECK_EXTENSIONS', 'DECK_FILE_TYPES', 'DeckFile', 'DeckFormatError', 'alternate_art_ids',
+                'format_json', 'format_ydk', 'format_ydke', 'hydrate', 'load_deck_file', 'parse_json', 'parse_ydk',
+                'parse_ydke', 'save_deck_file'),
+    'facets': ('FacetIndex',),
+    'fuzzy_index': ('FuzzyNameIndex',),
+    'http_client': ('HTTPClient', 'archive_client', 'get_client', 'set_client'),
+    'image_cache': ('CardImageCache', 'ImageCacheError', 'ImageLRU', 'image_size_bytes'),
+    'perf': ('PerfRecorder', 'RollingHistogram', 'annotate', 'get_recorder', 'span', 'timed'),
+    'prefetch': ('DECK', 'NEARBY', 'SELECTED', 'VISIBLE', 'PrefetchPool'),
+    'search_index': ('NameIndex', 'NameSearch'),
+    'text_index': ('TextIndex',),
+    'transport': ('HTTPArchive', 'RecordingClient', 'ReplayClient', 'ReplayMissError'),
+}
+_ORIGINS = {name: module for module, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_ORIGINS)
+
+
+def __getattr__(name):
+    module = _ORIGINS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    # Later lookups find it directly
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
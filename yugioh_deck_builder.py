@@ -1,10 +1,14 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import requests
-from PIL import Image, ImageTk
-import io
-import json
+from PIL import ImageTk
 import os
+from concurrent.futures import ThreadPoolExecutor
+from ui_dispatch import UIDispatcher
+from ygocore import (DECK_FILE_TYPES, MAIN, SECTION_NAMES, SECTIONS, CardImageCache, CatalogError, Deck,
+                     DeckError, DeckFile, ImageCacheError, ImageLRU, get_catalog, hydrate, image_size_bytes,
+                     load_deck_file, save_deck_file)
+
+CARD_IMAGE_SIZE = (200, 300)
 
 class YugiohDeckBuilder:
     def __init__(self, root):
@@ -13,10 +17,18 @@ class YugiohDeckBuilder:
         self.root.geometry("1200x800")
         
         # Initialize variables
-        self.current_deck = []
+        self.current_deck = Deck()
         self.all_cards = []
+        # Cards in card list order, so a selected row maps straight to its card
+        self.listed_cards = []
         self.current_theme = "light"
-        self.card_images = {}
+        # Ready-to-display images in memory, backed by resized copies on disk
+        self.card_images = ImageLRU()
+        self.image_cache = CardImageCache()
+        # Images load on a worker; results come back through the dispatch queue
+        self.image_loader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="card-image")
+        self.ui = UIDispatcher(self.root)
+        self.catalog = get_catalog()
         
         # Setup theme colors
         self.setup_themes()
@@ -29,8 +41,9 @@ class YugiohDeckBuilder:
         self.create_deck_frame()
         self.create_details_frame()
         
-        # Load initial data
-        self.load_initial_cards()
+        # Load initial data in the background, so the window shows at once
+        self.root.title("Yu-Gi-Oh! Deck Builder - loading cards...")
+        self.image_loader.submit(self.load_initial_cards)
     
     def setup_themes(self):
         self.themes = {
@@ -172,47 +185,56 @@ class YugiohDeckBuilder:
         self.details_text.config(state=tk.DISABLED)
     
     def fetch_card_data(self, card_name):
-        url = "https://db.ygoprodeck.com/api/v7/cardinfo.php"
         try:
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                for card in data['data']:
-                    if card['name'].lower() == card_name.lower():
-                        return card
-                return None
-            else:
-                messagebox.showerror("Error", f"API Error: {response.status_code}")
-                return None
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to fetch card data: {str(e)}")
+            return self.catalog.get_by_name(card_name)
+        except CatalogError as e:
+            messagebox.showerror("Error", str(e))
             return None
     
-    def fetch_card_image(self, image_url):
+    def fetch_card_image(self, card_id, image_url, small_url=None):
+        """The resized card image from the disk cache, downloading it if needed (any thread)"""
         try:
-            response = requests.get(image_url)
-            if response.status_code == 200:
-                image_data = response.content
-                image = Image.open(io.BytesIO(image_data))
-                image = image.resize((200, 300), Image.Resampling.LANCZOS)
-                return ImageTk.PhotoImage(image)
-            return None
-        except Exception as e:
+            return self.image_cache.load(card_id, image_url, CARD_IMAGE_SIZE, small_url)
+        except ImageCacheError as e:
             print(f"Error loading image: {str(e)}")
             return None
     
+    def show_card_image(self, card_id, image):
+        """Display a loaded card image (Tk thread)"""
+        photo = self.card_images.get(card_id)
+        if photo is None and image is not None:
+            photo = ImageTk.PhotoImage(image)
+            self.card_images.put(card_id, photo, image_size_bytes(*CARD_IMAGE_SIZE))
+        if photo:
+            self.card_image_label.config(image=photo)
+            self.card_image_label.image = photo
+        else:
+            self.card_image_label.config(image="", text="Image not available")
+            self.card_image_label.image = None
+    
     def load_initial_cards(self):
-        # Load some popular cards initially
+        """Load the catalog and some popular cards (worker thread)"""
         popular_cards = [
             "Dark Magician", "Blue-Eyes White Dragon", "Red-Eyes Black Dragon",
             "Exodia the Forbidden One", "Summoned Skull", "Celtic Guardian"
         ]
         
-        for card_name in popular_cards:
-            card_data = self.fetch_card_data(card_name)
-            if card_data:
-                self.all_cards.append(card_data)
-                self.card_listbox.insert(tk.END, card_data['name'])
+        try:
+            cards = self.catalog.resolve_many(popular_cards)[0]
+        except CatalogError as e:
+            self.ui.post(self.root.title, f"Yu-Gi-Oh! Deck Builder - {e}")
+            return
+        self.ui.post(self.show_initial_cards, cards)
+    
+    def show_initial_cards(self, cards):
+        self.root.title("Yu-Gi-Oh! Deck Builder")
+        for card_data in cards:
+            self.all_cards.append(card_data)
+            self.listed_cards.append(card_data)
+            self.card_listbox.insert(tk.END, card_data['name'])
+        # The deck reads card types from the catalog table, which exists once loaded
+        if not self.current_deck:
+            self.current_deck = Deck(self.catalog.table)
     
     def search_cards(self):
         search_term = self.search_var.get().strip()
@@ -224,6 +246,7 @@ class YugiohDeckBuilder:
             # Clear current list and add the found card
             self.card_listbox.delete(0, tk.END)
             self.all_cards = [card_data]
+            self.listed_cards = [card_data]
             self.card_listbox.insert(tk.END, card_data['name'])
         else:
             messagebox.showinfo("Not Found", f"Card '{search_term}' not found.")
@@ -231,29 +254,25 @@ class YugiohDeckBuilder:
     def filter_cards(self, event):
         search_term = self.search_var.get().lower()
         self.card_listbox.delete(0, tk.END)
+        self.listed_cards = [card for card in self.all_cards if search_term in card['name'].lower()]
         
-        for card in self.all_cards:
-            if search_term in card['name'].lower():
-                self.card_listbox.insert(tk.END, card['name'])
+        for card in self.listed_cards:
+            self.card_listbox.insert(tk.END, card['name'])
     
     def on_card_select(self, event):
         selection = self.card_listbox.curselection()
         if not selection:
             return
         
-        card_name = self.card_listbox.get(selection[0])
-        card_data = next((card for card in self.all_cards if card['name'] == card_name), None)
-        
-        if card_data:
-            self.display_card_details(card_data)
+        self.display_card_details(self.listed_cards[selection[0]])
     
     def on_deck_card_select(self, event):
         selection = self.deck_listbox.curselection()
         if not selection:
             return
         
-        card_name = self.deck_listbox.get(selection[0])
-        card_data = next((card for card in self.current_deck if card['name'] == card_name), None)
+        card_id = self.current_deck.card_id_at(*self.deck_position(selection[0]))
+        card_data = self.catalog.get_by_id(card_id)
         
         if card_data:
             self.display_card_details(card_data)
@@ -281,17 +300,48 @@ class YugiohDeckBuilder:
         self.details_text.insert(tk.END, details)
         self.details_text.config(state=tk.DISABLED)
         
-        # Load and display card image
+        # Load and display card image; a load still running for an earlier card goes stale
+        token = self.ui.begin("card_image")
         if 'card_images' in card_data and card_data['card_images']:
-            image_url = card_data['card_images'][0]['image_url']
-            photo = self.fetch_card_image(image_url)
-            if photo:
-                self.card_image_label.config(image=photo)
-                self.card_image_label.image = photo
-            else:
-                self.card_image_label.config(text="Image not available")
+            card_id = card_data['id']
+            if card_id in self.card_images:
+                self.show_card_image(card_id, None)
+                return
+            first_image = card_data['card_images'][0]
+            image_url, small_url = first_image['image_url'], first_image.get('image_url_small')
+            
+            def load_image():
+                image = self.fetch_card_image(card_id, image_url, small_url)
+                self.ui.post(self.show_card_image, card_id, image, channel="card_image", token=token)
+            
+            self.image_loader.submit(load_image)
         else:
-            self.card_image_label.config(text="Image not available")
+            self.card_image_label.config(image="", text="Image not available")
+            self.card_image_label.image = None
+    
+    def deck_position(self, index):
+        """(section, row) of a deck list index; the list shows main, extra, then side"""
+        for section in SECTIONS:
+            entries = len(self.current_deck.ids[section])
+            if index < entries:
+                return section, index
+            index -= entries
+        raise IndexError("deck list index out of range")
+    
+    def deck_list_index(self, section, row):
+        offset = 0
+        for earlier in SECTIONS[:SECTIONS.index(section)]:
+            offset += len(self.current_deck.ids[earlier])
+        return offset + row
+    
+    def deck_label(self, card_id, section):
+        copies = self.current_deck.count(card_id, section)
+        label = f"{copies}x {self.catalog.table.names[self.catalog.table.row_by_id[card_id]]}"
+        return label if section == MAIN else f"{label} ({SECTION_NAMES[section]})"
+    
+    def set_deck_row(self, index, label):
+        self.deck_listbox.delete(index)
+        self.deck_listbox.insert(index, label)
     
     def add_to_deck(self):
         selection = self.card_listbox.curselection()
@@ -299,15 +349,19 @@ class YugiohDeckBuilder:
             messagebox.showwarning("Warning", "Please select a card to add to your deck.")
             return
         
-        card_name = self.card_listbox.get(selection[0])
-        card_data = next((card for card in self.all_cards if card['name'] == card_name), None)
+        card_data = self.listed_cards[selection[0]]
+        try:
+            section, row, copies = self.current_deck.add(card_data['id'])
+        except DeckError as e:
+            messagebox.showwarning("Warning", f"Cannot add {card_data['name']}: {e}")
+            return
         
-        if card_data:
-            self.current_deck.append(card_data)
-            self.deck_listbox.insert(tk.END, card_data['name'])
-            messagebox.showinfo("Success", f"Added {card_name} to your deck!")
+        index = self.deck_list_index(section, row)
+        if copies == 1:
+            self.deck_listbox.insert(index, self.deck_label(card_data['id'], section))
         else:
-            messagebox.showerror("Error", "Could not add card to deck.")
+            self.set_deck_row(index, self.deck_label(card_data['id'], section))
+        messagebox.showinfo("Success", f"Added {card_data['name']} to your deck!")
     
     def remove_from_deck(self):
         selection = self.deck_listbox.curselection()
@@ -315,11 +369,19 @@ class YugiohDeckBuilder:
             messagebox.showwarning("Warning", "Please select a card to remove from your deck.")
             return
         
-        card_name = self.deck_listbox.get(selection[0])
-        card_index = selection[0]
+        section, row = self.deck_position(selection[0])
+        card_id = self.current_deck.card_id_at(section, row)
+        last = self.deck_list_index(section, len(self.current_deck.ids[section]) - 1)
         
-        self.current_deck.pop(card_index)
-        self.deck_listbox.delete(card_index)
+        row, copies = self.current_deck.remove(card_id, section)
+        index = self.deck_list_index(section, row)
+        if copies:
+            self.set_deck_row(index, self.deck_label(card_id, section))
+        else:
+            # The deck moved the section's last entry into the freed row
+            if index < last:
+                self.set_deck_row(index, self.deck_label(self.current_deck.card_id_at(section, row), section))
+            self.deck_listbox.delete(last)
     
     def clear_deck(self):
         if messagebox.askyesno("Confirm", "Are you sure you want to clear your entire deck?"):
@@ -341,48 +403,40 @@ class YugiohDeckBuilder:
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=DECK_FILE_TYPES
         )
         
         if file_path:
             try:
-                # Save only essential card data
-                deck_data = []
-                for card in self.current_deck:
-                    deck_data.append({
-                        'id': card['id'],
-                        'name': card['name'],
-                        'type': card['type']
-                    })
-                
-                with open(file_path, 'w') as f:
-                    json.dump(deck_data, f, indent=2)
-                
+                # Card ids and counts only
+                save_deck_file(file_path, DeckFile.from_deck(self.current_deck))
                 messagebox.showinfo("Success", "Deck saved successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save deck: {str(e)}")
     
     def open_deck(self):
         file_path = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
+            filetypes=DECK_FILE_TYPES
         )
         
         if file_path:
             try:
-                with open(file_path, 'r') as f:
-                    deck_data = json.load(f)
-                
-                self.current_deck.clear()
+                deck_file = load_deck_file(file_path)
+                self.catalog.load()
+                # Cards are looked up in the local catalog; nothing is downloaded per card
+                self.current_deck, missing, skipped = hydrate(deck_file, self.catalog.table)
                 self.deck_listbox.delete(0, tk.END)
                 
-                for card_info in deck_data:
-                    # Fetch full card data for each card in the deck
-                    card_data = self.fetch_card_data(card_info['name'])
-                    if card_data:
-                        self.current_deck.append(card_data)
-                        self.deck_listbox.insert(tk.END, card_data['name'])
+                for section in SECTIONS:
+                    for card_id, _ in self.current_deck.entries(section):
+                        self.deck_listbox.insert(tk.END, self.deck_label(card_id, section))
                 
-                messagebox.showinfo("Success", "Deck loaded successfully!")
+                message = "Deck loaded successfully!"
+                if missing:
+                    message += f" ({len(missing)} card(s) not found)"
+                if skipped:
+                    message += f" ({len(skipped)} card(s) over the deck limits were left out)"
+                messagebox.showinfo("Success", message)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load deck: {str(e)}")
     
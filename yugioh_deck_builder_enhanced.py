@@ -1,12 +1,28 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import requests
-from PIL import Image, ImageTk
-import io
-import json
+from tkinter import ttk, messagebox, filedialog, simpledialog
+from PIL import ImageTk
 import os
 import threading
 from datetime import datetime
+from debounced_search import DebouncedSearch
+from ui_dispatch import UIDispatcher
+from virtual_list import VirtualListbox
+from ygocore import (DECK, DECK_FILE_TYPES, EXTRA, MAIN, NEARBY, SECTION_NAMES, SECTIONS, SELECTED, SIDE,
+                     VISIBLE, CardImageCache, CardQuery, CatalogError, Deck, DeckError, DeckFile,
+                     DeckFormatError, ImageCacheError, ImageLRU, PrefetchPool, annotate, format_ydke, get_catalog,
+                     get_recorder, hydrate, image_size_bytes, load_deck_file, parse_ydke, save_deck_file, span,
+                     timed)
+
+# Filter bar: categorical facets get a drop-down, stats get a bound entry
+FACET_CHOICES = (("type", "Type"), ("attribute", "Attribute"), ("race", "Race"))
+STAT_FILTERS = (("level", "Level ≤", "max"), ("atk", "ATK ≥", "min"), ("def", "DEF ≥", "min"))
+CARD_IMAGE_SIZE = (250, 350)
+# List rows on each side of the selection whose images are kept ready in memory
+NEARBY_RADIUS = 5
+# Columns of the performance panel: (heading, summary key, format)
+PERF_COLUMNS = (("Runs", "count", "{}"), ("p50 ms", "p50_ms", "{:.1f}"), ("p90 ms", "p90_ms", "{:.1f}"),
+                ("p99 ms", "p99_ms", "{:.1f}"), ("Max ms", "max_ms", "{:.1f}"), ("KB", "bytes", "{:.0f}"),
+                ("Cache hits", "hit_rate", "{:.0%}"))
 
 class YugiohDeckBuilder:
     def __init__(self, root):
@@ -19,16 +35,35 @@ class YugiohDeckBuilder:
         self.center_window()
         
         # Initialize variables
-        self.current_deck = []
-        self.all_cards = []
-        self.filtered_cards = []
+        self.catalog = get_catalog()
+        # Card lists are views (row index arrays) over the catalog table
+        self.current_deck = Deck(self.catalog.table)
+        self.all_cards = self.catalog.view()
+        self.filtered_cards = self.all_cards
+        self.card_query = CardQuery(self.catalog)
         self.current_theme = "dark"
-        self.card_images = {}
+        # Ready-to-display images in memory, backed by resized copies on disk
+        self.card_images = ImageLRU()
+        self.image_cache = CardImageCache()
         self.is_loading = False
         
         # Setup theme colors
         self.setup_themes()
         
+        # Background threads hand their results to the Tk thread through this queue
+        self.ui = UIDispatcher(self.root)
+        
+        # Keystroke filtering runs debounced on a worker thread
+        self.search_pipeline = DebouncedSearch(self.root, self.run_filter_query, self.apply_filter_result)
+        
+        # Image loads, urgent or speculative, share one small worker pool
+        self.prefetcher = PrefetchPool(self.fetch_card_image)
+        self._visible_prefetch_id = None
+        
+        # Timing spans of the hot paths, shown in View > Performance
+        self.perf = get_recorder()
+        self.perf_window = None
+        
         # Create GUI
         self.create_menu()
         self.create_main_frame()
@@ -38,8 +73,10 @@ class YugiohDeckBuilder:
         self.create_details_frame()
         self.create_status_bar()
         
-        # Load initial data
-        self.load_initial_cards()
+        # The window is usable at once; the catalog loads in the background
+        self.catalog_cancel = None
+        self.catalog_shown = False
+        self.root.after_idle(self.start_catalog_load)
         
         # Apply initial theme
         self.change_theme("dark")
@@ -96,15 +133,24 @@ class YugiohDeckBuilder:
         file_menu.add_command(label="Open Deck", command=self.open_deck, accelerator="Ctrl+O")
         file_menu.add_command(label="Save Deck", command=self.save_deck, accelerator="Ctrl+S")
         file_menu.add_separator()
+        file_menu.add_command(label="Import YDKE URL...", command=self.import_ydke)
+        file_menu.add_command(label="Copy Deck as YDKE URL", command=self.copy_ydke)
         file_menu.add_command(label="Import Cards", command=self.import_cards)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit, accelerator="Ctrl+Q")
         menubar.add_cascade(label="File", menu=file_menu)
         
+        # Search menu
+        search_menu = tk.Menu(menubar, tearoff=0, bg=self.themes[self.current_theme]["bg"], fg=self.themes[self.current_theme]["fg"])
+        search_menu.add_command(label="Search Card Text...", command=self.search_card_text, accelerator="Ctrl+F")
+        menubar.add_cascade(label="Search", menu=search_menu)
+        
         # View menu
         view_menu = tk.Menu(menubar, tearoff=0, bg=self.themes[self.current_theme]["bg"], fg=self.themes[self.current_theme]["fg"])
         view_menu.add_command(label="Light Theme", command=lambda: self.change_theme("light"))
         view_menu.add_command(label="Dark Theme", command=lambda: self.change_theme("dark"))
+        view_menu.add_separator()
+        view_menu.add_command(label="Performance...", command=self.show_performance_panel)
         menubar.add_cascade(label="View", menu=view_menu)
         
         # Help menu
@@ -118,6 +164,7 @@ class YugiohDeckBuilder:
         self.root.bind('<Control-n>', lambda e: self.new_deck())
         self.root.bind('<Control-o>', lambda e: self.open_deck())
         self.root.bind('<Control-s>', lambda e: self.save_deck())
+        self.root.bind('<Control-f>', lambda e: self.search_card_text())
         self.root.bind('<Control-q>', lambda e: self.root.quit())
     
     def create_main_frame(self):
@@ -178,19 +225,27 @@ class YugiohDeckBuilder:
                 bg=self.themes[self.current_theme]["header_bg"],
                 fg=self.themes[self.current_theme]["header_fg"]).pack(pady=10)
         
+        self.create_facet_bar(left_frame)
+        
         # Card list with scrollbar
         list_frame = tk.Frame(left_frame, bg=self.themes[self.current_theme]["bg"])
         list_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.card_listbox = tk.Listbox(list_frame, height=20, 
-                                      bg=self.themes[self.current_theme]["list_bg"],
-                                      fg=self.themes[self.current_theme]["list_fg"],
-                                      font=("Arial", 10),
-                                      selectbackground=self.themes[self.current_theme]["highlight"],
-                                      bd=2, relief=tk.SOLID)
+        # Only the visible rows are drawn, so large result sets stay cheap
+        self.card_listbox = VirtualListbox(list_frame, height=20,
+                                          bg=self.themes[self.current_theme]["list_bg"],
+                                          fg=self.themes[self.current_theme]["list_fg"],
+                                          font=("Arial", 10),
+                                          selectbackground=self.themes[self.current_theme]["highlight"],
+                                          bd=2, relief=tk.SOLID)
         
         scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.card_listbox.yview)
-        self.card_listbox.configure(yscrollcommand=scrollbar.set)
+        
+        def on_list_scroll(first, last):
+            scrollbar.set(first, last)
+            self.schedule_visible_prefetch()
+        
+        self.card_listbox.configure(yscrollcommand=on_list_scroll)
         
         self.card_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -209,6 +264,39 @@ class YugiohDeckBuilder:
         add_btn.bind("<Enter>", lambda e: add_btn.config(bg="#219a52"))
         add_btn.bind("<Leave>", lambda e: add_btn.config(bg=self.themes[self.current_theme]["success"]))
     
+    def create_facet_bar(self, parent):
+        # Facet filters, combined with the name search
+        theme = self.themes[self.current_theme]
+        facet_frame = tk.Frame(parent, bg=theme["bg"])
+        facet_frame.pack(fill=tk.X, pady=(5, 5))
+        
+        self.facet_boxes = {}
+        self.facet_labels = {}
+        for column, (field, label) in enumerate(FACET_CHOICES):
+            tk.Label(facet_frame, text=label, font=("Arial", 9),
+                    bg=theme["bg"], fg=theme["fg"]).grid(row=0, column=column, sticky=tk.W)
+            box = ttk.Combobox(facet_frame, values=["Any"], state="readonly", width=16)
+            box.set("Any")
+            box.grid(row=1, column=column, padx=(0, 5), sticky=tk.EW)
+            box.bind('<<ComboboxSelected>>', self.filter_cards)
+            self.facet_boxes[field] = box
+            self.facet_labels[field] = {}
+        
+        self.stat_vars = {}
+        for column, (field, label, bound) in enumerate(STAT_FILTERS):
+            tk.Label(facet_frame, text=label, font=("Arial", 9),
+                    bg=theme["bg"], fg=theme["fg"]).grid(row=2, column=column, sticky=tk.W)
+            var = tk.StringVar()
+            entry = tk.Entry(facet_frame, textvariable=var, width=8, font=("Arial", 10))
+            entry.grid(row=3, column=column, padx=(0, 5), sticky=tk.EW)
+            entry.bind('<KeyRelease>', self.filter_cards)
+            self.stat_vars[field] = (var, bound)
+        
+        clear_btn = tk.Button(facet_frame, text="Clear", command=self.clear_facets,
+                             bg=theme["button_bg"], fg=theme["button_fg"],
+                             font=("Arial", 9), bd=0, padx=10, cursor="hand2")
+        clear_btn.grid(row=3, column=len(STAT_FILTERS), sticky=tk.W)
+    
     def create_deck_frame(self):
         # Middle frame for current deck
         middle_frame = tk.Frame(self.main_frame, bg=self.themes[self.current_theme]["bg"])
@@ -219,12 +307,25 @@ class YugiohDeckBuilder:
         header.pack(fill=tk.X)
         header.pack_propagate(False)
         
-        self.deck_count_label = tk.Label(header, text="CURRENT DECK (0 cards)", 
+        self.deck_count_label = tk.Label(header, text="MAIN 0 · EXTRA 0 · SIDE 0", 
                                         font=("Arial", 12, "bold"),
                                         bg=self.themes[self.current_theme]["header_bg"],
                                         fg=self.themes[self.current_theme]["header_fg"])
         self.deck_count_label.pack(pady=10)
         
+        # Which section the list shows; new cards go to the Side Deck only while it is shown
+        section_frame = tk.Frame(middle_frame, bg=self.themes[self.current_theme]["bg"])
+        section_frame.pack(fill=tk.X, pady=(5, 0))
+        self.deck_section = tk.StringVar(value=MAIN)
+        for section in SECTIONS:
+            tk.Radiobutton(section_frame, text=SECTION_NAMES[section], value=section,
+                           variable=self.deck_section, command=self.show_deck_section,
+                           indicatoron=False, font=("Arial", 9, "bold"), padx=8, pady=3,
+                           bg=self.themes[self.current_theme]["button_bg"],
+                           fg=self.themes[self.current_theme]["button_fg"],
+                           selectcolor=self.themes[self.current_theme]["highlight"]
+                           ).pack(side=tk.LEFT, expand=True, fill=tk.X)
+        
         # Deck list with scrollbar
         deck_frame = tk.Frame(middle_frame, bg=self.themes[self.current_theme]["bg"])
         deck_frame.pack(fill=tk.BOTH, expand=True)
@@ -320,137 +421,403 @@ class YugiohDeckBuilder:
         self.status_var = tk.StringVar()
         self.status_var.set("Ready")
         
-        status_bar = tk.Label(self.root, textvariable=self.status_var,
-                             relief=tk.SUNKEN, anchor=tk.W,
+        status_frame = tk.Frame(self.root, bg=self.themes[self.current_theme]["header_bg"],
+                                relief=tk.SUNKEN, bd=1)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        status_bar = tk.Label(status_frame, textvariable=self.status_var, anchor=tk.W,
                              bg=self.themes[self.current_theme]["header_bg"],
                              fg=self.themes[self.current_theme]["header_fg"])
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Catalog loading progress; packed only while a load runs or can be retried
+        self.load_button = tk.Button(status_frame, font=("Arial", 8), bd=0, padx=8, cursor="hand2",
+                                     bg=self.themes[self.current_theme]["button_bg"],
+                                     fg=self.themes[self.current_theme]["button_fg"])
+        self.load_progress = ttk.Progressbar(status_frame, length=200)
     
-    def update_status(self, message):
+    def update_status(self, message, flush=False):
+        """Show a status message; flush repaints now, for use inside long synchronous work"""
         self.status_var.set(message)
-        self.root.update_idletasks()
+        if flush:
+            self.root.update_idletasks()
     
-    def fetch_card_data(self, card_name):
-        self.update_status(f"Fetching data for {card_name}...")
-        url = "https://db.ygoprodeck.com/api/v7/cardinfo.php"
+    def start_catalog_load(self):
+        """Load the catalog on a worker thread; the list fills in as cards arrive"""
+        self.catalog_cancel = threading.Event()
+        token = self.ui.begin("catalog_load")
+        self.hide_load_progress()
+        self.load_progress.config(mode="indeterminate", value=0)
+        self.load_progress.start(15)
+        self.load_progress.pack(side=tk.RIGHT, padx=5)
+        self.load_button.config(text="Cancel", command=self.cancel_catalog_load)
+        self.load_button.pack(side=tk.RIGHT, padx=(0, 5))
+        self.update_status("Loading card catalog...")
+        threading.Thread(target=self.load_catalog_worker, args=(token, self.catalog_cancel),
+                         name="catalog-load", daemon=True).start()
+    
+    def load_catalog_worker(self, token, cancel):
+        """Body of the catalog loading thread; all results go through the dispatch queue"""
+        def progress(cards, expected):
+            self.ui.post(self.add_loaded_cards, cards, expected, channel="catalog_load", token=token)
+        
         try:
-            response = requests.get(url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                for card in data['data']:
-                    if card['name'].lower() == card_name.lower():
-                        self.update_status(f"Found {card_name}")
-                        return card
-                self.update_status(f"Card '{card_name}' not found")
-                return None
-            else:
-                self.update_status(f"API Error: {response.status_code}")
-                messagebox.showerror("Error", f"API Error: {response.status_code}")
-                return None
-        except Exception as e:
-            self.update_status(f"Error fetching data: {str(e)}")
-            messagebox.showerror("Error", f"Failed to fetch card data: {str(e)}")
+            with span("load_catalog"):
+                self.catalog.load(progress=progress, is_cancelled=cancel.is_set)
+        except CatalogError as e:
+            # This load is over either way; the next load_catalog() may start another
+            cancel.set()
+            self.ui.post(self.catalog_load_stopped, str(e), channel="catalog_load", token=token)
+            return
+        self.ui.post(self.catalog_load_finished, channel="catalog_load", token=token)
+        # Card text is indexed (and saved for later sessions) here, not on the first text search
+        with span("text_index"):
+            self.catalog.prepare_text_index()
+    
+    def add_loaded_cards(self, cards, expected):
+        """Show the cards read so far by the running catalog load, a view built by the worker (Tk thread)"""
+        if expected:
+            self.load_progress.stop()
+            self.load_progress.config(mode="determinate", maximum=expected, value=min(len(cards), expected))
+        # Browsable right away; searching and deck editing wait for the finished catalog
+        self.all_cards = cards
+        self.filtered_cards = self.all_cards
+        self.card_listbox.set_model(self.filtered_cards)
+        self.update_status(f"Loading card catalog... {len(cards)} cards")
+    
+    def catalog_load_finished(self):
+        self.catalog_cancel = None
+        self.hide_load_progress()
+        self.show_catalog()
+    
+    def catalog_load_stopped(self, message):
+        """The background load failed or was cancelled: say so, and offer to try again"""
+        self.catalog_cancel = None
+        self.load_progress.stop()
+        self.load_progress.pack_forget()
+        self.load_button.config(text="Retry", command=self.start_catalog_load)
+        self.update_status(message)
+    
+    def cancel_catalog_load(self):
+        self.catalog_cancel.set()
+        # Batches still in the queue are dropped
+        self.ui.begin("catalog_load")
+        self.catalog_load_stopped("Loading the card catalog was cancelled")
+    
+    def hide_load_progress(self):
+        self.load_progress.stop()
+        self.load_progress.pack_forget()
+        self.load_button.pack_forget()
+    
+    def catalog_loading(self):
+        """True while a background load is running; catalog_cancel is only set while one is"""
+        return self.catalog_cancel is not None and not self.catalog_cancel.is_set() and not self.catalog.loaded
+    
+    def show_catalog(self):
+        """List every catalog card, once the catalog is loaded"""
+        self.catalog_shown = True
+        # Views are created once the catalog table is loaded
+        self.current_deck = Deck(self.catalog.table)
+        self.all_cards = self.catalog.view(range(len(self.catalog.table)))
+        self.filtered_cards = self.all_cards
+        self.card_listbox.set_model(self.filtered_cards)
+        self.update_status(f"Loaded {len(self.all_cards)} cards")
+        # Fill in the facet counts in the background
+        self.filter_cards(None)
+    
+    def load_catalog(self):
+        """True once the catalog is loaded; otherwise make sure it is loading and return False"""
+        if self.catalog.loaded:
+            if not self.catalog_shown:
+                # The background load finished just as it was cancelled
+                self.hide_load_progress()
+                self.show_catalog()
+            return True
+        if self.catalog_loading():
+            self.update_status("The card catalog is still loading...")
+            return False
+        # The background load was cancelled or failed: start it again, without blocking Tk
+        self.start_catalog_load()
+        return False
+    
+    @timed()
+    def fetch_card_data(self, card_name):
+        if not self.load_catalog():
             return None
+        
+        card = self.catalog.get_by_name(card_name)
+        if card:
+            self.update_status(f"Found {card['name']}")
+        else:
+            self.update_status(f"Card '{card_name}' not found")
+        return card
     
-    def fetch_card_image(self, image_url):
+    def resolve_cards(self, keys, label):
+        """Resolve a list of card names or ids to catalog rows in one batch"""
+        if not self.load_catalog():
+            return [], list(keys)
+        
+        def progress(done, total):
+            self.update_status(f"{label} {done}/{total}...", flush=True)
+        
         try:
-            response = requests.get(image_url, timeout=10)
-            if response.status_code == 200:
-                image_data = response.content
-                image = Image.open(io.BytesIO(image_data))
-                image = image.resize((250, 350), Image.Resampling.LANCZOS)
-                return ImageTk.PhotoImage(image)
-            return None
-        except Exception as e:
+            return self.catalog.resolve_rows(keys, progress=progress)
+        except CatalogError as e:
+            self.update_status(str(e))
+            messagebox.showerror("Error", str(e))
+            return [], list(keys)
+    
+    @timed()
+    def fetch_card_image(self, card_id, image_url, small_url=None):
+        """The resized card image from the disk cache, downloading it if needed (any thread)"""
+        try:
+            return self.image_cache.load(card_id, image_url, CARD_IMAGE_SIZE, small_url)
+        except ImageCacheError as e:
             print(f"Error loading image: {str(e)}")
             return None
     
-    def load_initial_cards(self):
-        self.update_status("Loading initial cards...")
-        # Load more popular cards initially
-        popular_cards = [
-            "Dark Magician", "Blue-Eyes White Dragon", "Red-Eyes Black Dragon",
-            "Exodia the Forbidden One", "Summoned Skull", "Celtic Guardian",
-            "Dark Magician Girl", "Kuriboh", "Time Wizard", "Mystical Elf",
-            "Gaia The Fierce Knight", "Buster Blader", "Jinzo", "Cyber Dragon",
-            "Elemental HERO Neos", "Stardust Dragon", "Black Luster Soldier",
-            "Obelisk the Tormentor", "Slifer the Sky Dragon", "The Winged Dragon of Ra",
-            "Blue-Eyes Ultimate Dragon", "Magician of Black Chaos", "Dark Paladin", "Toon World",
-            "Toon Summoned Skull", "Toon Mermaid", "Toon Blue-Eyes White Dragon", "Toon Dark Magician Girl",
-            "Obnoxious Celtic Guard", "Breaker the Magical Warrior", "Sangan", "Man-Eater Bug",
-            "Trap Hole", "Mirror Force", "Monster Reborn", "Pot of Greed",
-            "Polymerization", "Change of Heart", "Swords of Revealing Light", "Raigeki"
-        ]
-        
-        for card_name in popular_cards:
-            card_data = self.fetch_card_data(card_name)
-            if card_data:
-                self.all_cards.append(card_data)
-                self.card_listbox.insert(tk.END, card_data['name'])
-        
-        self.filtered_cards = self.all_cards.copy()
-        self.update_status(f"Loaded {len(self.all_cards)} cards")
+    def on_image_prefetched(self, card_id, image):
+        """Prefetch callback (worker thread)"""
+        self.ui.post(self.store_card_image, card_id, image, key=("image", card_id))
+    
+    def store_card_image(self, card_id, image):
+        """Keep a loaded image in memory, ready to display; returns its PhotoImage"""
+        photo = self.card_images.get(card_id)
+        if photo is None and image is not None:
+            photo = ImageTk.PhotoImage(image)
+            self.card_images.put(card_id, photo, image_size_bytes(*CARD_IMAGE_SIZE))
+        return photo
+    
+    def show_card_image(self, card_id, image):
+        """Display the image of the selected card (Tk thread)"""
+        photo = self.store_card_image(card_id, image)
+        if photo is None:
+            self.card_image_label.config(image="", text="Image not available")
+            self.card_image_label.image = None
+            self.update_status("Image load failed")
+            return
+        self.card_image_label.config(image=photo)
+        self.card_image_label.image = photo
+        self.update_status("Image loaded")
+    
+    def image_job(self, row):
+        """(card id, fetch_card_image arguments) for a table row, or None without an image"""
+        table = self.catalog.table
+        url = table.image_url(row)
+        if url is None:
+            return None
+        card_id = table.ids[row]
+        return card_id, (card_id, url, table.image_url(row, 'image_url_small'))
+    
+    def disk_prefetch_jobs(self, rows):
+        """Jobs for the rows whose resized image is not on disk yet"""
+        jobs = []
+        for row in rows:
+            job = self.image_job(row)
+            if job and not self.image_cache.has(job[0], CARD_IMAGE_SIZE):
+                jobs.append(job)
+        return jobs
+    
+    def listing_catalog(self):
+        """Whether the card list shows rows of the finished catalog, not of a load in progress"""
+        return self.catalog_shown and self.filtered_cards.table is self.catalog.table
+    
+    def prefetch_around(self, index):
+        """Get the images next to the selected list row ready in memory, closest first"""
+        if not self.listing_catalog():
+            return
+        rows = self.filtered_cards.rows
+        nearby = sorted(range(max(0, index - NEARBY_RADIUS), min(len(rows), index + NEARBY_RADIUS + 1)),
+                        key=lambda i: abs(i - index))
+        jobs = []
+        for i in nearby[1:]:
+            job = self.image_job(rows[i])
+            if job and job[0] not in self.card_images:
+                jobs.append(job)
+        self.prefetcher.replace("nearby", jobs, NEARBY, callback=self.on_image_prefetched)
+    
+    def schedule_visible_prefetch(self):
+        # Wait for scrolling to settle before queueing anything
+        if self._visible_prefetch_id is not None:
+            self.root.after_cancel(self._visible_prefetch_id)
+        self._visible_prefetch_id = self.root.after(150, self.prefetch_visible)
+    
+    def prefetch_visible(self):
+        """Download the images of the cards on screen in the background"""
+        self._visible_prefetch_id = None
+        if not self.listing_catalog():
+            return
+        first, last = self.card_listbox.visible_range()
+        self.prefetcher.replace("visible", self.disk_prefetch_jobs(self.filtered_cards.rows[first:last]), VISIBLE)
+    
+    def prefetch_deck(self):
+        """Download the images of every deck card, behind anything on screen"""
+        row_by_id = self.catalog.table.row_by_id
+        rows = [row_by_id[card_id] for card_id in self.current_deck.copies if card_id in row_by_id]
+        self.prefetcher.replace("deck", self.disk_prefetch_jobs(rows), DECK)
     
     def search_cards(self):
         search_term = self.search_var.get().strip()
         if not search_term:
             self.update_status("Please enter a search term")
             return
+        if not self.load_catalog():
+            return
         
-        self.update_status(f"Searching for '{search_term}'...")
+        self.update_status(f"Searching for '{search_term}'...", flush=True)
         card_data = self.fetch_card_data(search_term)
         if card_data:
-            # Clear current list and add the found card
-            self.card_listbox.delete(0, tk.END)
-            self.filtered_cards = [card_data]
-            self.card_listbox.insert(tk.END, card_data['name'])
+            # Replace the current list with the found card
+            self.filtered_cards = self.catalog.view([self.catalog.row_by_id(card_data['id'])])
+            self.card_listbox.set_model(self.filtered_cards)
             self.update_status(f"Found: {card_data['name']}")
+            return
+        
+        # No exact match: offer the closest names instead
+        rows = self.catalog.suggest(search_term) if self.catalog.loaded else []
+        if rows:
+            self.filtered_cards = self.catalog.view(rows)
+            self.card_listbox.set_model(self.filtered_cards)
+            self.update_status(f"No exact match for '{search_term}', showing {len(rows)} close matches")
         else:
             messagebox.showinfo("Not Found", f"Card '{search_term}' not found.")
             self.update_status(f"Card '{search_term}' not found")
     
+    def search_card_text(self):
+        """Rank cards by how well their effect text matches a query"""
+        query = simpledialog.askstring("Search Card Text",
+                                       'Words or "quoted phrases" to find in card effects:',
+                                       parent=self.root)
+        if not query or not query.strip():
+            return
+        if not self.catalog.loaded:
+            self.update_status("Card catalog is not loaded")
+            return
+        
+        self.update_status("Searching card text...", flush=True)
+        rows = self.catalog.search_text(query, limit=500)
+        self.search_pipeline.cancel()
+        self.filtered_cards = self.catalog.view(rows)
+        self.card_listbox.set_model(self.filtered_cards)
+        self.update_status(f"Found {len(rows)} cards whose text matches '{query}'")
+    
+    def suggest_corrections(self, names):
+        """Offer the closest catalog match for unresolved names; returns the accepted rows"""
+        names = [name for name in names if isinstance(name, str)]
+        if not names or not self.catalog.loaded:
+            return []
+        
+        best = {}
+        for name in names:
+            if name not in best:
+                rows = self.catalog.suggest(name, limit=1)
+                best[name] = rows[0] if rows else None
+        corrections = [(name, best[name]) for name in names if best[name] is not None]
+        if not corrections:
+            return []
+        
+        table_names = self.catalog.table.names
+        lines = [f"{name} → {table_names[row]}" for name, row in corrections[:15]]
+        if len(corrections) > 15:
+            lines.append(f"... and {len(corrections) - 15} more")
+        if messagebox.askyesno("Did you mean?",
+                               f"{len(corrections)} card name(s) were not found. "
+                               f"Use the closest matches?\n\n" + "\n".join(lines)):
+            return [row for _, row in corrections]
+        return []
+    
+    def current_facets(self):
+        """Filters chosen in the filter bar, in FacetIndex form"""
+        filters = {}
+        for field, box in self.facet_boxes.items():
+            value = self.facet_labels[field].get(box.get())
+            if value is not None:
+                filters[field] = {value}
+        for field, (var, bound) in self.stat_vars.items():
+            try:
+                number = int(var.get())
+            except ValueError:
+                continue
+            filters[field] = (None, number) if bound == "max" else (number, None)
+        return filters
+    
+    def clear_facets(self):
+        for box in self.facet_boxes.values():
+            box.set("Any")
+        for var, _ in self.stat_vars.values():
+            var.set("")
+        self.filter_cards(None)
+    
+    @timed()
     def filter_cards(self, event):
         search_term = self.search_var.get().lower()
-        self.card_listbox.delete(0, tk.END)
+        facets = self.current_facets()
         
-        if not search_term:
+        if not search_term and not facets:
             # Show all cards if search is empty
-            for card in self.all_cards:
-                self.card_listbox.insert(tk.END, card['name'])
-            self.filtered_cards = self.all_cards.copy()
+            self.search_pipeline.cancel()
+            self.filtered_cards = self.all_cards
+            self.card_listbox.set_model(self.filtered_cards)
+            if not self.catalog.loaded:
+                return
+        elif not self.catalog.loaded:
+            self.update_status("Card catalog is not loaded")
             return
         
-        filtered = []
-        for card in self.all_cards:
-            if search_term in card['name'].lower():
-                self.card_listbox.insert(tk.END, card['name'])
-                filtered.append(card)
-        
+        # Still runs with an empty query, to refresh the facet counts
+        self.search_pipeline.submit((search_term, facets))
+    
+    @timed("filter_query")
+    def run_filter_query(self, query, is_cancelled):
+        """Search the whole catalog on the search worker thread.
+        
+        Returns (rows, counts): the matching rows, or None when nothing is
+        filtered, and the per-facet counts for the filter bar.
+        """
+        search_term, facets = query
+        return self.card_query.run(search_term, facets, self.facet_boxes, is_cancelled)
+    
+    def apply_filter_result(self, query, result):
+        """Show the result of the latest filter query (Tk thread)"""
+        if result is None:
+            return
+        rows, counts = result
+        self.update_facet_choices(counts)
+        if rows is None:
+            return
+        filtered = self.catalog.view(rows)
         self.filtered_cards = filtered
+        self.card_listbox.set_model(filtered)
         self.update_status(f"Found {len(filtered)} matching cards")
     
+    def update_facet_choices(self, counts):
+        """Relabel the facet drop-downs with how many cards each choice would give"""
+        for field, box in self.facet_boxes.items():
+            current = self.facet_labels[field].get(box.get())
+            labels = {f"{value} ({count})": value
+                      for value, count in sorted(counts[field].items())
+                      if count or value == current}
+            self.facet_labels[field] = labels
+            box.configure(values=["Any"] + list(labels))
+            box.set(next((label for label, value in labels.items() if value == current), "Any"))
+    
     def on_card_select(self, event):
         selection = self.card_listbox.curselection()
         if not selection:
             return
         
-        card_name = self.card_listbox.get(selection[0])
-        card_data = next((card for card in self.filtered_cards if card['name'] == card_name), None)
-        
-        if card_data:
-            self.display_card_details(card_data)
+        self.display_card_details(self.filtered_cards.card(selection[0]))
+        self.prefetch_around(selection[0])
     
     def on_deck_card_select(self, event):
         selection = self.deck_listbox.curselection()
         if not selection:
             return
         
-        card_name = self.deck_listbox.get(selection[0])
-        card_data = next((card for card in self.current_deck if card['name'] == card_name), None)
-        
-        if card_data:
-            self.display_card_details(card_data)
+        card_id = self.current_deck.card_id_at(self.deck_section.get(), selection[0])
+        self.display_card_details(self.catalog.get_by_id(card_id))
     
+    @timed()
     def display_card_details(self, card_data):
         # Clear previous details
         self.details_text.config(state=tk.NORMAL)
@@ -474,47 +841,65 @@ class YugiohDeckBuilder:
         self.details_text.insert(tk.END, details)
         self.details_text.config(state=tk.DISABLED)
         
-        # Load and display card image
+        # Load and display card image; any load still running for an earlier card goes stale
+        token = self.ui.begin("card_image")
         if 'card_images' in card_data and card_data['card_images']:
-            image_url = card_data['card_images'][0]['image_url']
+            card_id = card_data['id']
+            photo = self.card_images.get(card_id)
+            if photo is not None:
+                # Seen this session: no disk or network access at all
+                annotate(cache='hit')
+                self.card_image_label.config(image=photo)
+                self.card_image_label.image = photo
+                return
+            
+            annotate(cache='miss')
+            first_image = card_data['card_images'][0]
+            image_url, small_url = first_image['image_url'], first_image.get('image_url_small')
             self.update_status("Loading image...")
             
-            # Load image in background to prevent UI freezing
-            def load_image():
-                photo = self.fetch_card_image(image_url)
-                if photo:
-                    self.card_image_label.config(image=photo)
-                    self.card_image_label.image = photo
-                    self.update_status("Image loaded")
-                else:
-                    self.card_image_label.config(text="Image not available")
-                    self.update_status("Image load failed")
+            def on_loaded(card_id, image):
+                self.ui.post(self.show_card_image, card_id, image, channel="card_image", token=token)
             
-            threading.Thread(target=load_image, daemon=True).start()
+            # Load image in background to prevent UI freezing; jumps ahead of any prefetching, and
+            # replaces the load of an earlier selection that has not started yet
+            self.prefetcher.replace("selected", [(card_id, (card_id, image_url, small_url))], SELECTED,
+                                    callback=on_loaded)
         else:
-            self.card_image_label.config(text="Image not available")
+            self.card_image_label.config(image="", text="Image not available")
+            self.card_image_label.image = None
     
     def add_to_deck(self):
         selection = self.card_listbox.curselection()
         if not selection:
             messagebox.showwarning("Warning", "Please select a card to add to your deck.")
             return
+        if not self.listing_catalog():
+            # Decks need the finished catalog; this also reloads it after a cancelled load
+            self.load_catalog()
+            return
         
-        card_name = self.card_listbox.get(selection[0])
-        card_data = next((card for card in self.filtered_cards if card['name'] == card_name), None)
+        row = self.filtered_cards.rows[selection[0]]
+        card_name = self.catalog.table.names[row]
+        # Main or Extra Deck by card type, unless the Side Deck is the one being edited
+        section = SIDE if self.deck_section.get() == SIDE else None
         
-        if card_data:
-            # Check if card already in deck
-            if any(card['name'] == card_name for card in self.current_deck):
-                messagebox.showwarning("Warning", f"{card_name} is already in your deck!")
-                return
-                
-            self.current_deck.append(card_data)
-            self.deck_listbox.insert(tk.END, card_data['name'])
-            self.update_deck_count()
-            messagebox.showinfo("Success", f"Added {card_name} to your deck!")
+        try:
+            section, deck_row, copies = self.current_deck.add(self.catalog.table.ids[row], section)
+        except DeckError as e:
+            messagebox.showwarning("Warning", f"Cannot add {card_name}: {e}")
+            return
+        
+        if section != self.deck_section.get():
+            self.deck_section.set(section)
+            self.show_deck_section()
+        elif copies == 1:
+            self.deck_listbox.insert(tk.END, self.deck_label(card_name, copies))
         else:
-            messagebox.showerror("Error", "Could not add card to deck.")
+            self.set_deck_row(deck_row, self.deck_label(card_name, copies))
+        self.deck_listbox.see(deck_row)
+        self.update_deck_count()
+        messagebox.showinfo("Success", f"Added {card_name} to your {SECTION_NAMES[section]}!")
     
     def remove_from_deck(self):
         selection = self.deck_listbox.curselection()
@@ -522,14 +907,46 @@ class YugiohDeckBuilder:
             messagebox.showwarning("Warning", "Please select a card to remove from your deck.")
             return
         
-        card_name = self.deck_listbox.get(selection[0])
+        section = self.deck_section.get()
         card_index = selection[0]
+        card_id = self.current_deck.card_id_at(section, card_index)
+        card_name = self.deck_card_name(card_id)
         
-        self.current_deck.pop(card_index)
-        self.deck_listbox.delete(card_index)
+        card_index, copies = self.current_deck.remove(card_id, section)
+        if copies:
+            self.set_deck_row(card_index, self.deck_label(card_name, copies))
+            self.deck_listbox.selection_set(card_index)
+        else:
+            # The deck moved its last entry into the freed row: mirror that in the list
+            last = self.deck_listbox.size() - 1
+            if card_index < last:
+                moved_id = self.current_deck.card_id_at(section, card_index)
+                self.set_deck_row(card_index, self.deck_label(self.deck_card_name(moved_id),
+                                                              self.current_deck.count(moved_id, section)))
+            self.deck_listbox.delete(last)
         self.update_deck_count()
         self.update_status(f"Removed {card_name} from deck")
     
+    def deck_card_name(self, card_id):
+        row = self.catalog.table.row_by_id.get(card_id)
+        return self.catalog.table.names[row] if row is not None else str(card_id)
+    
+    def deck_label(self, card_name, copies):
+        return f"{copies}x {card_name}"
+    
+    def set_deck_row(self, index, label):
+        self.deck_listbox.delete(index)
+        self.deck_listbox.insert(index, label)
+    
+    def show_deck_section(self):
+        """Fill the deck list with the section picked in the section bar"""
+        section = self.deck_section.get()
+        self.deck_listbox.delete(0, tk.END)
+        labels = [self.deck_label(self.deck_card_name(card_id), copies)
+                  for card_id, copies in self.current_deck.entries(section)]
+        if labels:
+            self.deck_listbox.insert(tk.END, *labels)
+    
     def clear_deck(self):
         if not self.current_deck:
             messagebox.showinfo("Info", "Your deck is already empty.")
@@ -542,8 +959,9 @@ class YugiohDeckBuilder:
             self.update_status("Deck cleared")
     
     def update_deck_count(self):
-        count = len(self.current_deck)
-        self.deck_count_label.config(text=f"CURRENT DECK ({count} cards)")
+        sizes = self.current_deck.sizes
+        self.deck_count_label.config(text=f"MAIN {sizes[MAIN]} · EXTRA {sizes[EXTRA]} · SIDE {sizes[SIDE]}")
+        self.prefetch_deck()
     
     def new_deck(self):
         if self.current_deck and not messagebox.askyesno("Confirm", "Create new deck? Current deck will be lost."):
@@ -560,66 +978,89 @@ class YugiohDeckBuilder:
             messagebox.showwarning("Warning", "Your deck is empty. Nothing to save.")
             return
         
+        problems = self.current_deck.problems()
+        if problems and not messagebox.askyesno("Deck not legal",
+                                                "\n".join(problems) + "\n\nSave it anyway?"):
+            return
+        
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=DECK_FILE_TYPES,
             title="Save Deck"
         )
         
         if file_path:
             try:
-                # Save only essential card data
-                deck_data = []
-                for card in self.current_deck:
-                    deck_data.append({
-                        'id': card['id'],
-                        'name': card['name'],
-                        'type': card['type'],
-                        'atk': card.get('atk', 0),
-                        'def': card.get('def', 0)
-                    })
-                
-                with open(file_path, 'w') as f:
-                    json.dump(deck_data, f, indent=2)
-                
+                # Card ids and counts only; everything else comes from the catalog on load
+                save_deck_file(file_path, DeckFile.from_deck(self.current_deck))
                 self.update_status(f"Deck saved to {os.path.basename(file_path)}")
                 messagebox.showinfo("Success", "Deck saved successfully!")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save deck: {str(e)}")
                 self.update_status("Save failed")
     
+    def set_deck(self, deck_file):
+        """Replace the current deck with a parsed deck file, looked up in the local catalog"""
+        if not self.load_catalog():
+            return
+        deck, missing, skipped = hydrate(deck_file, self.catalog.table)
+        unknown_ids = sum(isinstance(key, int) for key in missing)
+        for row in self.suggest_corrections(missing):
+            try:
+                deck.add(self.catalog.table.ids[row])
+            except DeckError as e:
+                skipped.append(f"{self.catalog.table.names[row]}: {e}")
+        
+        self.current_deck = deck
+        loaded_count = len(deck)
+        self.show_deck_section()
+        self.update_deck_count()
+        self.update_status(f"Loaded {loaded_count} cards from deck")
+        message = f"Deck loaded successfully! ({loaded_count} cards)"
+        if unknown_ids:
+            message += f"\n\n{unknown_ids} card id(s) are not in the card catalog."
+        if skipped:
+            message += f"\n\n{len(skipped)} card(s) were left out:\n" + "\n".join(skipped[:10])
+        messagebox.showinfo("Success", message)
+    
+    @timed()
     def open_deck(self):
         file_path = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=DECK_FILE_TYPES,
             title="Open Deck"
         )
         
         if file_path:
             try:
-                with open(file_path, 'r') as f:
-                    deck_data = json.load(f)
-                
-                self.current_deck.clear()
-                self.deck_listbox.delete(0, tk.END)
-                
-                self.update_status("Loading deck...")
-                loaded_count = 0
-                
-                for card_info in deck_data:
-                    # Fetch full card data for each card in the deck
-                    card_data = self.fetch_card_data(card_info['name'])
-                    if card_data:
-                        self.current_deck.append(card_data)
-                        self.deck_listbox.insert(tk.END, card_data['name'])
-                        loaded_count += 1
-                
-                self.update_deck_count()
-                self.update_status(f"Loaded {loaded_count} cards from deck")
-                messagebox.showinfo("Success", f"Deck loaded successfully! ({loaded_count} cards)")
-            except Exception as e:
+                deck_file = load_deck_file(file_path)
+            except (OSError, DeckFormatError) as e:
                 messagebox.showerror("Error", f"Failed to load deck: {str(e)}")
                 self.update_status("Load failed")
+                return
+            self.set_deck(deck_file)
+    
+    def import_ydke(self):
+        """Open a deck shared as a ydke:// URL"""
+        url = simpledialog.askstring("Import YDKE", "Paste a ydke:// deck URL:", parent=self.root)
+        if not url:
+            return
+        try:
+            deck_file = parse_ydke(url)
+        except DeckFormatError as e:
+            messagebox.showerror("Error", f"Not a valid YDKE URL: {str(e)}")
+            return
+        self.set_deck(deck_file)
     
+    def copy_ydke(self):
+        """Put the current deck on the clipboard as a ydke:// URL"""
+        if not self.current_deck:
+            messagebox.showwarning("Warning", "Your deck is empty. Nothing to copy.")
+            return
+        self.root.clipboard_clear()
+        self.root.clipboard_append(format_ydke(DeckFile.from_deck(self.current_deck)))
+        self.update_status("Copied deck as a YDKE URL")
+    
+    @timed()
     def import_cards(self):
         """Import additional cards from a text file"""
         file_path = filedialog.askopenfilename(
@@ -628,23 +1069,26 @@ class YugiohDeckBuilder:
         )
         
         if file_path:
+            if not self.load_catalog():
+                return
             try:
                 with open(file_path, 'r') as f:
                     card_names = [line.strip() for line in f if line.strip()]
                 
-                self.update_status(f"Importing {len(card_names)} cards...")
-                imported_count = 0
-                
-                for card_name in card_names:
-                    if not any(card['name'].lower() == card_name.lower() for card in self.all_cards):
-                        card_data = self.fetch_card_data(card_name)
-                        if card_data:
-                            self.all_cards.append(card_data)
-                            self.card_listbox.insert(tk.END, card_data['name'])
-                            imported_count += 1
+                self.update_status(f"Importing {len(card_names)} cards...", flush=True)
+                found, missing = self.resolve_cards(card_names, "Importing")
+                corrected = self.suggest_corrections(missing)
+                # List just the imported cards, once each, in file order
+                rows = list(dict.fromkeys(found + corrected))
+                not_found = len(missing) - len(corrected)
                 
-                self.update_status(f"Imported {imported_count} new cards")
-                messagebox.showinfo("Success", f"Imported {imported_count} new cards!")
+                self.filtered_cards = self.catalog.view(rows)
+                self.card_listbox.set_model(self.filtered_cards)
+                message = f"Imported {len(rows)} cards"
+                if not_found:
+                    message += f", {not_found} not found"
+                self.update_status(message)
+                messagebox.showinfo("Success", f"{message}.")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to import cards: {str(e)}")
     
@@ -675,6 +1119,91 @@ class YugiohDeckBuilder:
         
         self.update_status(f"Switched to {theme_name} theme")
     
+    def show_performance_panel(self):
+        """Timings of the hot paths this session, refreshed while the window is open"""
+        if self.perf_window is not None and self.perf_window.winfo_exists():
+            self.perf_window.lift()
+            return
+        theme = self.themes[self.current_theme]
+        window = tk.Toplevel(self.root, bg=theme["bg"])
+        window.title("Performance")
+        window.geometry("760x460")
+        self.perf_window = window
+        
+        columns = [key for _, key, _ in PERF_COLUMNS]
+        tree = ttk.Treeview(window, columns=columns, height=10)
+        tree.heading("#0", text="Span")
+        tree.column("#0", width=180)
+        for heading, key, _ in PERF_COLUMNS:
+            tree.heading(key, text=heading)
+            tree.column(key, width=80, anchor=tk.E)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 5))
+        
+        # Duration histogram of the selected span
+        histogram = tk.Text(window, height=9, font=("Courier", 9), bg=theme["list_bg"], fg=theme["list_fg"],
+                            state=tk.DISABLED)
+        histogram.pack(fill=tk.X, padx=10)
+        
+        buttons = tk.Frame(window, bg=theme["bg"])
+        buttons.pack(fill=tk.X, padx=10, pady=10)
+        for label, command in (("Export Trace...", self.export_trace), ("Reset", self.perf.reset)):
+            tk.Button(buttons, text=label, command=command, bg=theme["button_bg"], fg=theme["button_fg"],
+                      padx=10).pack(side=tk.LEFT, padx=(0, 5))
+        
+        def refresh():
+            if not window.winfo_exists():
+                return
+            selected = tree.selection()
+            stats = self.perf.stats()
+            tree.delete(*tree.get_children())
+            for name, summary in stats.items():
+                values = []
+                for _, key, fmt in PERF_COLUMNS:
+                    value = summary[key]
+                    if key == "bytes":
+                        value /= 1024
+                    values.append("" if value is None else fmt.format(value))
+                tree.insert("", tk.END, iid=name, text=name, values=values)
+            if selected and selected[0] in stats:
+                tree.selection_set(selected[0])
+            self.show_perf_histogram(histogram, tree.selection())
+            window.after(1000, refresh)
+        
+        tree.bind('<<TreeviewSelect>>', lambda event: self.show_perf_histogram(histogram, tree.selection()))
+        refresh()
+    
+    def show_perf_histogram(self, text, selection):
+        lines = []
+        if selection:
+            buckets = self.perf.buckets(selection[0])
+            most = max((count for _, count in buckets), default=0) or 1
+            for edge, count in buckets:
+                if count:
+                    label = f"≤ {edge:g} ms" if edge is not None else "longer"
+                    lines.append(f"{label:>12} {count:6}  {'█' * max(1, round(40 * count / most))}")
+        else:
+            lines.append("Select a span to see how its recent run times are spread")
+        text.config(state=tk.NORMAL)
+        text.delete(1.0, tk.END)
+        text.insert(tk.END, "\n".join(lines))
+        text.config(state=tk.DISABLED)
+    
+    def export_trace(self):
+        """Save the recorded spans for chrome://tracing or Perfetto"""
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("Chrome trace", "*.json"), ("All files", "*.*")],
+            title="Export Trace",
+            parent=self.perf_window
+        )
+        if file_path:
+            try:
+                self.perf.export_chrome_trace(file_path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to export trace: {str(e)}")
+                return
+            self.update_status(f"Trace exported to {os.path.basename(file_path)}")
+    
     def show_about(self):
         about_text = """Yu-Gi-Oh! Deck Builder - Ultimate Edition
 